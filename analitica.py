@@ -0,0 +1,182 @@
+"""
+Series de ventas agregadas por hora, día, semana o mes.
+La agregación se hace en SQL con un rango sobre Pedido.fecha (usa ix_pedidos_fecha).
+Los buckets ya cerrados se guardan en cache: al consultar de nuevo solo se
+recalculan los que faltan y el bucket abierto (el que contiene el momento actual).
+"""
+from datetime import datetime, time, timedelta
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Pedido, Menu, menu_pedido
+from eventos import suscribir
+from cache_versionado import CacheVersionado
+
+METRICAS = ("ventas", "pedidos", "unidades")
+BUCKETS = ("hora", "dia", "semana", "mes")
+
+# Inicio del bucket calculado en SQLite, con el mismo formato que datetime.isoformat(" ")
+_FORMATO_SQL = {
+    "hora": ("%Y-%m-%d %H:00:00",),
+    "dia": ("%Y-%m-%d 00:00:00",),
+    "semana": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),  # Semanas de lunes a domingo
+    "mes": ("%Y-%m-01 00:00:00",),
+}
+
+
+def inicio_bucket(fecha: datetime, bucket: str):
+    if bucket == "hora":
+        return fecha.replace(minute=0, second=0, microsecond=0)
+    dia = datetime.combine(fecha.date(), time.min)
+    if bucket == "dia":
+        return dia
+    if bucket == "semana":
+        return dia - timedelta(days=dia.weekday())
+    if bucket == "mes":
+        return dia.replace(day=1)
+    raise ValueError(f"Bucket desconocido: {bucket} (use {', '.join(BUCKETS)})")
+
+
+def siguiente_bucket(inicio: datetime, bucket: str):
+    if bucket == "hora":
+        return inicio + timedelta(hours=1)
+    if bucket == "dia":
+        return inicio + timedelta(days=1)
+    if bucket == "semana":
+        return inicio + timedelta(days=7)
+    if inicio.month == 12:
+        return inicio.replace(year=inicio.year + 1, month=1)
+    return inicio.replace(month=inicio.month + 1)
+
+
+def buckets_del_rango(fecha_inicio: datetime, fecha_fin: datetime, bucket: str):
+    """Inicios de los buckets que cubren [fecha_inicio, fecha_fin)."""
+    inicios = []
+    actual = inicio_bucket(fecha_inicio, bucket)
+    while actual < fecha_fin:
+        inicios.append(actual)
+        actual = siguiente_bucket(actual, bucket)
+    return inicios
+
+
+def _consultar(db: Session, metrica: str, bucket: str, desde: datetime, hasta: datetime, cliente_id=None, menu_id=None):
+    """Un GROUP BY por bucket para [desde, hasta). Retorna dict inicio_bucket -> valor."""
+    formato, *modificadores = _FORMATO_SQL[bucket]
+    clave = func.strftime(formato, Pedido.fecha, *modificadores).label("bucket")
+
+    con_detalle = metrica == "unidades" or menu_id is not None
+    if metrica == "ventas":
+        # Con filtro de menú se suma el subtotal de ese menú (precio actual), no el total del pedido
+        valor = func.sum(menu_pedido.c.cantidad * Menu.precio) if menu_id is not None else func.sum(Pedido.total)
+    elif metrica == "pedidos":
+        valor = func.count(Pedido.id)
+    elif metrica == "unidades":
+        valor = func.sum(menu_pedido.c.cantidad)
+    else:
+        raise ValueError(f"Métrica desconocida: {metrica} (use {', '.join(METRICAS)})")
+
+    query = db.query(clave, valor.label("valor")).select_from(Pedido)
+    if con_detalle:
+        query = query.join(menu_pedido, menu_pedido.c.pedido_id == Pedido.id)
+        if metrica == "ventas":
+            query = query.join(Menu, Menu.id == menu_pedido.c.menu_id)
+        if menu_id is not None:
+            query = query.filter(menu_pedido.c.menu_id == menu_id)
+    if cliente_id is not None:
+        query = query.filter(Pedido.cliente_id == cliente_id)
+    query = query.filter(Pedido.fecha >= desde, Pedido.fecha < hasta).group_by(clave)
+    return {datetime.fromisoformat(r.bucket): float(r.valor or 0) for r in query.all()}
+
+
+class CacheAnalitica(CacheVersionado):
+    """
+    Valores de buckets cerrados, por (métrica, bucket, cliente_id, menu_id).
+    Los pedidos nuevos caen en el bucket abierto, que nunca se guarda; editar o
+    eliminar un pedido antiguo descarta solo los buckets que contienen su fecha.
+    """
+
+    def __init__(self, maximo_series: int = 64):
+        super().__init__(maximo_series)
+
+    def obtener(self, clave):
+        with self._lock:
+            return dict(self._entradas.get(clave, {}))
+
+    def _escribir(self, clave, valores):
+        # Los buckets nuevos se suman a los ya guardados de la misma serie
+        self._entradas.setdefault(clave, {}).update(valores)
+
+    def guardar(self, clave, valores: dict, version: int):
+        self._guardar(version, {clave: valores})
+
+    def registrar_pedidos(self, fechas):
+        """fechas: datetime del pedido, o date cuando se afecta el día completo."""
+        with self._lock:
+            self.version += 1
+            for (metrica, bucket, cliente_id, menu_id), valores in self._entradas.items():
+                for fecha in fechas:
+                    if isinstance(fecha, datetime):
+                        valores.pop(inicio_bucket(fecha, bucket), None)
+                    elif bucket == "hora":
+                        dia = datetime.combine(fecha, time.min)
+                        for h in range(24):
+                            valores.pop(dia + timedelta(hours=h), None)
+                    else:
+                        valores.pop(inicio_bucket(datetime.combine(fecha, time.min), bucket), None)
+
+
+cache_analitica = CacheAnalitica()
+suscribir("pedidos", lambda cambios, **_: cache_analitica.registrar_pedidos([c["fecha"] for c in cambios]), orden=1)
+# Las ventas por menú usan el precio: editar o eliminar un menú descarta las series
+suscribir("menus", lambda accion, **_: accion != "creado" and cache_analitica.invalidar())
+
+
+def serie(db: Session, metrica: str, bucket: str, fecha_inicio, fecha_fin, cliente_id: int = None,
+          menu_id: int = None, ahora: datetime = None):
+    """
+    Serie de `metrica` ('ventas', 'pedidos' o 'unidades') agregada por `bucket`
+    ('hora', 'dia', 'semana' o 'mes') entre fecha_inicio y fecha_fin (fin exclusivo;
+    un date se toma como el día completo). Los extremos se amplían a buckets completos.
+    Retorna lista de (inicio_bucket, valor), incluyendo los buckets sin ventas con 0.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Bucket desconocido: {bucket} (use {', '.join(BUCKETS)})")
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconocida: {metrica} (use {', '.join(METRICAS)})")
+    if not isinstance(fecha_inicio, datetime):
+        fecha_inicio = datetime.combine(fecha_inicio, time.min)
+    if not isinstance(fecha_fin, datetime):
+        fecha_fin = datetime.combine(fecha_fin + timedelta(days=1), time.min)
+    ahora = ahora or datetime.now()
+
+    inicios = buckets_del_rango(fecha_inicio, fecha_fin, bucket)
+    if not inicios:
+        return []
+    clave = (metrica, bucket, cliente_id, menu_id)
+    version = cache_analitica.version
+    valores = cache_analitica.obtener(clave)
+
+    # Buckets cerrados sin cache, más el abierto; los futuros quedan en 0 sin consultar
+    pendientes = [b for b in inicios if b <= ahora and b not in valores]
+    if pendientes:
+        consultados = _consultar(db, metrica, bucket, pendientes[0], siguiente_bucket(pendientes[-1], bucket),
+                                 cliente_id, menu_id)
+        cerrados = {}
+        for b in pendientes:
+            valores[b] = consultados.get(b, 0.0)
+            if siguiente_bucket(b, bucket) <= ahora:
+                cerrados[b] = valores[b]
+        cache_analitica.guardar(clave, cerrados, version)
+    return [(b, valores.get(b, 0.0)) for b in inicios]
+
+
+def mapa_calor_horas(db: Session, fecha_inicio, fecha_fin, metrica: str = "pedidos", cliente_id: int = None,
+                     menu_id: int = None, ahora: datetime = None):
+    """
+    Matriz 7 x 24 (lunes a domingo x hora del día) con la suma de `metrica`,
+    para planificar turnos. Se arma desde la serie por hora, que aprovecha el cache.
+    """
+    mapa = np.zeros((7, 24))
+    for inicio, valor in serie(db, metrica, "hora", fecha_inicio, fecha_fin, cliente_id, menu_id, ahora):
+        mapa[inicio.weekday(), inicio.hour] += valor
+    return mapa
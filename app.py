@@ -1,35 +1,48 @@
+import sys
+import time
+INICIO_ARRANQUE = time.perf_counter()  # Antes de los imports, para medir también su costo
+
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import re
 from database import SessionLocal
-from crud.cliente_crud import crear_cliente, listar_clientes, actualizar_cliente, eliminar_cliente
+from migraciones import migrar
+from crud.cliente_crud import crear_cliente, obtener_cliente, listar_clientes, actualizar_cliente, eliminar_cliente
 from crud.ingrediente_crud import crear_ingrediente, obtener_ingredientes, actualizar_ingrediente, eliminar_ingrediente
 from crud.menu_crud import crear_menu, listar_menus, actualizar_menu, eliminar_menu
-from crud.pedido_crud import crear_pedido
-from graficos import grafico_ventas_por_fecha, grafico_menus_mas_vendidos, grafico_ingredientes_mas_utilizados
-from models import Cliente, Ingrediente, Menu, Pedido, ingrediente_menu, menu_pedido
-from sqlalchemy.orm import joinedload
-from datetime import datetime
-from Boleta import generar_boleta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from crud.pedido_crud import crear_pedido, listar_pedidos_pagina
+from models import Cliente, Ingrediente, Menu, ingrediente_menu
+from datetime import datetime, timedelta
+from tareas import TrabajadorFondo
+from vistas import EnlaceTreeview, PaginadorTreeview
+from busqueda import indice_clientes, indice_menus, etiqueta_cliente
+from detalle_pedidos import cache_detalles_pedidos, VECINOS
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# Opciones del gráfico de menús más vendidos (etiqueta -> valor)
+OPCIONES_TOP = {"5": 5, "10": 10, "20": 20, "Todos": None}
+OPCIONES_VENTANA = {"Histórico": None, "Últimos 7 días": 7, "Últimos 30 días": 30}
+INTERVALO_STOCK_MS = 15000  # Relectura del stock para ver lo que vendieron o repusieron otras cajas
+
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, medir_arranque: bool = False):
         super().__init__()
         self.title("Restaurante - Gestión")
         self.geometry("1000x700")
         self.resizable(True, True)
 
         self.pedido_actual = {}  # Almacena menús seleccionados temporalmente
-        self.canvas = None  # Para el lienzo de gráficos
-
-        # Crear tabview
-        self.tabview = ctk.CTkTabview(self, width=1000, height=700)
+        self.canvas = None  # Lienzo de gráficos (se crea con la pestaña)
+        self.trabajador_pedidos = TrabajadorFondo(self, nombre="pedidos")  # Confirmación de pedidos fuera del hilo de Tk
+        self.trabajador_graficos = TrabajadorFondo(self, nombre="graficos")  # Consultas y armado de gráficos
+        self.trabajador_detalles = TrabajadorFondo(self, nombre="detalles")  # Precarga de detalles de pedidos
+        self.solicitud_grafico = 0  # Para descartar gráficos que ya no se pidieron
+
+        # Crear tabview; cada pestaña se construye la primera vez que se abre
+        self.tabview = ctk.CTkTabview(self, width=1000, height=700, command=self.al_cambiar_pestana)
         self.tabview.pack(pady=10, padx=10, fill="both", expand=True)
 
         # Crear pestañas
@@ -40,24 +53,64 @@ class App(ctk.CTk):
         self.tab_pedidos = self.tabview.add("Pedidos")
         self.tab_graficos = self.tabview.add("Gráficos")
 
-        self.crear_tab_ingredientes()
-        self.crear_tab_menus()
-        self.crear_tab_clientes()
-        self.crear_tab_compra()
-        self.crear_tab_pedidos()
-        self.crear_tab_graficos()
+        self.constructores_pestanas = {
+            "Ingredientes": self.crear_tab_ingredientes,
+            "Menús": self.crear_tab_menus,
+            "Clientes": self.crear_tab_clientes,
+            "Panel de Compra": self.crear_tab_compra,
+            "Pedidos": self.crear_tab_pedidos,
+            "Gráficos": self.crear_tab_graficos,
+        }
+        self.pestanas_creadas = set()
+        self.al_cambiar_pestana()
+
+        self.medir_arranque = medir_arranque
+        self.after_idle(self.ventana_lista)
+
+    def al_cambiar_pestana(self):
+        nombre = self.tabview.get()
+        if nombre not in self.pestanas_creadas:
+            self.pestanas_creadas.add(nombre)
+            inicio = time.perf_counter()
+            self.constructores_pestanas[nombre]()
+            print(f"Pestaña {nombre} creada en {time.perf_counter() - inicio:.3f} s")  # Depuración
+
+    def ventana_lista(self):
+        # Las tareas pendientes de dibujo se encolaron antes: aquí la ventana ya responde
+        self.update_idletasks()
+        print(f"Ventana lista en {time.perf_counter() - INICIO_ARRANQUE:.3f} s")  # Depuración
+        if self.medir_arranque:
+            self.after(0, self.destroy)
+
+    def reconstruir_ranking(self):
+        def reconstruir():
+            from mas_vendidos import ranking_menus
+            with SessionLocal() as db:
+                return ranking_menus.reconstruir(db, presupuesto_s=0.5)
+
+        def al_terminar(completo):
+            # Tramos cortos para no demorar los gráficos pedidos entretanto
+            if not completo:
+                self.reconstruir_ranking()
+
+        def al_fallar(error):
+            print(f"Error al reconstruir el ranking de menús: {error}")  # Depuración
+
+        self.trabajador_graficos.enviar(reconstruir, al_terminar, al_fallar)
 
     def crear_tab_clientes(self):
         frame = ctk.CTkFrame(self.tab_clientes)
         frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        columns = ("ID", "Nombre", "Correo")
+        columns = ("ID", "Nombre", "Correo", "Segmento", "Pedidos", "Monto")
         self.tree_clientes = ttk.Treeview(frame, columns=columns, show="headings")
         for col in columns:
             self.tree_clientes.heading(col, text=col)
             self.tree_clientes.column(col, anchor="center", width=150)
         self.tree_clientes.pack(fill="both", expand=True)
         self.tree_clientes.bind('<<TreeviewSelect>>', self.cargar_cliente)
+        self.enlace_clientes = EnlaceTreeview(self.tree_clientes)
+        self.filas_clientes = []
 
         form_frame = ctk.CTkFrame(frame)
         form_frame.pack(fill="x", pady=10)
@@ -75,8 +128,12 @@ class App(ctk.CTk):
         ctk.CTkButton(form_frame, text="Agregar Cliente", command=self.agregar_cliente).grid(row=2, column=0, padx=5, pady=5)
         ctk.CTkButton(form_frame, text="Actualizar Cliente", command=self.actualizar_cliente).grid(row=2, column=1, padx=5, pady=5)
         ctk.CTkButton(form_frame, text="Eliminar Cliente", command=self.eliminar_cliente).grid(row=3, column=0, columnspan=2, pady=5)
+        ctk.CTkButton(form_frame, text="Actualizar Segmentos", command=self.calcular_segmentos).grid(row=2, column=2, padx=5, pady=5)
+        ctk.CTkButton(form_frame, text="Exportar RFM (CSV)", command=self.exportar_segmentos).grid(row=3, column=2, padx=5, pady=5)
 
+        self.segmentos_clientes = {}  # cliente_id -> resultado RFM (ver rfm.py)
         self.actualizar_treeview_clientes()
+        self.calcular_segmentos()
 
     def cargar_cliente(self, event):
         selected_item = self.tree_clientes.selection()
@@ -92,9 +149,59 @@ class App(ctk.CTk):
 
     def actualizar_treeview_clientes(self):
         with SessionLocal() as db:
-            self.tree_clientes.delete(*self.tree_clientes.get_children())
-            for cliente in listar_clientes(db):
-                self.tree_clientes.insert("", "end", values=(cliente.id, cliente.nombre, cliente.correo))
+            self.filas_clientes = [(c.id, c.nombre, c.correo) for c in listar_clientes(db)]
+        self.mostrar_clientes()
+
+    def mostrar_clientes(self):
+        # Solo se tocan las filas que cambiaron; la selección y el desplazamiento se conservan
+        self.enlace_clientes.sincronizar(
+            (fila[0], fila + self.columnas_segmento(fila[0])) for fila in self.filas_clientes
+        )
+
+    def columnas_segmento(self, cliente_id):
+        segmento = self.segmentos_clientes.get(cliente_id)
+        if segmento is None:
+            return (self.etiqueta_sin_pedidos, 0, "$0.00") if self.segmentos_clientes else ("", "", "")
+        return (segmento["segmento"], segmento["frecuencia"], f"${segmento['monto']:.2f}")
+
+    def calcular_segmentos(self):
+        # Una consulta y cálculo vectorizado en el hilo de gráficos; la tabla se completa al terminar
+        def calcular():
+            # rfm (y NumPy) se importa en el hilo de fondo, no al arrancar
+            from rfm import segmentar_clientes
+            with SessionLocal() as db:
+                return segmentar_clientes(db)
+
+        def al_terminar(segmentos):
+            from rfm import SIN_PEDIDOS  # Ya importado por calcular
+            self.etiqueta_sin_pedidos = SIN_PEDIDOS
+            self.segmentos_clientes = segmentos
+            self.mostrar_clientes()
+
+        def al_fallar(error):
+            print(f"Error al calcular segmentos de clientes: {error}")  # Depuración
+
+        self.trabajador_graficos.enviar(calcular, al_terminar, al_fallar)
+
+    def exportar_segmentos(self):
+        ruta = filedialog.asksaveasfilename(
+            defaultextension=".csv", filetypes=[("CSV", "*.csv")], initialfile="clientes_rfm.csv"
+        )
+        if not ruta:
+            return
+
+        def exportar():
+            from rfm import exportar_rfm_csv
+            with SessionLocal() as db:
+                return exportar_rfm_csv(db, ruta)
+
+        def al_terminar(filas):
+            messagebox.showinfo("Éxito", f"{filas} clientes exportados a {ruta}")
+
+        def al_fallar(error):
+            messagebox.showerror("Error", f"No se pudo exportar: {str(error)}")
+
+        self.trabajador_graficos.enviar(exportar, al_terminar, al_fallar)
 
     def agregar_cliente(self):
         nombre = self.entry_nombre_cliente.get().strip()
@@ -211,6 +318,7 @@ class App(ctk.CTk):
             self.tree_ingredientes.column(col, anchor="center", width=120)
         self.tree_ingredientes.pack(fill="both", expand=True, pady=20, padx=20)
         self.tree_ingredientes.bind('<<TreeviewSelect>>', self.cargar_ingrediente)
+        self.enlace_ingredientes = EnlaceTreeview(self.tree_ingredientes)
 
         self.ingrediente_id = None
 
@@ -238,10 +346,12 @@ class App(ctk.CTk):
                 self.ingrediente_id = ingrediente_id
 
     def actualizar_treeview_ingredientes(self):
+        if "Ingredientes" not in self.pestanas_creadas:
+            return  # Se cargará al abrir la pestaña
         with SessionLocal() as db:
-            self.tree_ingredientes.delete(*self.tree_ingredientes.get_children())
-            for ingrediente in obtener_ingredientes(db):
-                self.tree_ingredientes.insert("", "end", values=(ingrediente.id, ingrediente.nombre, ingrediente.tipo, ingrediente.cantidad, ingrediente.unidad))
+            self.enlace_ingredientes.sincronizar(
+                (i.id, (i.id, i.nombre, i.tipo, i.cantidad, i.unidad)) for i in obtener_ingredientes(db)
+            )
 
     def agregar_ingrediente(self):
         nombre = self.combobox_ingredientes.get()
@@ -265,6 +375,7 @@ class App(ctk.CTk):
             nuevo = crear_ingrediente(db, nombre, tipo, cantidad, unidad)
             if nuevo:
                 self.actualizar_treeview_ingredientes()
+                self.actualizar_combo_menus(db)
                 self.combobox_ingredientes.set("")
                 self.entrada_cantidad_ingrediente.delete(0, tk.END)
                 self.entry_tipo_ingrediente.delete(0, tk.END)
@@ -299,6 +410,7 @@ class App(ctk.CTk):
             ingrediente = actualizar_ingrediente(db, self.ingrediente_id, nombre=nombre, tipo=tipo, cantidad=cantidad, unidad=unidad)
             if ingrediente:
                 self.actualizar_treeview_ingredientes()
+                self.actualizar_combo_menus(db)
                 self.combobox_ingredientes.set("")
                 self.entrada_cantidad_ingrediente.delete(0, tk.END)
                 self.entry_tipo_ingrediente.delete(0, tk.END)
@@ -315,6 +427,7 @@ class App(ctk.CTk):
             with SessionLocal() as db:
                 if eliminar_ingrediente(db, ingrediente_id):
                     self.actualizar_treeview_ingredientes()
+                    self.actualizar_combo_menus(db)
                     self.combobox_ingredientes.set("")
                     self.entrada_cantidad_ingrediente.delete(0, tk.END)
                     self.entry_tipo_ingrediente.delete(0, tk.END)
@@ -340,6 +453,7 @@ class App(ctk.CTk):
             self.tree_menus.column(col, anchor="center", width=100)
         self.tree_menus.pack(fill="both", expand=True)
         self.tree_menus.bind("<<TreeviewSelect>>", self.mostrar_descripcion_menu)
+        self.enlace_menus = EnlaceTreeview(self.tree_menus)
 
         btn_crear_menu = ctk.CTkButton(left_frame, text="Crear Menú", command=self.abrir_ventana_crear_menu)
         btn_crear_menu.pack(pady=10)
@@ -364,10 +478,8 @@ class App(ctk.CTk):
 
     def cargar_menus(self):
         with SessionLocal() as db:
-            self.tree_menus.delete(*self.tree_menus.get_children())
             menus = listar_menus(db)
-            for menu in menus:
-                self.tree_menus.insert("", "end", values=(menu.id, menu.nombre, f"${menu.precio:.2f}"))
+            self.enlace_menus.sincronizar((menu.id, (menu.id, menu.nombre, f"${menu.precio:.2f}")) for menu in menus)
 
     def mostrar_descripcion_menu(self, event):
         selected = self.tree_menus.selection()
@@ -630,14 +742,32 @@ class App(ctk.CTk):
 
         ctk.CTkLabel(frame_filtros, text="Filtrar por cliente:").pack(side="left", padx=10)
 
-        self.tree_pedidos = ttk.Treeview(self.tab_pedidos, columns=("ID", "Cliente", "Fecha", "Total"), show="headings", height=10)
+        frame_tree = ctk.CTkFrame(self.tab_pedidos)
+        frame_tree.pack(fill="both", expand=True, padx=10, pady=(5, 0))
+        self.tree_pedidos = ttk.Treeview(frame_tree, columns=("ID", "Cliente", "Fecha", "Total"), show="headings", height=10)
         self.tree_pedidos.heading("ID", text="ID")
         self.tree_pedidos.heading("Cliente", text="Cliente")
         self.tree_pedidos.heading("Fecha", text="Fecha")
         self.tree_pedidos.heading("Total", text="Total")
-        self.tree_pedidos.pack(fill="both", expand=True, padx=10, pady=(5, 0))
+        scrollbar_pedidos = ttk.Scrollbar(frame_tree, orient="vertical")
+        scrollbar_pedidos.pack(side="right", fill="y")
+        self.tree_pedidos.pack(side="left", fill="both", expand=True)
         self.tree_pedidos.bind("<<TreeviewSelect>>", self.mostrar_detalles_pedido)
 
+        # Solo se cargan las páginas cercanas a lo visible, por clave (fecha, id)
+        self.cliente_filtro_pedidos = None
+
+        def cargar_pagina(limite, despues=None, antes=None):
+            with SessionLocal() as db:
+                return listar_pedidos_pagina(db, limite, despues, antes, self.cliente_filtro_pedidos)
+
+        self.paginador_pedidos = PaginadorTreeview(
+            self.tree_pedidos, scrollbar_pedidos, cargar_pagina,
+            clave=lambda p: (p.fecha, p.id),
+            iid=lambda p: p.id,
+            valores=lambda p: (p.id, p.cliente_nombre or "", str(p.fecha), f"${(p.total or 0):.2f}")
+        )
+
         frame_detalles = ctk.CTkFrame(self.tab_pedidos)
         frame_detalles.pack(fill="both", expand=False, padx=10, pady=10)
 
@@ -658,32 +788,16 @@ class App(ctk.CTk):
             if not seleccion or seleccion == "Todos":
                 cargar_pedidos()
                 return
-            cliente_id = int(seleccion.split(" - ")[0])
-            self.tree_pedidos.delete(*self.tree_pedidos.get_children())
-            with SessionLocal() as db:
-                pedidos = db.query(Pedido).options(joinedload(Pedido.cliente)).filter(Pedido.cliente_id == cliente_id).all()
-                for pedido in pedidos:
-                    self.tree_pedidos.insert("", "end", values=(
-                        pedido.id,
-                        pedido.cliente.nombre,
-                        str(pedido.fecha),
-                        f"${pedido.total:.2f}"
-                    ))
+            self.cliente_filtro_pedidos = int(seleccion.split(" - ")[0])
+            self.paginador_pedidos.reiniciar()
 
         def cargar_pedidos():
-            self.tree_pedidos.delete(*self.tree_pedidos.get_children())
             self.listbox_menus.delete(0, tk.END)
             self.label_fecha.configure(text="Fecha: ")
             self.label_total.configure(text="Total: ")
+            self.cliente_filtro_pedidos = None
+            self.paginador_pedidos.reiniciar()
             with SessionLocal() as db:
-                pedidos = db.query(Pedido).options(joinedload(Pedido.cliente)).all()
-                for pedido in pedidos:
-                    self.tree_pedidos.insert("", "end", values=(
-                        pedido.id,
-                        pedido.cliente.nombre,
-                        str(pedido.fecha),
-                        f"${pedido.total:.2f}"
-                    ))
                 clientes = listar_clientes(db)
                 self.combo_clientes_pedidos.configure(values=["Todos"] + [f"{c.id} - {c.nombre}" for c in clientes])
                 if clientes:
@@ -702,37 +816,57 @@ class App(ctk.CTk):
         if not selected:
             return
         pedido_id = int(self.tree_pedidos.item(selected[0], "values")[0])
+        # Con cache, recorrer la lista con las flechas no consulta la base
         with SessionLocal() as db:
-            pedido = db.query(Pedido).options(joinedload(Pedido.menus)).filter_by(id=pedido_id).first()
-            if pedido:
-                self.label_fecha.configure(text=f"Fecha: {pedido.fecha.strftime('%Y-%m-%d %H:%M:%S')}")
-                self.label_total.configure(text=f"Total: ${pedido.total:.2f}")
-                self.listbox_menus.delete(0, tk.END)
-                with SessionLocal() as db:
-                    cantidades = db.query(menu_pedido.c.cantidad, Menu.nombre).join(Menu, menu_pedido.c.menu_id == Menu.id).filter(menu_pedido.c.pedido_id == pedido_id).all()
-                    for cantidad, nombre in cantidades:
-                        self.listbox_menus.insert(tk.END, f"{cantidad}x {nombre}")
+            detalle = cache_detalles_pedidos.obtener(db, pedido_id)
+        if detalle:
+            self.label_fecha.configure(text=f"Fecha: {detalle['fecha'].strftime('%Y-%m-%d %H:%M:%S')}")
+            self.label_total.configure(text=f"Total: ${detalle['total']:.2f}")
+            self.listbox_menus.delete(0, tk.END)
+            for cantidad, nombre in detalle["menus"]:
+                self.listbox_menus.insert(tk.END, f"{cantidad}x {nombre}")
+        self.precargar_detalles_vecinos(selected[0])
+
+    def precargar_detalles_vecinos(self, iid):
+        # Solo se encola una precarga a la vez; al ejecutarse toma la última selección
+        filas = self.tree_pedidos.get_children()
+        indice = self.tree_pedidos.index(iid)
+        self.detalles_a_precargar = [int(i) for i in filas[max(indice - VECINOS, 0):indice + VECINOS + 1]]
+        if self.trabajador_detalles.pendientes():
+            return
+
+        def precargar():
+            with SessionLocal() as db:
+                return cache_detalles_pedidos.precargar(db, self.detalles_a_precargar)
+
+        def al_fallar(error):
+            print(f"Error al precargar detalles de pedidos: {error}")  # Depuración
+
+        self.trabajador_detalles.enviar(precargar, lambda leidos: None, al_fallar)
 
     def crear_tab_compra(self):
             frame = ctk.CTkFrame(self.tab_compra)
             frame.pack(fill="x", padx=10, pady=5)
 
             ctk.CTkLabel(frame, text="Seleccionar Cliente:").pack(pady=2)
-            with SessionLocal() as db:
-                clientes = listar_clientes(db)
-                self.combo_clientes = ctk.CTkComboBox(frame, values=["Sin clientes"] if not clientes else [c.nombre for c in clientes], state="disabled" if not clientes else "normal")
-                if clientes:
-                    self.combo_clientes.set(clientes[0].nombre)
+            # Autocompletado: el combo muestra solo las coincidencias del texto escrito
+            self.etiquetas_clientes = {}  # Etiqueta del combo -> ID del cliente
+            self.combo_clientes = ctk.CTkComboBox(frame, values=["Sin clientes"], state="disabled", command=self.on_cliente_cambio)
             self.combo_clientes.pack(pady=2)
-            self.combo_clientes.bind("<<ComboboxSelected>>", self.on_cliente_cambio)
+            self.combo_clientes.bind("<KeyRelease>", lambda e: self.filtrar_combo_clientes())
+            with SessionLocal() as db:
+                self.actualizar_combo_clientes(db)
 
             ctk.CTkLabel(frame, text="Seleccionar Menú:").pack(pady=2)
-            with SessionLocal() as db:
-                menus = listar_menus(db)
-                self.combo_menus = ctk.CTkComboBox(frame, values=["Sin menús"] if not menus else [m.nombre for m in menus], state="disabled" if not menus else "normal")
-                if menus:
-                    self.combo_menus.set(menus[0].nombre)
+            self.etiquetas_menus = {}  # Etiqueta del combo -> ID del menú
+            self.porciones_menus = {}  # ID del menú -> porciones vendibles (None = sin límite)
+            self.menus_combo = []  # (ID, nombre) de los menús del combo
+            self.combo_menus = ctk.CTkComboBox(frame, values=["Sin menús"], state="disabled")
             self.combo_menus.pack(pady=2)
+            self.combo_menus.bind("<KeyRelease>", lambda e: self.filtrar_combo_menus())
+            self.after(INTERVALO_STOCK_MS, self.refrescar_porciones)
+            with SessionLocal() as db:
+                self.actualizar_combo_menus(db)
 
             # Botones para agregar y eliminar
             botones_frame = ctk.CTkFrame(frame)
@@ -754,32 +888,142 @@ class App(ctk.CTk):
 
             ctk.CTkButton(frame, text="Confirmar Pedido", command=self.confirmar_pedido).pack(pady=5)
 
+            self.label_estado_pedido = ctk.CTkLabel(frame, text="")
+            self.label_estado_pedido.pack(pady=2)
+
             self.actualizar_treeview_compra()
 
-    def on_cliente_cambio(self, event):
+    def on_cliente_cambio(self, seleccion):
         self.pedido_actual = {}
         self.actualizar_treeview_compra()
-        print(f"Cliente cambiado a: {self.combo_clientes.get()}, Pedido reiniciado")
+        print(f"Cliente cambiado a: {seleccion}, Pedido reiniciado")
 
     def actualizar_combo_clientes_y_menus(self):
+        if "Panel de Compra" not in self.pestanas_creadas:
+            return  # Se cargará al abrir la pestaña
         with SessionLocal() as db:
-            clientes = listar_clientes(db)
-            if not clientes:
-                self.combo_clientes.configure(values=["Sin clientes"], state="disabled")
-            else:
-                self.combo_clientes.configure(values=[c.nombre for c in clientes], state="normal")
-                if not self.combo_clientes.get() or self.combo_clientes.get() == "Sin clientes":
-                    self.combo_clientes.set(clientes[0].nombre)
-            
-            menus = listar_menus(db)
-            if not menus:
-                self.combo_menus.configure(values=["Sin menús"], state="disabled")
-            else:
-                self.combo_menus.configure(values=[m.nombre for m in menus], state="normal")
-                if not self.combo_menus.get() or self.combo_menus.get() == "Sin menús":
-                    self.combo_menus.set(menus[0].nombre)
+            self.actualizar_combo_clientes(db)
+            self.actualizar_combo_menus(db)
         print("ComboBox actualizados: Clientes:", self.combo_clientes.cget("values"), "Menús:", self.combo_menus.cget("values"))
 
+    def actualizar_combo_clientes(self, db):
+        indice_clientes.sincronizar(db)  # Recoge también los clientes de otras cajas
+        if not len(indice_clientes):
+            self.etiquetas_clientes = {}
+            self.combo_clientes.configure(values=["Sin clientes"], state="disabled")
+            self.combo_clientes.set("Sin clientes")
+            return
+        actual = self.combo_clientes.get()
+        elegido = self.etiquetas_clientes.get(actual)
+        self.combo_clientes.configure(state="normal")
+        self.mostrar_opciones_clientes(db, "", elegido)
+        if elegido in indice_clientes.registros:
+            # Mismo cliente, con la etiqueta al día si se editó
+            self.combo_clientes.set(etiqueta_cliente(*indice_clientes.registros[elegido]))
+        elif elegido is not None or not actual or actual == "Sin clientes":
+            self.combo_clientes.set(next(iter(self.etiquetas_clientes)))
+
+    def filtrar_combo_clientes(self):
+        texto = self.combo_clientes.get()
+        if texto in self.etiquetas_clientes:
+            return  # Ya es un cliente elegido
+        with SessionLocal() as db:
+            self.mostrar_opciones_clientes(db, texto)
+
+    def mostrar_opciones_clientes(self, db, prefijo: str, elegido: int = None):
+        ids = indice_clientes.buscar(db, prefijo)
+        if elegido is not None and elegido not in ids:
+            ids.append(elegido)
+        registros = indice_clientes.registros
+        self.etiquetas_clientes = {etiqueta_cliente(*registros[i]): i for i in ids if i in registros}
+        self.combo_clientes.configure(values=list(self.etiquetas_clientes) or ["Sin coincidencias"])
+
+    def cliente_seleccionado(self):
+        """ID del cliente del combo: por su etiqueta o, si se escribió, por la única coincidencia."""
+        texto = self.combo_clientes.get()
+        if texto in self.etiquetas_clientes:
+            return self.etiquetas_clientes[texto]
+        if not texto or texto == "Sin clientes":
+            return None
+        with SessionLocal() as db:
+            ids = indice_clientes.buscar(db, texto, limite=2)
+        return ids[0] if len(ids) == 1 else None
+
+    def refrescar_porciones(self):
+        # La relectura corre en el hilo de pedidos; desplegar el combo nunca consulta la base
+        def refrescar():
+            from inventario import matriz_recetas
+            with SessionLocal() as db:
+                matriz_recetas.refrescar_stock(db)
+                return matriz_recetas.porciones_disponibles(db)
+
+        def al_terminar(porciones):
+            escribiendo = self.combo_menus.get() not in self.etiquetas_menus
+            if porciones != self.porciones_menus and self.menus_combo and not escribiendo:
+                self.porciones_menus = porciones
+                self.etiquetar_menus()
+            self.after(INTERVALO_STOCK_MS, self.refrescar_porciones)
+
+        def al_fallar(error):
+            print(f"Error al releer el stock: {error}")  # Depuración
+            self.after(INTERVALO_STOCK_MS, self.refrescar_porciones)
+
+        self.trabajador_pedidos.enviar(refrescar, al_terminar, al_fallar)
+
+    def actualizar_combo_menus(self, db):
+        # Las porciones salen del cache de inventario (refrescar_porciones relee el stock cada tanto)
+        if "Panel de Compra" not in self.pestanas_creadas:
+            return  # Se cargará al abrir la pestaña
+        indice_menus.sincronizar(db)  # El filtro del combo busca en el índice
+        self.menus_combo = [(m.id, m.nombre) for m in listar_menus(db)]
+        if not self.menus_combo:
+            self.etiquetas_menus = {}
+            self.porciones_menus = {}
+            self.combo_menus.configure(values=["Sin menús"], state="disabled")
+            self.combo_menus.set("Sin menús")
+            return
+        # inventario (y NumPy) se importa recién al abrir el Panel de Compra
+        from inventario import matriz_recetas
+        self.porciones_menus = matriz_recetas.porciones_disponibles(db)
+        self.etiquetar_menus()
+
+    def etiquetar_menus(self):
+        # Etiquetas del combo a partir de self.menus_combo y self.porciones_menus, sin consultar la base
+        seleccionado = self.etiquetas_menus.get(self.combo_menus.get())
+        self.etiquetas_menus = {}
+        for menu_id, nombre in self.menus_combo:
+            porciones = self.porciones_menus.get(menu_id)
+            if porciones is None:
+                etiqueta = nombre
+            elif porciones == 0:
+                etiqueta = f"{nombre} (agotado)"
+            else:
+                etiqueta = f"{nombre} ({porciones} disp.)"
+            self.etiquetas_menus[etiqueta] = menu_id
+        etiquetas = list(self.etiquetas_menus)
+        self.combo_menus.configure(state="normal")
+        self.mostrar_opciones_menus(etiquetas)
+        etiqueta_actual = next((e for e, menu_id in self.etiquetas_menus.items() if menu_id == seleccionado), None)
+        self.combo_menus.set(etiqueta_actual or etiquetas[0])
+
+    def mostrar_opciones_menus(self, etiquetas: list):
+        self.combo_menus.configure(values=etiquetas or ["Sin coincidencias"])
+        # Deshabilitar en el desplegable los menús agotados
+        dropdown = getattr(self.combo_menus, "_dropdown_menu", None)
+        if dropdown is not None:
+            for idx, etiqueta in enumerate(etiquetas):
+                if self.porciones_menus.get(self.etiquetas_menus[etiqueta]) == 0:
+                    dropdown.entryconfigure(idx, state="disabled")
+
+    def filtrar_combo_menus(self):
+        texto = self.combo_menus.get()
+        if not self.etiquetas_menus or texto in self.etiquetas_menus:
+            return
+        with SessionLocal() as db:
+            ids = indice_menus.buscar(db, texto, limite=len(self.etiquetas_menus))
+        etiqueta_de = {menu_id: etiqueta for etiqueta, menu_id in self.etiquetas_menus.items()}
+        self.mostrar_opciones_menus([etiqueta_de[i] for i in ids if i in etiqueta_de])
+
     def actualizar_treeview_compra(self):
         total = 0
         self.tree_compra.delete(*self.tree_compra.get_children())
@@ -791,16 +1035,10 @@ class App(ctk.CTk):
         self.total_label.configure(text=f"Total: ${total:.2f}")
 
     def actualizar_treeview_pedidos(self):
-        self.tree_pedidos.delete(*self.tree_pedidos.get_children())
-        with SessionLocal() as db:
-            pedidos = db.query(Pedido).options(joinedload(Pedido.cliente)).all()
-            for pedido in pedidos:
-                self.tree_pedidos.insert("", "end", values=(
-                    pedido.id,
-                    pedido.cliente.nombre,
-                    str(pedido.fecha),
-                    f"${pedido.total:.2f}"))
-            
+        # Se relee la ventana visible y solo se aplican los cambios (p. ej. el pedido nuevo arriba)
+        if "Pedidos" in self.pestanas_creadas:
+            self.paginador_pedidos.refrescar()
+
     def eliminar_menu_pedido(self):
         selected_item = self.tree_compra.selection()
         if not selected_item:
@@ -825,28 +1063,21 @@ class App(ctk.CTk):
             messagebox.showerror("Error", f"El menú '{menu_nombre}' no está en el pedido")
 
     def agregar_menu_pedido(self, menu):
+            from inventario import matriz_recetas
+            carrito = {item["menu"].id: item["cantidad"] for item in self.pedido_actual.values()}
             with SessionLocal() as db:
-                ingredientes = db.query(ingrediente_menu).filter_by(menu_id=menu.id).all()
-                for ing in ingredientes:
-                    ingrediente = db.query(Ingrediente).filter_by(id=ing.ingrediente_id).first()
-                    if not ingrediente:
-                        messagebox.showerror("Error", f"Ingrediente ID {ing.ingrediente_id} no encontrado para el menú {menu.nombre}")
-                        return False
-                    # Calcular la cantidad total requerida del ingrediente en el pedido actual
-                    cantidad_actual = sum(
-                        item["cantidad"] * db.query(ingrediente_menu.c.cantidad)
-                        .filter_by(menu_id=item["menu"].id, ingrediente_id=ing.ingrediente_id)
-                        .scalar() or 0
-                        for item in self.pedido_actual.values()
-                    )
-                    cantidad_nueva = ing.cantidad  # Cantidad requerida por una unidad del menú
-                    if ingrediente.cantidad < cantidad_actual + cantidad_nueva:
-                        messagebox.showwarning(
-                            "Sin stock",
-                            f"No hay más stock de {ingrediente.nombre} para el menú {menu.nombre}. "
-                            f"Stock disponible: {ingrediente.cantidad}, requerido: {cantidad_actual + cantidad_nueva}"
-                        )
-                        return False
+                try:
+                    falta = matriz_recetas.verificar_agregado(db, carrito, menu.id)
+                except ValueError as e:
+                    messagebox.showerror("Error", f"{e} para el menú {menu.nombre}")
+                    return False
+            if falta:
+                messagebox.showwarning(
+                    "Sin stock",
+                    f"No hay más stock de {falta['nombre']} para el menú {menu.nombre}. "
+                    f"Stock disponible: {falta['disponible']}, requerido: {falta['requerido']}"
+                )
+                return False
             # Si el stock es suficiente, agregar el menú
             if menu.nombre in self.pedido_actual:
                 self.pedido_actual[menu.nombre]["cantidad"] += 1
@@ -855,17 +1086,30 @@ class App(ctk.CTk):
             print(f"Menú {menu.nombre} añadido al pedido, Cantidad: {self.pedido_actual[menu.nombre]['cantidad']}")
             return True
 
+    def menu_seleccionado(self):
+        """ID del menú del combo: por su etiqueta o, si se escribió, por la única coincidencia."""
+        texto = self.combo_menus.get()
+        if texto in self.etiquetas_menus:
+            return self.etiquetas_menus[texto]
+        if not texto or texto == "Sin menús":
+            return None
+        with SessionLocal() as db:
+            ids = indice_menus.buscar(db, texto, limite=2)
+        return ids[0] if len(ids) == 1 else None
+
     def agregar_a_pedido(self):
-        menu_nombre = self.combo_menus.get()
-        cliente_nombre = self.combo_clientes.get()
-        if not menu_nombre or menu_nombre == "Sin menús":
+        if self.cliente_seleccionado() is None:
+            messagebox.showerror("Error", "Seleccione un cliente válido")
+            return
+        menu_id = self.menu_seleccionado()
+        if menu_id is None:
             messagebox.showerror("Error", "Seleccione un menú válido")
             return
-        if not cliente_nombre or cliente_nombre == "Sin clientes":
-            messagebox.showerror("Error", "Seleccione un cliente válido")
+        if self.porciones_menus.get(menu_id) == 0:
+            messagebox.showwarning("Sin stock", f"El menú '{self.combo_menus.get()}' está agotado")
             return
         with SessionLocal() as db:
-            menu = db.query(Menu).filter_by(nombre=menu_nombre).first()
+            menu = db.query(Menu).filter_by(id=menu_id).first()
             if not menu:
                 messagebox.showerror("Error", "Menú no encontrado")
                 return
@@ -878,42 +1122,71 @@ class App(ctk.CTk):
                 messagebox.showerror("Error", f"No se pudo agregar el menú: {str(e)}")
 
     def confirmar_pedido(self):
-        cliente_nombre = self.combo_clientes.get()
-        if not cliente_nombre or cliente_nombre == "Sin clientes":
+        cliente_id = self.cliente_seleccionado()
+        if cliente_id is None:
             messagebox.showerror("Error", "Seleccione un cliente válido")
             return
         if not self.pedido_actual:
             messagebox.showerror("Error", "No hay menús en el pedido")
             return
+        registro = indice_clientes.registros.get(cliente_id)
+        if registro is None:
+            messagebox.showerror("Error", "El cliente ya no existe")
+            self.actualizar_combo_clientes_y_menus()
+            return
+        cliente_nombre = registro[0]
 
-        with SessionLocal() as db:
-            cliente = db.query(Cliente).filter_by(nombre=cliente_nombre).first()
-            if not cliente:
-                messagebox.showerror("Error", "Cliente no encontrado")
-                return
+        # Se toma una copia del carrito y se libera el panel para el siguiente pedido
+        items = dict(self.pedido_actual)
+        total = sum(item["cantidad"] * item["menu"].precio for item in items.values())
+        menu_cantidades = {item["menu"].id: item["cantidad"] for item in items.values()}
+        descripcion = "Pedido desde Panel de Compra: " + ", ".join([f"{item['cantidad']}x {nombre}" for nombre, item in items.items()])
+        self.pedido_actual = {}
+        self.actualizar_treeview_compra()
+        self.label_estado_pedido.configure(text=f"Procesando pedido de {cliente_nombre}...")
+
+        def guardar():
+            # fpdf se importa en el hilo de fondo, con el primer pedido
+            from render_boleta import renderizar_boleta, items_desde_pedido
+            items_boleta = items_desde_pedido(items)
+            with SessionLocal() as db:
+                cliente = obtener_cliente(db, cliente_id)
+                if not cliente:
+                    raise ValueError("Cliente no encontrado")
+                pedido = crear_pedido(db, descripcion=descripcion, total=total, cliente_id=cliente.id, menu_cantidades=menu_cantidades, reservar=True)
+                if not pedido:
+                    raise ValueError("Error en la base de datos")
+                pedido_id, fecha = pedido.id, pedido.fecha
+            # Generar boleta (el pedido ya quedó guardado aunque la boleta falle)
             try:
-                total = sum(item["cantidad"] * item["menu"].precio for item in self.pedido_actual.values())
-                menu_cantidades = {item["menu"].id: item["cantidad"] for item in self.pedido_actual.values()}
-                descripcion = "Pedido desde Panel de Compra: " + ", ".join([f"{item['cantidad']}x {nombre}" for nombre, item in self.pedido_actual.items()])
-                pedido = crear_pedido(db, descripcion=descripcion, total=total, cliente_id=cliente.id, menu_cantidades=menu_cantidades)
-                if pedido:
-                    print(f"Pedido confirmado: Cliente {cliente_nombre}, Total ${total:.2f}, Menús: {menu_cantidades}")
-                    # Generar boleta
-                    generar_boleta(pedido.id, cliente_nombre, pedido.fecha, self.pedido_actual)
-                    self.pedido_actual = {}
-                    self.actualizar_treeview_compra()
-                    self.actualizar_treeview_pedidos()
-                    self.actualizar_treeview_ingredientes()
-                    messagebox.showinfo("Éxito", f"Pedido confirmado para {cliente_nombre} por ${total:.2f}")
-                else:
-                    print("Error: No se pudo crear el pedido en la base de datos")
-                    messagebox.showerror("Error", "No se pudo confirmar el pedido: Error en la base de datos")
-            except ValueError as e:
-                print(f"Error al confirmar pedido: {e}")
-                messagebox.showerror("Error", f"No se pudo confirmar el pedido: {str(e)}")
+                ruta = renderizar_boleta(pedido_id, cliente_nombre, fecha, items_boleta)
+                error_boleta = None
             except Exception as e:
-                print(f"Error inesperado al confirmar pedido: {e}")
-                messagebox.showerror("Error", f"No se pudo confirmar el pedido: {str(e)}")
+                ruta, error_boleta = None, str(e)
+            return pedido_id, ruta, error_boleta
+
+        def al_terminar(resultado):
+            pedido_id, ruta, error_boleta = resultado
+            print(f"Pedido confirmado: Cliente {cliente_nombre}, Total ${total:.2f}, Menús: {menu_cantidades}")
+            with SessionLocal() as db:
+                self.actualizar_combo_menus(db)
+            self.actualizar_treeview_pedidos()
+            self.actualizar_treeview_ingredientes()
+            self.label_estado_pedido.configure(text=f"Pedido N° {pedido_id} confirmado para {cliente_nombre} por ${total:.2f}" + (f" - Boleta: {ruta}" if ruta else ""))
+            if error_boleta:
+                print(f"Error al generar la boleta: {error_boleta}")
+                messagebox.showerror("Error", f"No se pudo generar la boleta: {error_boleta}")
+
+        def al_fallar(error):
+            print(f"Error al confirmar pedido: {error}")
+            self.label_estado_pedido.configure(text="")
+            # Si el cajero no empezó otro carrito, se recupera el pedido rechazado
+            if not self.pedido_actual:
+                self.pedido_actual = items
+                self.actualizar_treeview_compra()
+            messagebox.showerror("Error", f"No se pudo confirmar el pedido: {str(error)}")
+
+        self.trabajador_pedidos.enviar(guardar, al_terminar, al_fallar)
 
     def crear_tab_graficos(self):
         frame = ctk.CTkFrame(self.tab_graficos)
@@ -936,18 +1209,34 @@ class App(ctk.CTk):
         self.entry_fecha_fin = ctk.CTkEntry(filtros_frame, placeholder_text="Ej: 2023-12-31")
         self.entry_fecha_fin.pack(side="left", padx=5)
 
+        # Opciones de Menús Más Vendidos
+        ctk.CTkLabel(filtros_frame, text="Top:").pack(side="left", padx=5)
+        self.combo_top_menus = ctk.CTkComboBox(filtros_frame, values=list(OPCIONES_TOP), width=90)
+        self.combo_top_menus.set("10")
+        self.combo_top_menus.pack(side="left", padx=5)
+        self.combo_ventana_menus = ctk.CTkComboBox(filtros_frame, values=list(OPCIONES_VENTANA), width=130)
+        self.combo_ventana_menus.set("Histórico")
+        self.combo_ventana_menus.pack(side="left", padx=5)
+
         ctk.CTkButton(filtros_frame, text="Generar Gráfico", command=self.generar_grafico).pack(side="left", padx=5)
 
-        # Área para el gráfico
+        self.label_estado_grafico = ctk.CTkLabel(frame, text="")
+        self.label_estado_grafico.pack(anchor="w", padx=5)
+
+        # Área para el gráfico: una sola figura y un solo lienzo para toda la sesión
         self.grafico_frame = ctk.CTkFrame(frame)
         self.grafico_frame.pack(fill="both", expand=True, pady=10)
+        # matplotlib se importa recién aquí: la mayoría de los turnos no abre esta pestaña
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from graficos import crear_figura
+        self.figura_grafico = crear_figura()
+        self.ejes_grafico = self.figura_grafico.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.figura_grafico, master=self.grafico_frame)
 
-    def generar_grafico(self):
-        # Limpiar gráfico anterior
-        if self.canvas:
-            self.canvas.get_tk_widget().destroy()
-            plt.close(self.canvas.figure)
+        # Ranking de menús más vendidos: se reconstruye por tramos en el hilo de gráficos
+        self.reconstruir_ranking()
 
+    def generar_grafico(self):
         tipo_grafico = self.combo_graficos.get()
         if not tipo_grafico:
             messagebox.showerror("Error", "Seleccione un tipo de gráfico")
@@ -970,23 +1259,75 @@ class App(ctk.CTk):
                 messagebox.showerror("Error", "Formato de fecha inválido. Use YYYY-MM-DD")
                 return
 
+        if tipo_grafico not in ("Ventas por Fecha", "Menús Más Vendidos", "Ingredientes Más Utilizados"):
+            messagebox.showerror("Error", "Seleccione un tipo de gráfico válido")
+            return
+
+        top_n = OPCIONES_TOP.get(self.combo_top_menus.get())
+        dias = OPCIONES_VENTANA.get(self.combo_ventana_menus.get())
+        tipo_clave = tipo_grafico
+        if tipo_grafico == "Menús Más Vendidos":
+            # La ventana móvil se guarda como rango desde su primer día: un pedido nuevo la invalida
+            tipo_clave = f"{tipo_grafico} top={top_n}"
+            if dias:
+                fecha_inicio = datetime.now() - timedelta(days=dias - 1)
+
+        self.solicitud_grafico += 1
+        solicitud = self.solicitud_grafico
+
+        # Si los datos no cambiaron desde la última vez (en esta u otra caja), se reutilizan
+        from cache_graficos import cache_graficos
         with SessionLocal() as db:
-            fig = None
-            if tipo_grafico == "Ventas por Fecha":
-                fig = grafico_ventas_por_fecha(db, fecha_inicio, fecha_fin)
-            elif tipo_grafico == "Menús Más Vendidos":
-                fig = grafico_menus_mas_vendidos(db)
-            elif tipo_grafico == "Ingredientes Más Utilizados":
-                fig = grafico_ingredientes_mas_utilizados(db)
-            else:
-                messagebox.showerror("Error", "Seleccione un tipo de gráfico válido")
-                return
+            cache_graficos.sincronizar(db)
+        clave = cache_graficos.clave(tipo_clave, fecha_inicio, fecha_fin)
+        datos = cache_graficos.obtener(clave)
+        if datos is not None:
+            self.label_estado_grafico.configure(text="")
+            self.mostrar_grafico(datos)
+            return
+
+        self.label_estado_grafico.configure(text="Generando gráfico...")
 
-            # Mostrar el gráfico en la interfaz
-            self.canvas = FigureCanvasTkAgg(fig, master=self.grafico_frame)
-            self.canvas.draw()
+        def generar():
+            # En el hilo de fondo solo se consulta; el dibujo se hace en el hilo de Tk
+            from graficos import datos_ventas_por_fecha, datos_menus_mas_vendidos, datos_ingredientes_mas_utilizados
+            with SessionLocal() as db:
+                if tipo_grafico == "Ventas por Fecha":
+                    datos = ("ventas",) + datos_ventas_por_fecha(db, fecha_inicio, fecha_fin)
+                elif tipo_grafico == "Menús Más Vendidos":
+                    datos = ("menus",) + datos_menus_mas_vendidos(db, top_n, dias)
+                else:
+                    datos = ("ingredientes",) + datos_ingredientes_mas_utilizados(db)
+            cache_graficos.guardar(clave, datos)
+            return datos
+
+        def al_terminar(datos):
+            # Solo se muestra el último gráfico pedido
+            if solicitud == self.solicitud_grafico:
+                self.label_estado_grafico.configure(text="")
+                self.mostrar_grafico(datos)
+
+        def al_fallar(error):
+            if solicitud == self.solicitud_grafico:
+                self.label_estado_grafico.configure(text="")
+            print(f"Error al generar gráfico: {error}")
+            messagebox.showerror("Error", f"No se pudo generar el gráfico: {str(error)}")
+
+        self.trabajador_graficos.enviar(generar, al_terminar, al_fallar)
+
+    def mostrar_grafico(self, datos):
+        # Se reutilizan la figura y el lienzo; solo cambian los datos de los artistas
+        from graficos import dibujar_barras
+        estilo, etiquetas, valores = datos
+        dibujar_barras(self.ejes_grafico, estilo, etiquetas, valores)
+        if not self.canvas.get_tk_widget().winfo_manager():
             self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.draw_idle()
 
 
-app = App()
-app.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    # Esquema al día antes de abrir cualquier sesión (con la base al día es una sola consulta)
+    migrar()
+    # --medir-arranque: cierra la ventana apenas se muestra (ver benchmarks/bench_arranque.py)
+    app = App(medir_arranque="--medir-arranque" in sys.argv)
+    app.mainloop()
\ No newline at end of file
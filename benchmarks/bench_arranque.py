@@ -0,0 +1,74 @@
+"""
+Tiempo de arranque de la aplicación: desglose de imports (python -X importtime)
+y tiempo hasta que la primera ventana responde.
+Cada corrida lanza app.py --medir-arranque en un proceso nuevo; la ventana se
+cierra sola apenas se muestra. Sin pantalla solo se obtiene el desglose de imports.
+Uso: python -m benchmarks.bench_arranque [repeticiones]
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from statistics import median
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOSTRAR_IMPORTS = 15
+
+
+def _imports_directos(salida_importtime: str):
+    """Módulo -> tiempo acumulado en µs de los imports de primer nivel."""
+    tiempos = {}
+    for linea in salida_importtime.splitlines():
+        if not linea.startswith("import time:") or "[us]" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not nombre.startswith("  "):  # Sin sangría extra: importado directamente
+            tiempos[nombre.strip()] = int(acumulado)
+    return tiempos
+
+
+def corrida():
+    """Retorna (imports, segundos hasta la ventana o None, segundos totales, error)."""
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "app.py", "--medir-arranque"],
+        cwd=RAIZ, capture_output=True, text=True
+    )
+    total = time.perf_counter() - inicio
+    ventana = re.search(r"Ventana lista en ([\d.]+) s", proceso.stdout)
+    error = None
+    if proceso.returncode != 0:
+        lineas = [l for l in proceso.stderr.splitlines() if not l.startswith("import time:")]
+        error = lineas[-1] if lineas else f"código de salida {proceso.returncode}"
+    return _imports_directos(proceso.stderr), float(ventana.group(1)) if ventana else None, total, error
+
+
+def main(repeticiones=5):
+    imports = {}
+    ventanas = []
+    totales = []
+    error = None
+    for _ in range(repeticiones):
+        tiempos, ventana, total, error = corrida()
+        for nombre, us in tiempos.items():
+            imports.setdefault(nombre, []).append(us)
+        if ventana is not None:
+            ventanas.append(ventana)
+        totales.append(total)
+
+    print(f"{'import':<45} {'acumulado (ms)':>15}")
+    medianas = sorted(((median(v), n) for n, v in imports.items()), reverse=True)
+    for us, nombre in medianas[:MOSTRAR_IMPORTS]:
+        print(f"{nombre:<45} {us / 1000:>15.1f}")
+    print(f"{'total de imports directos':<45} {sum(us for us, _ in medianas) / 1000:>15.1f}")
+    print()
+    print(f"Proceso completo (mediana de {repeticiones}): {median(totales):.3f} s")
+    if ventanas:
+        print(f"Hasta la primera ventana (mediana): {median(ventanas):.3f} s")
+    else:
+        print(f"No se abrió la ventana: {error}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
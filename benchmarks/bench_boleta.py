@@ -0,0 +1,44 @@
+"""
+Compara el armado de boletas con y sin la plantilla de partes fijas.
+Se mide construir_boleta más la serialización en memoria, sin escribir a disco,
+alternando ambos modos para que el ruido afecte a los dos por igual.
+Uso: python -m benchmarks.bench_boleta [repeticiones]
+"""
+import sys
+import time
+from statistics import median
+from datetime import datetime
+from render_boleta import construir_boleta, obtener_plantilla
+
+TAMANOS = (1, 10, 50)
+
+
+def _tiempo(items, usar_plantilla):
+    inicio = time.perf_counter()
+    pdf = construir_boleta(1, "Cliente Benchmark", datetime(2025, 6, 24, 13, 0), items, usar_plantilla=usar_plantilla)
+    pdf.output(dest="S")
+    return time.perf_counter() - inicio
+
+
+def medir(items, repeticiones):
+    sin_plantilla = []
+    con_plantilla = []
+    for _ in range(repeticiones):
+        sin_plantilla.append(_tiempo(items, False))
+        con_plantilla.append(_tiempo(items, True))
+    return median(sin_plantilla), median(con_plantilla)
+
+
+def main(repeticiones=300):
+    plantilla = obtener_plantilla()
+    if not plantilla.soportada:
+        print("La versión instalada de fpdf no permite estampar la plantilla; ambos modos son equivalentes.")
+    print(f"{'ítems':>6} {'sin plantilla (ms)':>20} {'con plantilla (ms)':>20} {'mejora':>8}")
+    for n in TAMANOS:
+        items = [(f"Menú {i}", 1 + i % 3, 2500.0 + i) for i in range(n)]
+        base, con = medir(items, repeticiones)
+        print(f"{n:>6} {base * 1000:>20.3f} {con * 1000:>20.3f} {base / con:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
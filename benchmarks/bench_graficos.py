@@ -0,0 +1,62 @@
+"""
+Latencia de redibujo de la pestaña Gráficos.
+Antes: figura y lienzo nuevos en cada clic (plt.subplots + dibujo + cierre).
+Después: una figura y un lienzo persistentes; solo se actualizan los artistas.
+Se usa el lienzo Agg, que es el que rasteriza también dentro de FigureCanvasTkAgg.
+Uso: python -m benchmarks.bench_graficos [repeticiones]
+"""
+import sys
+import time
+from statistics import median
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from graficos import crear_figura, dibujar_barras
+
+TAMANOS = (10, 30, 90)
+
+
+def _datos(n, desplazamiento):
+    etiquetas = [f"2025-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(n)]
+    valores = [1000.0 + ((i * 37 + desplazamiento) % 50) * 100 for i in range(n)]
+    return etiquetas, valores
+
+
+def antes(n, repeticiones):
+    tiempos = []
+    for r in range(repeticiones):
+        inicio = time.perf_counter()
+        fig, ax = plt.subplots(figsize=(8, 5), tight_layout=True)
+        dibujar_barras(ax, "ventas", *_datos(n, r))
+        FigureCanvasAgg(fig).draw()
+        plt.close(fig)
+        tiempos.append(time.perf_counter() - inicio)
+    return median(tiempos)
+
+
+def despues(n, repeticiones):
+    fig = crear_figura()
+    ax = fig.add_subplot()
+    lienzo = FigureCanvasAgg(fig)
+    dibujar_barras(ax, "ventas", *_datos(n, 0))
+    lienzo.draw()
+    tiempos = []
+    for r in range(repeticiones):
+        inicio = time.perf_counter()
+        dibujar_barras(ax, "ventas", *_datos(n, r + 1))
+        lienzo.draw()
+        tiempos.append(time.perf_counter() - inicio)
+    return median(tiempos)
+
+
+def main(repeticiones=30):
+    print(f"{'barras':>7} {'antes (ms)':>12} {'después (ms)':>14} {'mejora':>8}")
+    for n in TAMANOS:
+        a = antes(n, repeticiones)
+        d = despues(n, repeticiones)
+        print(f"{n:>7} {a * 1000:>12.1f} {d * 1000:>14.1f} {a / d:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30)
@@ -0,0 +1,89 @@
+"""
+Generador determinista de datos sintéticos para los modelos de models.py.
+La misma semilla y escala producen siempre la misma base.
+"""
+import random
+from datetime import datetime, timedelta
+from models import Cliente, Ingrediente, Menu, Pedido, ingrediente_menu, menu_pedido
+from migraciones import migrar
+from sqlalchemy.orm import Session
+from crud.venta_diaria_crud import reconstruir_ventas_diarias
+
+ESCALAS = {
+    "small": {"ingredientes": 30, "menus": 50, "clientes": 1000, "pedidos": 20000},
+    "medium": {"ingredientes": 60, "menus": 200, "clientes": 10000, "pedidos": 200000},
+    "large": {"ingredientes": 120, "menus": 500, "clientes": 50000, "pedidos": 2000000},
+}
+
+FECHA_FIN = datetime(2025, 6, 30)
+TAMANO_LOTE = 50000
+
+
+def _insertar(conn, tabla, filas):
+    for i in range(0, len(filas), TAMANO_LOTE):
+        conn.execute(tabla.insert(), filas[i:i + TAMANO_LOTE])
+
+
+def generar_datos(engine, ingredientes: int, menus: int, clientes: int, pedidos: int, dias: int = 365, semilla: int = 42):
+    """
+    Crea las tablas y las llena con datos sintéticos. Retorna los conteos por tabla.
+    El stock de ingredientes es lo bastante grande para no agotarse en los escenarios.
+    """
+    rng = random.Random(semilla)
+    migrar(engine)
+    conteos = {}
+
+    with engine.begin() as conn:
+        filas = [
+            {"id": i, "nombre": f"Ingrediente {i}", "tipo": rng.choice(["Vegetal", "Proteína", "Pan", "Bebida", "Lácteo"]),
+             "cantidad": 1e9, "unidad": "Unidades"}
+            for i in range(1, ingredientes + 1)
+        ]
+        _insertar(conn, Ingrediente.__table__, filas)
+        conteos["ingredientes"] = len(filas)
+
+        precios = {}
+        filas = []
+        recetas = []
+        for i in range(1, menus + 1):
+            precios[i] = float(rng.randrange(1500, 12000, 100))
+            filas.append({"id": i, "nombre": f"Menú {i}", "descripcion": f"Descripción del menú {i}", "precio": precios[i]})
+            for ingrediente_id in rng.sample(range(1, ingredientes + 1), rng.randint(2, min(6, ingredientes))):
+                recetas.append({"ingrediente_id": ingrediente_id, "menu_id": i, "cantidad": round(rng.uniform(0.05, 2), 2)})
+        _insertar(conn, Menu.__table__, filas)
+        _insertar(conn, ingrediente_menu, recetas)
+        conteos["menus"] = len(filas)
+        conteos["ingrediente_menu"] = len(recetas)
+
+        filas = [{"id": i, "nombre": f"Cliente {i}", "correo": f"cliente{i}@example.com"} for i in range(1, clientes + 1)]
+        _insertar(conn, Cliente.__table__, filas)
+        conteos["clientes"] = len(filas)
+
+        inicio = FECHA_FIN - timedelta(days=dias)
+        segundos = dias * 86400
+        conteos["pedidos"] = 0
+        conteos["menu_pedido"] = 0
+        for lote in range(0, pedidos, TAMANO_LOTE):
+            filas_pedidos = []
+            filas_menus = []
+            for pedido_id in range(lote + 1, min(lote + TAMANO_LOTE, pedidos) + 1):
+                total = 0.0
+                for menu_id in rng.sample(range(1, menus + 1), rng.randint(1, min(4, menus))):
+                    cantidad = rng.randint(1, 3)
+                    total += cantidad * precios[menu_id]
+                    filas_menus.append({"menu_id": menu_id, "pedido_id": pedido_id, "cantidad": cantidad})
+                filas_pedidos.append({
+                    "id": pedido_id,
+                    "descripcion": f"Pedido sintético {pedido_id}",
+                    "total": total,
+                    "fecha": inicio + timedelta(seconds=rng.randrange(segundos)),
+                    "cliente_id": rng.randint(1, clientes)
+                })
+            conn.execute(Pedido.__table__.insert(), filas_pedidos)
+            _insertar(conn, menu_pedido, filas_menus)
+            conteos["pedidos"] += len(filas_pedidos)
+            conteos["menu_pedido"] += len(filas_menus)
+
+    with Session(bind=engine) as db:
+        conteos["ventas_diarias"] = reconstruir_ventas_diarias(db)
+    return conteos
@@ -0,0 +1,153 @@
+"""
+Escenarios cronometrados sobre la capa CRUD, los gráficos y las boletas.
+Uso:
+    python -m benchmarks.suite --escala small --salida resultados.json
+La base sintética se guarda en --db y se reutiliza mientras no se pida --regenerar.
+Los escenarios corren sobre una copia temporal: crear_pedido escribe pedidos y
+descuenta stock, y cada corrida debe partir de los mismos datos.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import sqlalchemy
+from sqlalchemy.orm import sessionmaker
+
+from database import crear_engine
+from models import Pedido, Menu, Cliente, menu_pedido
+from crud.pedido_crud import crear_pedido, listar_pedidos
+from crud.cliente_crud import listar_clientes
+from graficos import grafico_ventas_por_fecha, grafico_menus_mas_vendidos, grafico_ingredientes_mas_utilizados
+from render_boleta import renderizar_boleta
+from benchmarks.generador import ESCALAS, FECHA_FIN, generar_datos
+
+
+def cronometrar(funcion, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+    return {
+        "repeticiones": repeticiones,
+        "mediana_s": statistics.median(tiempos),
+        "min_s": min(tiempos),
+        "max_s": max(tiempos),
+        "media_s": statistics.fmean(tiempos)
+    }
+
+
+def copiar_base(origen: str, destino: str):
+    # API de respaldo de SQLite: copia consistente aunque haya cambios en el WAL
+    with contextlib.closing(sqlite3.connect(origen)) as fuente, contextlib.closing(sqlite3.connect(destino)) as copia:
+        fuente.backup(copia)
+
+
+def _grafico(funcion, *args):
+    def ejecutar():
+        fig = funcion(*args)
+        plt.close(fig)
+    return ejecutar
+
+
+def escenarios(Session, escala: dict, repeticiones: int, semilla: int):
+    rng = random.Random(semilla)
+    resultados = {}
+    db = Session()
+    try:
+        def pedido_aleatorio():
+            menu_cantidades = {m: rng.randint(1, 3) for m in rng.sample(range(1, escala["menus"] + 1), rng.randint(1, 6))}
+            crear_pedido(db, "Pedido benchmark", 0.0, rng.randint(1, escala["clientes"]), menu_cantidades)
+
+        resultados["crear_pedido"] = cronometrar(pedido_aleatorio, repeticiones * 10)
+        resultados["listar_pedidos"] = cronometrar(lambda: (listar_pedidos(db), db.expunge_all()), repeticiones)
+        resultados["listar_clientes"] = cronometrar(lambda: (listar_clientes(db), db.expunge_all()), repeticiones)
+
+        resultados["grafico_ventas_por_fecha"] = cronometrar(_grafico(grafico_ventas_por_fecha, db), repeticiones)
+        resultados["grafico_ventas_por_fecha_30_dias"] = cronometrar(
+            _grafico(grafico_ventas_por_fecha, db, FECHA_FIN - timedelta(days=30), FECHA_FIN), repeticiones)
+        resultados["grafico_menus_mas_vendidos"] = cronometrar(_grafico(grafico_menus_mas_vendidos, db), repeticiones)
+        resultados["grafico_ingredientes_mas_utilizados"] = cronometrar(_grafico(grafico_ingredientes_mas_utilizados, db), repeticiones)
+
+        # generar_boleta sin diálogos de Tk: se mide el núcleo que usa internamente
+        pedido = db.query(Pedido.id, Pedido.fecha, Cliente.nombre).join(Cliente).order_by(Pedido.id).first()
+        items = (
+            db.query(Menu.nombre, menu_pedido.c.cantidad, Menu.precio)
+            .join(menu_pedido, menu_pedido.c.menu_id == Menu.id)
+            .filter(menu_pedido.c.pedido_id == pedido.id)
+            .all()
+        )
+        with tempfile.TemporaryDirectory() as carpeta:
+            resultados["generar_boleta"] = cronometrar(
+                lambda: renderizar_boleta(pedido.id, pedido.nombre, pedido.fecha, [tuple(i) for i in items], carpeta=carpeta),
+                repeticiones * 10)
+    finally:
+        db.close()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de la capa CRUD y de análisis")
+    parser.add_argument("--escala", choices=list(ESCALAS), default="small")
+    parser.add_argument("--db", default=None, help="Ruta de la base sintética (por defecto benchmarks/bench_<escala>.db)")
+    parser.add_argument("--regenerar", action="store_true", help="Borrar y volver a generar la base sintética")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default=None, help="Archivo JSON de resultados (por defecto stdout)")
+    args = parser.parse_args()
+
+    escala = ESCALAS[args.escala]
+    ruta = args.db or os.path.join(os.path.dirname(__file__), f"bench_{args.escala}.db")
+    if args.regenerar and os.path.exists(ruta):
+        os.remove(ruta)
+    nueva = not os.path.exists(ruta)
+
+    engine = crear_engine(f"sqlite:///{ruta}", perfil="benchmark")
+
+    reporte = {
+        "escala": args.escala,
+        "parametros": escala,
+        "semilla": args.semilla,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+    }
+    if nueva:
+        inicio = time.perf_counter()
+        reporte["conteos"] = generar_datos(engine, semilla=args.semilla, **escala)
+        reporte["generacion_s"] = time.perf_counter() - inicio
+    engine.dispose()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        copia = os.path.join(carpeta, "bench.db")
+        copiar_base(ruta, copia)
+        engine = crear_engine(f"sqlite:///{copia}", perfil="benchmark")
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        try:
+            reporte["escenarios"] = escenarios(Session, escala, args.repeticiones, args.semilla)
+        finally:
+            engine.dispose()
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Índices en memoria para buscar clientes y menús por prefijo (autocompletado).
+Cada texto indexado se normaliza (minúsculas, sin tildes) y se guarda en una lista
+ordenada de (clave, id); una búsqueda es un bisect más la lectura de los resultados,
+sin consultar la base. sincronizar() recarga el índice si otra caja cambió la tabla.
+"""
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Cliente, Menu
+from eventos import suscribir
+
+LIMITE_RESULTADOS = 20
+_SIN_TILDES = str.maketrans("áéíóúüñàèìòùâêîôûç", "aeiouunaeiouaeiouc")  # Caso común, sin unicodedata
+
+
+def normalizar(texto: str):
+    """Minúsculas y sin tildes: 'José' y 'jose' tienen la misma clave."""
+    texto = (texto or "").strip().casefold().translate(_SIN_TILDES)
+    if texto.isascii():
+        return texto
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+class IndicePrefijos:
+    """
+    Lista ordenada de (clave, id) con las claves de cada registro: el texto completo
+    de cada campo y cada palabra a partir de la segunda, para que 'per' encuentre a
+    'Juan Pérez'. Se carga en la primera búsqueda y luego lo mantienen los crud;
+    mientras no está cargado los cambios se ignoran porque la carga ya los verá.
+    Los cambios de otras cajas se detectan con una huella de la tabla (cantidad,
+    máximo ID y largo total de los campos); un renombre con el mismo largo no cambia
+    la huella y se verá en la próxima recarga.
+    """
+
+    def __init__(self, modelo, campos: tuple):
+        self._lock = threading.Lock()
+        self.modelo = modelo
+        self.campos = campos
+        self._claves = None
+        self._huella = None  # Huella de la tabla al cargar
+        self.registros = {}  # id -> tupla de campos (en el orden de self.campos)
+
+    def invalidar(self):
+        with self._lock:
+            self._claves = None
+            self.registros = {}
+
+    def huella(self, db: Session):
+        largo = sum(func.length(func.coalesce(getattr(self.modelo, campo), "")) for campo in self.campos)
+        return tuple(db.query(func.count(self.modelo.id), func.max(self.modelo.id), func.total(largo)).one())
+
+    def _claves_de(self, valores):
+        claves = set()
+        for valor in valores:
+            normalizado = normalizar(valor)
+            if normalizado:
+                claves.add(normalizado)
+                claves.update(normalizado.split()[1:])
+        return claves
+
+    def _cargar(self, db: Session):
+        # La huella se toma antes de leer: un cambio entre ambas lecturas provoca otra recarga
+        self._huella = self.huella(db)
+        columnas = [getattr(self.modelo, campo) for campo in self.campos]
+        self.registros = {fila[0]: tuple(fila[1:]) for fila in db.query(self.modelo.id, *columnas).all()}
+        self._claves = sorted(
+            (clave, registro_id)
+            for registro_id, valores in self.registros.items()
+            for clave in self._claves_de(valores)
+        )
+
+    def cargar(self, db: Session):
+        if self._claves is None:
+            with self._lock:
+                if self._claves is None:
+                    self._cargar(db)
+
+    def sincronizar(self, db: Session):
+        """
+        Recarga el índice si la tabla cambió desde la carga (altas, bajas o ediciones,
+        también las de otras cajas). Sin cambios es una sola consulta.
+        """
+        if self._claves is None:
+            return self.cargar(db)
+        huella = self.huella(db)
+        with self._lock:
+            if self._claves is not None and huella != self._huella:
+                self._cargar(db)
+
+    def agregar(self, registro_id: int, *valores):
+        with self._lock:
+            if self._claves is None:
+                return
+            self._quitar(registro_id)
+            self.registros[registro_id] = valores
+            for clave in self._claves_de(valores):
+                insort(self._claves, (clave, registro_id))
+
+    def quitar(self, registro_id: int):
+        with self._lock:
+            if self._claves is not None:
+                self._quitar(registro_id)
+
+    def _quitar(self, registro_id: int):
+        valores = self.registros.pop(registro_id, None)
+        if valores is None:
+            return
+        for clave in self._claves_de(valores):
+            i = bisect_left(self._claves, (clave, registro_id))
+            if i < len(self._claves) and self._claves[i] == (clave, registro_id):
+                del self._claves[i]
+
+    def buscar(self, db: Session, prefijo: str, limite: int = LIMITE_RESULTADOS):
+        """IDs (sin repetir) de los registros con alguna clave que empieza con prefijo, en orden de clave."""
+        self.cargar(db)
+        prefijo = normalizar(prefijo)
+        resultado = []
+        vistos = set()
+        with self._lock:
+            claves = self._claves
+            i = bisect_left(claves, (prefijo,))
+            while i < len(claves) and len(resultado) < limite:
+                clave, registro_id = claves[i]
+                if not clave.startswith(prefijo):
+                    break
+                if registro_id not in vistos:
+                    vistos.add(registro_id)
+                    resultado.append(registro_id)
+                i += 1
+        return resultado
+
+    def __len__(self):
+        return len(self.registros)
+
+
+indice_clientes = IndicePrefijos(Cliente, ("nombre", "correo"))
+indice_menus = IndicePrefijos(Menu, ("nombre",))
+
+
+def _actualizar_indice(indice: IndicePrefijos, registro_id: int, accion: str, *valores):
+    try:
+        if accion == "eliminado":
+            indice.quitar(registro_id)
+        else:
+            indice.agregar(registro_id, *valores)
+    except Exception:
+        indice.invalidar()  # La próxima búsqueda recarga desde la base
+        raise
+
+
+suscribir("clientes", lambda cliente_id, nombre, correo, accion: _actualizar_indice(indice_clientes, cliente_id, accion, nombre, correo))
+suscribir("menus", lambda menu_id, nombre, accion: _actualizar_indice(indice_menus, menu_id, accion, nombre))
+
+
+def etiqueta_cliente(nombre: str, correo: str):
+    # El correo es único: distingue clientes con el mismo nombre
+    return f"{nombre} <{correo}>"
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Pedido
+from eventos import suscribir
+from cache_versionado import CacheVersionado
+
+
+class CacheGraficos(CacheVersionado):
+    """
+    Cache de gráficos ya generados, con clave (tipo, fecha_inicio, fecha_fin, versión).
+    La versión de datos sube con cada pedido confirmado; las entradas que ese pedido
+    no afecta (rangos de fechas que no incluyen su día) pasan a la versión nueva y
+    el resto se descarta. Los pedidos de otras cajas se detectan con sincronizar().
+    """
+
+    def __init__(self, maximo: int = 32):
+        super().__init__(maximo)
+        self._hasta_id = None  # Mayor Pedido.id visto por sincronizar
+
+    def sincronizar(self, db: Session):
+        """
+        Registra los pedidos guardados desde la última llamada, incluidos los de otras
+        cajas (IDs mayores al último visto). Sin pedidos nuevos es una sola consulta
+        sobre la clave primaria. Llamar antes de clave().
+        """
+        hasta = db.query(func.max(Pedido.id)).scalar() or 0
+        anterior = self._hasta_id
+        if anterior is not None and hasta > anterior:
+            fechas = [f for (f,) in db.query(Pedido.fecha).filter(Pedido.id > anterior, Pedido.id <= hasta).all()]
+            self.registrar_pedidos(fechas)
+        with self._lock:
+            self._hasta_id = max(hasta, self._hasta_id or 0)
+
+    def clave(self, tipo: str, fecha_inicio=None, fecha_fin=None):
+        return (tipo, _dia(fecha_inicio), _dia(fecha_fin), self.version)
+
+    def obtener(self, clave):
+        with self._lock:
+            return self._entradas.get(clave)
+
+    def guardar(self, clave, valor):
+        self._guardar(clave[3], {clave: valor})
+
+    def registrar_pedidos(self, fechas):
+        """Nueva versión de datos tras confirmar, editar o eliminar pedidos de esas fechas."""
+        dias = {_dia(f) for f in fechas}
+        with self._lock:
+            anterior = self.version
+            self.version += 1
+            entradas = OrderedDict()
+            for (tipo, inicio, fin, version), valor in self._entradas.items():
+                if version != anterior:
+                    continue
+                afectada = any((inicio is None or d >= inicio) and (fin is None or d <= fin) for d in dias)
+                if not afectada:
+                    entradas[(tipo, inicio, fin, self.version)] = valor
+            self._entradas = entradas
+
+
+def _dia(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return None
+
+
+cache_graficos = CacheGraficos()
+
+# Después del ranking (orden 0): un gráfico calculado entretanto ya ve los datos nuevos
+suscribir("pedidos", lambda cambios, **_: cache_graficos.registrar_pedidos([c["fecha"] for c in cambios]), orden=1)
+
+
+def _al_cambiar_catalogo(accion, renombrado=True, **_):
+    # Los gráficos muestran nombres de menús e ingredientes; un alta no cambia los ya generados
+    if accion == "eliminado" or (accion == "actualizado" and renombrado):
+        cache_graficos.invalidar()
+
+
+suscribir("menus", _al_cambiar_catalogo)
+suscribir("ingredientes", _al_cambiar_catalogo)
@@ -0,0 +1,40 @@
+import threading
+from collections import OrderedDict
+
+
+class CacheVersionado:
+    """
+    Base de los caches en memoria que se llenan con consultas hechas fuera del lock.
+    Quien consulta anota `version` antes de leer la base; cada cambio de datos la sube
+    y _guardar descarta lo que se leyó con una versión anterior. Al superar `maximo`
+    salen primero las entradas escritas (o usadas, si la subclase las mueve) hace más tiempo.
+    """
+
+    def __init__(self, maximo: int):
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._maximo = maximo
+        self.version = 0
+
+    def _escribir(self, clave, valor):
+        self._entradas[clave] = valor
+
+    def _guardar(self, version: int, entradas: dict):
+        """Guarda clave -> valor si version sigue vigente. Retorna False si se descartó."""
+        with self._lock:
+            if version != self.version:
+                return False  # Se leyó con datos que ya cambiaron
+            for clave, valor in entradas.items():
+                self._escribir(clave, valor)
+                self._entradas.move_to_end(clave)
+            while len(self._entradas) > self._maximo:
+                self._entradas.popitem(last=False)
+            return True
+
+    def invalidar(self):
+        with self._lock:
+            self.version += 1
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
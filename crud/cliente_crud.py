@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from models import Cliente
+from eventos import publicar
 
 def crear_cliente(db: Session, nombre: str, correo: str):
     # Verificar si el correo ya existe
@@ -8,13 +9,16 @@ def crear_cliente(db: Session, nombre: str, correo: str):
     try:
         cliente = Cliente(nombre=nombre, correo=correo)
         db.add(cliente)
+        db.flush()
+        cliente_id = cliente.id
         db.commit()
-        db.refresh(cliente)
-        return cliente
     except Exception as e:
         db.rollback()
         print(f"Error al crear cliente: {e}")  # Depuración
         return None
+    # Ya guardado: un error de un suscriptor no debe mostrarse como un alta fallida
+    publicar("clientes", cliente_id=cliente_id, nombre=nombre, correo=correo, accion="creado")
+    return cliente
 
 def obtener_cliente(db: Session, cliente_id: int):
     return db.query(Cliente).filter(Cliente.id == cliente_id).first()
@@ -36,12 +40,12 @@ def actualizar_cliente(db: Session, cliente_id: int, nombre: str, correo: str):
         cliente.nombre = nombre
         cliente.correo = correo
         db.commit()
-        db.refresh(cliente)
-        return cliente
     except Exception as e:
         db.rollback()
         print(f"Error al actualizar cliente: {e}")  # Depuración
         return None
+    publicar("clientes", cliente_id=cliente_id, nombre=nombre, correo=correo, accion="actualizado")
+    return cliente
 
 def eliminar_cliente(db: Session, cliente_id: int):
     cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
@@ -50,7 +54,8 @@ def eliminar_cliente(db: Session, cliente_id: int):
     try:
         db.delete(cliente)
         db.commit()
-        return True
     except Exception as e:
         db.rollback()
         raise e
+    publicar("clientes", cliente_id=cliente_id, nombre=None, correo=None, accion="eliminado")
+    return True
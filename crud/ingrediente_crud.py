@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from models import Ingrediente
+from eventos import publicar
 
 # Crear ingrediente (solo si no existe con el mismo nombre y tipo)
 def crear_ingrediente(db: Session, nombre: str, tipo: str, cantidad: float, unidad: str):
@@ -10,6 +11,8 @@ def crear_ingrediente(db: Session, nombre: str, tipo: str, cantidad: float, unid
     db.add(nuevo)
     db.commit()
     db.refresh(nuevo)
+    publicar("ingredientes", ingrediente_id=nuevo.id, nombre=nuevo.nombre, cantidad=nuevo.cantidad,
+             accion="creado", renombrado=False)
     return nuevo
 
 # Leer todos los ingredientes
@@ -28,6 +31,8 @@ def actualizar_ingrediente(db: Session, ingrediente_id: int, **kwargs):
             setattr(ingrediente, key, value)
         db.commit()
         db.refresh(ingrediente)
+        publicar("ingredientes", ingrediente_id=ingrediente.id, nombre=ingrediente.nombre, cantidad=ingrediente.cantidad,
+                 accion="actualizado", renombrado="nombre" in kwargs)
     return ingrediente
 
 # Eliminar ingrediente
@@ -36,5 +41,7 @@ def eliminar_ingrediente(db: Session, ingrediente_id: int):
     if ingrediente:
         db.delete(ingrediente)
         db.commit()
+        publicar("ingredientes", ingrediente_id=ingrediente_id, nombre=None, cantidad=None,
+                 accion="eliminado", renombrado=False)
         return True
     return False
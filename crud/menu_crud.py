@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from models import Menu, Ingrediente, ingrediente_menu
+from eventos import publicar
 
 def crear_menu(db: Session, nombre: str, descripcion: str, ingredientes_info: list, precio: float):
     """
@@ -22,6 +23,7 @@ def crear_menu(db: Session, nombre: str, descripcion: str, ingredientes_info: li
             )
     db.commit()
     db.refresh(nuevo_menu)
+    publicar("menus", menu_id=nuevo_menu.id, nombre=nuevo_menu.nombre, accion="creado")
     return nuevo_menu
 
 def obtener_menu(db: Session, menu_id: int):
@@ -61,6 +63,7 @@ def actualizar_menu(db: Session, menu_id: int, nombre: str = None, descripcion:
                 )
         db.commit()
     db.refresh(menu)
+    publicar("menus", menu_id=menu.id, nombre=menu.nombre, accion="actualizado")
     return menu
 
 def eliminar_menu(db: Session, menu_id: int):
@@ -69,4 +72,5 @@ def eliminar_menu(db: Session, menu_id: int):
         return False
     db.delete(menu)
     db.commit()
+    publicar("menus", menu_id=menu_id, nombre=None, accion="eliminado")
     return True
@@ -1,23 +1,78 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import Table, Column, Integer, Float, ForeignKey
-from models import Pedido, Ingrediente, Menu, menu_pedido, ingrediente_menu
-from datetime import datetime   
-from database import Base
+from sqlalchemy import case, func, update, or_
+from models import Pedido, Cliente, Ingrediente, Menu, menu_pedido, ingrediente_menu
+from datetime import datetime
+import time
+from database import abrir_transaccion
+from crud.venta_diaria_crud import registrar_venta, registrar_ventas
+from eventos import publicar, cambio_pedido
 
 
-def crear_pedido(db: Session, descripcion: str, total: float, cliente_id: int, menu_cantidades: dict):
+def _demanda_ingredientes(db: Session, menu_cantidades: dict):
+    """
+    Calcula en una sola consulta la cantidad total requerida de cada ingrediente
+    para todos los menús de menu_cantidades.
+    Retorna filas (ingrediente_id, nombre, stock, requerido).
+    """
+    factor = case(menu_cantidades, value=ingrediente_menu.c.menu_id, else_=0)
+    return (
+        db.query(
+            ingrediente_menu.c.ingrediente_id,
+            Ingrediente.nombre,
+            Ingrediente.cantidad.label("stock"),
+            func.sum(ingrediente_menu.c.cantidad * factor).label("requerido")
+        )
+        .outerjoin(Ingrediente, Ingrediente.id == ingrediente_menu.c.ingrediente_id)
+        .filter(ingrediente_menu.c.menu_id.in_(list(menu_cantidades.keys())))
+        .group_by(ingrediente_menu.c.ingrediente_id)
+        .all()
+    )
+
+def _verificar_menus(db: Session, menu_cantidades: dict):
+    existentes = {r.id for r in db.query(Menu.id).filter(Menu.id.in_(list(menu_cantidades.keys()))).all()}
+    for menu_id in menu_cantidades:
+        if menu_id not in existentes:
+            raise ValueError(f"Menú con ID {menu_id} no encontrado")
+
+def _descontar_stock(db: Session, requeridos: dict, faltantes: list = None):
+    """
+    Descuenta el stock con un solo UPDATE condicionado (cantidad >= requerido).
+    Si alguna fila no se actualiza, otro pedido consumió el stock antes y se
+    lanza ValueError para que el llamador haga rollback del pedido completo.
+    """
+    if not requeridos:
+        return
+    necesario = case(requeridos, value=Ingrediente.id, else_=0)
+    resultado = db.execute(
+        update(Ingrediente)
+        .where(Ingrediente.id.in_(list(requeridos.keys())), Ingrediente.cantidad >= necesario)
+        .values(cantidad=Ingrediente.cantidad - necesario)
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount != len(requeridos):
+        detalle = f" ({', '.join(faltantes)})" if faltantes else ""
+        raise ValueError(f"No hay suficiente stock para completar el pedido{detalle}")
+
+def crear_pedido(db: Session, descripcion: str, total: float, cliente_id: int, menu_cantidades: dict, reservar: bool = False):
+    """
+    reservar: si es True no se valida el stock leído en Python; la reserva queda a
+    cargo del UPDATE condicionado, seguro con varias cajas sobre la misma base.
+    """
     try:
-        # Verificar inventario para todos los menús
-        for menu_id, cantidad in menu_cantidades.items():
-            menu = db.query(Menu).filter_by(id=menu_id).first()
-            if not menu:
-                raise ValueError(f"Menú con ID {menu_id} no encontrado")
-            ingredientes = db.query(ingrediente_menu).filter_by(menu_id=menu_id).all()
-            for ing in ingredientes:
-                ingrediente = db.query(Ingrediente).filter_by(id=ing.ingrediente_id).first()
-                if not ingrediente or ingrediente.cantidad < ing.cantidad * cantidad:
-                    raise ValueError(f"No hay suficiente stock de {ingrediente.nombre} para {cantidad}x {menu.nombre}")
-        
+        requeridos = {}
+        faltantes = []
+        if menu_cantidades:
+            # Verificar inventario para todos los menús (consultas constantes, sin importar el tamaño del pedido)
+            _verificar_menus(db, menu_cantidades)
+            for fila in _demanda_ingredientes(db, menu_cantidades):
+                if fila.nombre is None:
+                    raise ValueError(f"Ingrediente ID {fila.ingrediente_id} no encontrado")
+                if fila.stock < fila.requerido:
+                    if not reservar:
+                        raise ValueError(f"No hay suficiente stock de {fila.nombre}: disponible {fila.stock}, requerido {fila.requerido}")
+                    faltantes.append(fila.nombre)
+                requeridos[fila.ingrediente_id] = fila.requerido
+
         # Crear el pedido
         pedido = Pedido(
             descripcion=descripcion,
@@ -26,42 +81,192 @@ def crear_pedido(db: Session, descripcion: str, total: float, cliente_id: int, m
             fecha=datetime.now()
         )
         db.add(pedido)
-        db.commit()
-        db.refresh(pedido)
-        
-        # Asociar menús al pedido con cantidades
-        for menu_id, cantidad in menu_cantidades.items():
-            print(f"Insertando en pedido_menu: pedido_id={pedido.id}, menu_id={menu_id}, cantidad={cantidad}")  # Depuración
+        db.flush()
+
+        # Asociar menús al pedido con cantidades (executemany)
+        if menu_cantidades:
             db.execute(
-                menu_pedido.insert().values(
-                    pedido_id=pedido.id,
-                    menu_id=menu_id,
-                    cantidad=cantidad
-                )
+                menu_pedido.insert(),
+                [{"pedido_id": pedido.id, "menu_id": menu_id, "cantidad": cantidad} for menu_id, cantidad in menu_cantidades.items()]
             )
-        
-        # Actualizar inventario
-        for menu_id, cantidad in menu_cantidades.items():
-            ingredientes = db.query(ingrediente_menu).filter_by(menu_id=menu_id).all()
-            for ing in ingredientes:
-                ingrediente = db.query(Ingrediente).filter_by(id=ing.ingrediente_id).first()
-                ingrediente.cantidad -= ing.cantidad * cantidad
-                db.add(ingrediente)
-        
+
+        # Actualizar inventario (falla si otra caja consumió el stock entretanto)
+        _descontar_stock(db, requeridos, faltantes)
+        registrar_venta(db, pedido.fecha.date(), total)
+
+        cambio = cambio_pedido(pedido.id, pedido.fecha, menu_cantidades, nuevo=True)
+        antes_del_commit = time.perf_counter()
         db.commit()
-        print(f"Pedido creado: ID {pedido.id}, Cliente ID {cliente_id}, Menús: {menu_cantidades}")  # Depuración
-        return pedido
     except Exception as e:
         db.rollback()
         print(f"Error al crear pedido: {e}")  # Depuración
         raise
 
+    # Ya guardado: desde aquí un error solo se informa, no deshace el pedido
+    publicar("pedidos", cambios=[cambio], requeridos=requeridos, antes_del_commit=antes_del_commit)
+    try:
+        db.refresh(pedido)
+    except Exception as e:
+        print(f"Error al releer pedido {cambio['pedido_id']}: {e}")  # Depuración
+    print(f"Pedido creado: ID {cambio['pedido_id']}, Cliente ID {cliente_id}, Menús: {menu_cantidades}")  # Depuración
+    return pedido
+
+def crear_pedidos_bulk(db: Session, pedidos: list):
+    """
+    pedidos: lista de dicts con 'descripcion', 'total', 'cliente_id', 'menu_cantidades'
+    y opcionalmente 'fecha'.
+    Toma el bloqueo de escritura, valida el stock de todo el lote en una pasada y
+    guarda los pedidos aceptados en la misma transacción. Retorna una lista de dicts
+    con 'indice', 'ok', 'pedido_id' y 'error', en el mismo orden del lote.
+    """
+    resultados = [{"indice": i, "ok": False, "pedido_id": None, "error": None} for i in range(len(pedidos))]
+    menu_ids = {menu_id for p in pedidos for menu_id in p["menu_cantidades"]}
+
+    try:
+        # Con el bloqueo tomado antes de leer, ninguna otra caja descuenta stock entre
+        # la validación y el UPDATE: un pedido rechazado no aborta el resto del lote
+        abrir_transaccion(db, escritura=True)
+
+        # Recetas y stock de todos los menús del lote (dos consultas)
+        recetas = {}
+        stock = {}
+        if menu_ids:
+            filas = (
+                db.query(ingrediente_menu.c.menu_id, ingrediente_menu.c.ingrediente_id, ingrediente_menu.c.cantidad)
+                .filter(ingrediente_menu.c.menu_id.in_(list(menu_ids)))
+                .all()
+            )
+            for fila in filas:
+                recetas.setdefault(fila.menu_id, []).append((fila.ingrediente_id, fila.cantidad))
+            ingrediente_ids = {fila.ingrediente_id for fila in filas}
+            stock = {
+                i.id: i.cantidad
+                for i in db.query(Ingrediente.id, Ingrediente.cantidad)
+                .filter(Ingrediente.id.in_(list(ingrediente_ids)))
+                .with_for_update()
+                .all()
+            }
+            existentes = {r.id for r in db.query(Menu.id).filter(Menu.id.in_(list(menu_ids))).all()}
+        else:
+            existentes = set()
+
+        # Aceptar pedidos en orden mientras alcance el stock
+        aceptados = []
+        requeridos = {}
+        for i, p in enumerate(pedidos):
+            demanda = {}
+            error = None
+            for menu_id, cantidad in p["menu_cantidades"].items():
+                if menu_id not in existentes:
+                    error = f"Menú con ID {menu_id} no encontrado"
+                    break
+                for ingrediente_id, por_unidad in recetas.get(menu_id, []):
+                    demanda[ingrediente_id] = demanda.get(ingrediente_id, 0) + por_unidad * cantidad
+            if error is None:
+                for ingrediente_id, necesario in demanda.items():
+                    if ingrediente_id not in stock:
+                        error = f"Ingrediente ID {ingrediente_id} no encontrado"
+                        break
+                    if stock[ingrediente_id] < necesario:
+                        error = f"No hay suficiente stock del ingrediente ID {ingrediente_id}"
+                        break
+            if error is not None:
+                resultados[i]["error"] = error
+                continue
+            for ingrediente_id, necesario in demanda.items():
+                stock[ingrediente_id] -= necesario
+                requeridos[ingrediente_id] = requeridos.get(ingrediente_id, 0) + necesario
+            aceptados.append(i)
+
+        if not aceptados:
+            db.rollback()  # Libera el bloqueo
+            return resultados
+
+        _descontar_stock(db, requeridos)
+        filas_pedidos = []
+        ventas = {}
+        for i in aceptados:
+            p = pedidos[i]
+            filas_pedidos.append({
+                "descripcion": p["descripcion"],
+                "total": p["total"],
+                "cliente_id": p["cliente_id"],
+                "fecha": p.get("fecha") or datetime.now()
+            })
+            dia = filas_pedidos[-1]["fecha"].date()
+            venta = ventas.setdefault(dia, {"fecha": dia, "total": 0, "pedidos": 0})
+            venta["total"] += p["total"] or 0
+            venta["pedidos"] += 1
+        # La base asigna los IDs; RETURNING los entrega en el orden de las filas
+        tabla = Pedido.__table__
+        pedido_ids = db.execute(
+            tabla.insert().returning(tabla.c.id, sort_by_parameter_order=True), filas_pedidos
+        ).scalars().all()
+        filas_menus = []
+        for pedido_id, fila, i in zip(pedido_ids, filas_pedidos, aceptados):
+            fila["id"] = pedido_id
+            resultados[i]["pedido_id"] = pedido_id
+            filas_menus.extend(
+                {"pedido_id": pedido_id, "menu_id": menu_id, "cantidad": cantidad}
+                for menu_id, cantidad in pedidos[i]["menu_cantidades"].items()
+            )
+        if filas_menus:
+            db.execute(menu_pedido.insert(), filas_menus)
+        registrar_ventas(db, list(ventas.values()))
+        antes_del_commit = time.perf_counter()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error al crear lote de pedidos: {e}")  # Depuración
+        raise
+
+    publicar(
+        "pedidos",
+        cambios=[cambio_pedido(fila["id"], fila["fecha"], pedidos[i]["menu_cantidades"], nuevo=True) for fila, i in zip(filas_pedidos, aceptados)],
+        requeridos=requeridos,
+        antes_del_commit=antes_del_commit
+    )
+    for i in aceptados:
+        resultados[i]["ok"] = True
+    print(f"Lote de pedidos: {len(aceptados)} creados, {len(pedidos) - len(aceptados)} rechazados")  # Depuración
+    return resultados
+
 def obtener_pedido(db: Session, pedido_id: int):
     return db.query(Pedido).filter(Pedido.id == pedido_id).first()
 
 def listar_pedidos(db: Session):
     return db.query(Pedido).all()
 
+def listar_pedidos_pagina(db: Session, limite: int = 100, despues: tuple = None, antes: tuple = None, cliente_id: int = None):
+    """
+    Una página de pedidos, del más reciente al más antiguo, paginada por clave (fecha, id).
+    despues: clave de la última fila mostrada; retorna las siguientes.
+    antes: clave de la primera fila mostrada; retorna las anteriores (al volver hacia arriba).
+    Retorna filas (id, fecha, total, cliente_nombre) en el orden en que se muestran.
+    El costo depende de `limite`, no de la cantidad de pedidos.
+    """
+    query = (
+        db.query(Pedido.id, Pedido.fecha, Pedido.total, Cliente.nombre.label("cliente_nombre"))
+        .outerjoin(Cliente, Cliente.id == Pedido.cliente_id)
+    )
+    if cliente_id is not None:
+        query = query.filter(Pedido.cliente_id == cliente_id)
+    if antes is not None:
+        fecha, pedido_id = antes
+        # fecha >= x acota el rango del índice; el OR solo resuelve los empates de fecha
+        query = query.filter(Pedido.fecha >= fecha, or_(Pedido.fecha > fecha, Pedido.id > pedido_id))
+        filas = query.order_by(Pedido.fecha.asc(), Pedido.id.asc()).limit(limite).all()
+        return filas[::-1]
+    if despues is not None:
+        fecha, pedido_id = despues
+        query = query.filter(Pedido.fecha <= fecha, or_(Pedido.fecha < fecha, Pedido.id < pedido_id))
+    return query.order_by(Pedido.fecha.desc(), Pedido.id.desc()).limit(limite).all()
+
+def _lineas_pedido(db: Session, pedido_id: int):
+    # menu_id -> cantidad de un pedido
+    filas = db.query(menu_pedido.c.menu_id, menu_pedido.c.cantidad).filter(menu_pedido.c.pedido_id == pedido_id).all()
+    return {f.menu_id: f.cantidad for f in filas}
+
 def actualizar_pedido(db: Session, pedido_id: int, descripcion: str = None, total: float = None, cliente_id: int = None, menu_ids: list = None):
     pedido = db.query(Pedido).filter(Pedido.id == pedido_id).first()
     if not pedido:
@@ -69,12 +274,14 @@ def actualizar_pedido(db: Session, pedido_id: int, descripcion: str = None, tota
     if descripcion:
         pedido.descripcion = descripcion
     if total is not None:
+        registrar_venta(db, pedido.fecha.date(), total - (pedido.total or 0), pedidos=0)
         pedido.total = total
     if cliente_id:
         pedido.cliente_id = cliente_id
     db.commit()
 
     if menu_ids is not None:
+        anteriores = _lineas_pedido(db, pedido_id)
         # Eliminar las relaciones previas de menús
         db.execute(
             menu_pedido.delete().where(menu_pedido.c.pedido_id == pedido_id)
@@ -91,6 +298,13 @@ def actualizar_pedido(db: Session, pedido_id: int, descripcion: str = None, tota
                     )
                 )
         db.commit()
+        cambios = [
+            cambio_pedido(pedido_id, pedido.fecha, anteriores, signo=-1),
+            cambio_pedido(pedido_id, pedido.fecha, _lineas_pedido(db, pedido_id))
+        ]
+    else:
+        cambios = [cambio_pedido(pedido_id, pedido.fecha, signo=0)]
+    publicar("pedidos", cambios=cambios, requeridos={})
     db.refresh(pedido)
     return pedido
 
@@ -98,6 +312,10 @@ def eliminar_pedido(db: Session, pedido_id: int):
     pedido = db.query(Pedido).filter(Pedido.id == pedido_id).first()
     if not pedido:
         return False
+    fecha = pedido.fecha
+    lineas = _lineas_pedido(db, pedido_id)
+    registrar_venta(db, fecha.date(), -(pedido.total or 0), pedidos=-1)
     db.delete(pedido)
     db.commit()
+    publicar("pedidos", cambios=[cambio_pedido(pedido_id, fecha, lineas, signo=-1)], requeridos={})
     return True
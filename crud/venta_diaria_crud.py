@@ -0,0 +1,60 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from models import Pedido, VentaDiaria
+
+# Las funciones de registro no hacen commit: se ejecutan dentro de la
+# transacción del pedido para que el resumen nunca quede desfasado.
+
+def registrar_ventas(db: Session, ventas: list):
+    """
+    ventas: lista de dicts con 'fecha' (date), 'total' y 'pedidos' (variaciones a sumar).
+    Un solo INSERT ... ON CONFLICT para todas las fechas.
+    """
+    if not ventas:
+        return
+    sentencia = insert(VentaDiaria.__table__)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=[VentaDiaria.fecha],
+        set_={
+            "total": VentaDiaria.total + sentencia.excluded.total,
+            "pedidos": VentaDiaria.pedidos + sentencia.excluded.pedidos
+        }
+    )
+    db.execute(sentencia, ventas)
+
+def registrar_venta(db: Session, fecha, total: float, pedidos: int = 1):
+    registrar_ventas(db, [{"fecha": fecha, "total": total or 0, "pedidos": pedidos}])
+
+def listar_ventas_diarias(db: Session, fecha_inicio=None, fecha_fin=None):
+    query = db.query(VentaDiaria.fecha, VentaDiaria.total).filter(VentaDiaria.pedidos > 0)
+    if fecha_inicio:
+        query = query.filter(VentaDiaria.fecha >= fecha_inicio)
+    if fecha_fin:
+        query = query.filter(VentaDiaria.fecha <= fecha_fin)
+    return query.order_by(VentaDiaria.fecha).all()
+
+def reconstruir_ventas_diarias(db: Session):
+    """Recalcula el resumen completo desde la tabla de pedidos (backfill del historial)."""
+    db.query(VentaDiaria).delete()
+    db.execute(
+        VentaDiaria.__table__.insert().from_select(
+            ["fecha", "total", "pedidos"],
+            select(
+                func.date(Pedido.fecha),
+                func.coalesce(func.sum(Pedido.total), 0),
+                func.count(Pedido.id)
+            ).group_by(func.date(Pedido.fecha))
+        )
+    )
+    db.commit()
+    return db.query(VentaDiaria).count()
+
+
+if __name__ == "__main__":
+    # python -m crud.venta_diaria_crud
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        dias = reconstruir_ventas_diarias(db)
+    print(f"Resumen de ventas reconstruido: {dias} días")
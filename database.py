@@ -1,9 +1,111 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///restaurante.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, echo=True)
+SQLALCHEMY_DATABASE_URL = os.environ.get("RESTAURANTE_DB_URL", "sqlite:///restaurante.db")
+
+# Perfiles del motor. Se elige con la variable de entorno RESTAURANTE_DB_PERFIL.
+PERFILES = {
+    # Desarrollo: registra cada sentencia SQL, SQLite con sus valores por defecto
+    "dev": {
+        "echo": True,
+        "pragmas": {},
+        "pool": {}
+    },
+    # Producción: WAL para que las lecturas no bloqueen a la caja que escribe
+    "production": {
+        "echo": False,
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64000,  # 64 MB (negativo = KiB)
+            "mmap_size": 268435456,  # 256 MB
+            "busy_timeout": 5000,  # ms
+            "temp_store": "MEMORY"
+        },
+        "pool": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30}
+    },
+    # Benchmarks: como producción pero sin esperar al disco en cada commit
+    "benchmark": {
+        "echo": False,
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "OFF",
+            "cache_size": -262144,  # 256 MB
+            "mmap_size": 1073741824,  # 1 GB
+            "busy_timeout": 5000,
+            "temp_store": "MEMORY"
+        },
+        "pool": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30}
+    }
+}
+
+
+def _es_memoria(url: str):
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def crear_engine(url: str = None, perfil: str = None, **opciones):
+    """
+    Crea el motor de SQLAlchemy con el perfil indicado (dev, production o benchmark).
+    Sin argumentos usa RESTAURANTE_DB_URL y RESTAURANTE_DB_PERFIL (por defecto
+    'production'). RESTAURANTE_DB_ECHO=1 y RESTAURANTE_DB_POOL_SIZE sobrescriben
+    el perfil. Las opciones extra se pasan a create_engine.
+    """
+    url = url or SQLALCHEMY_DATABASE_URL
+    perfil = perfil or os.environ.get("RESTAURANTE_DB_PERFIL", "production")
+    if perfil not in PERFILES:
+        raise ValueError(f"Perfil de base de datos desconocido: {perfil} (use {', '.join(PERFILES)})")
+    config = PERFILES[perfil]
+
+    echo = config["echo"]
+    if "RESTAURANTE_DB_ECHO" in os.environ:
+        echo = os.environ["RESTAURANTE_DB_ECHO"] not in ("", "0", "false", "False")
+
+    argumentos = {"connect_args": {"check_same_thread": False}, "echo": echo}
+    if _es_memoria(url):
+        # Una base en memoria solo existe dentro de su conexión
+        argumentos["poolclass"] = StaticPool
+    elif config["pool"]:
+        argumentos["poolclass"] = QueuePool
+        argumentos.update(config["pool"])
+        if "RESTAURANTE_DB_POOL_SIZE" in os.environ:
+            argumentos["pool_size"] = int(os.environ["RESTAURANTE_DB_POOL_SIZE"])
+    argumentos.update(opciones)
+
+    nuevo_engine = create_engine(url, **argumentos)
+
+    pragmas = config["pragmas"]
+    if pragmas and url.startswith("sqlite"):
+        @event.listens_for(nuevo_engine, "connect")
+        def _aplicar_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for nombre, valor in pragmas.items():
+                if nombre == "journal_mode" and _es_memoria(url):
+                    continue
+                cursor.execute(f"PRAGMA {nombre}={valor}")
+            cursor.close()
+
+    return nuevo_engine
+
+
+def abrir_transaccion(db, escritura: bool = False):
+    """
+    En SQLite las consultas sueltas no abren transacción: cada una ve su propia
+    instantánea. Abre una explícita para que las lecturas siguientes sean consistentes
+    entre sí; con escritura=True toma además el bloqueo de escritura (BEGIN IMMEDIATE),
+    así lo leído no cambia hasta el commit aunque haya otras cajas.
+    db puede ser una Session o una Connection.
+    """
+    conexion = db if isinstance(db, Connection) else db.connection()
+    if conexion.dialect.name == "sqlite" and not conexion.connection.dbapi_connection.in_transaction:
+        conexion.exec_driver_sql("BEGIN IMMEDIATE" if escritura else "BEGIN")
+
+
+engine = crear_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -12,4 +114,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
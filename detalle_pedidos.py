@@ -0,0 +1,88 @@
+import time
+from sqlalchemy.orm import Session
+from models import Pedido, Menu, menu_pedido
+from eventos import suscribir
+from cache_versionado import CacheVersionado
+
+VECINOS = 10  # Filas a cada lado de la seleccionada que se precargan
+EDAD_MAXIMA = 30.0  # Segundos; pasado este tiempo el detalle se relee (otras cajas pueden editar pedidos)
+
+
+def leer_detalles(db: Session, pedido_ids):
+    """
+    Lee en una sola consulta el detalle de varios pedidos.
+    Retorna dict pedido_id -> {'id', 'fecha', 'total', 'menus': [(cantidad, nombre)]}.
+    """
+    filas = (
+        db.query(Pedido.id, Pedido.fecha, Pedido.total, menu_pedido.c.cantidad, Menu.nombre)
+        .outerjoin(menu_pedido, menu_pedido.c.pedido_id == Pedido.id)
+        .outerjoin(Menu, Menu.id == menu_pedido.c.menu_id)
+        .filter(Pedido.id.in_(list(pedido_ids)))
+        .order_by(Pedido.id, menu_pedido.c.menu_id)
+        .all()
+    )
+    detalles = {}
+    for pedido_id, fecha, total, cantidad, nombre in filas:
+        detalle = detalles.setdefault(pedido_id, {"id": pedido_id, "fecha": fecha, "total": total, "menus": []})
+        if nombre is not None:
+            detalle["menus"].append((cantidad, nombre))
+    return detalles
+
+
+class CacheDetallesPedidos(CacheVersionado):
+    """
+    LRU acotado de detalles de pedidos. Cada cambio de pedidos o de nombres de menú
+    sube la versión; una precarga que leyó con una versión anterior no se guarda.
+    Los cambios de otras cajas no llegan como evento: cada entrada guarda cuándo se
+    leyó y pasados edad_maxima segundos se vuelve a leer.
+    """
+
+    def __init__(self, maximo: int = 512, edad_maxima: float = EDAD_MAXIMA):
+        super().__init__(maximo)
+        self._edad_maxima = edad_maxima
+
+    def _vigente(self, pedido_id: int, ahora: float):
+        # Llamar con el lock tomado. Retorna el detalle o None si falta o está vencido
+        entrada = self._entradas.get(pedido_id)
+        if entrada is None or ahora - entrada[0] >= self._edad_maxima:
+            return None
+        return entrada[1]
+
+    def _leer(self, db: Session, version: int, pedido_ids):
+        leido_en = time.monotonic()  # Antes de la consulta: la edad nunca se subestima
+        detalles = leer_detalles(db, pedido_ids)
+        self._guardar(version, {pedido_id: (leido_en, detalle) for pedido_id, detalle in detalles.items()})
+        return detalles
+
+    def obtener(self, db: Session, pedido_id: int):
+        """Detalle de un pedido (None si no existe); consulta la base solo si no está en cache o venció."""
+        with self._lock:
+            detalle = self._vigente(pedido_id, time.monotonic())
+            if detalle is not None:
+                self._entradas.move_to_end(pedido_id)
+                return detalle
+            version = self.version
+        return self._leer(db, version, [pedido_id]).get(pedido_id)
+
+    def precargar(self, db: Session, pedido_ids):
+        """Lee en una consulta los pedidos de pedido_ids que falten o vencieron. Retorna cuántos leyó."""
+        with self._lock:
+            ahora = time.monotonic()
+            faltantes = [i for i in pedido_ids if self._vigente(i, ahora) is None]
+            version = self.version
+        if not faltantes:
+            return 0
+        return len(self._leer(db, version, faltantes))
+
+    def registrar_pedidos(self, pedido_ids):
+        """Descarta los pedidos editados o eliminados."""
+        with self._lock:
+            self.version += 1
+            for pedido_id in pedido_ids:
+                self._entradas.pop(pedido_id, None)
+
+
+cache_detalles_pedidos = CacheDetallesPedidos()
+suscribir("pedidos", lambda cambios, **_: cache_detalles_pedidos.registrar_pedidos([c["pedido_id"] for c in cambios]))
+# El detalle muestra el nombre del menú
+suscribir("menus", lambda accion, **_: accion != "creado" and cache_detalles_pedidos.invalidar())
@@ -0,0 +1,38 @@
+"""
+Avisos posteriores al commit. Los crud publican qué cambió y los caches en memoria
+se suscriben al importarse, así la capa crud no depende de ellos.
+Un suscriptor que falla solo se informa por consola: el cambio ya está guardado.
+Eventos (argumentos con nombre):
+    pedidos:      cambios (lista de cambio_pedido), requeridos, antes_del_commit
+    menus:        menu_id, nombre, accion
+    ingredientes: ingrediente_id, nombre, cantidad, accion, renombrado
+    clientes:     cliente_id, nombre, correo, accion
+accion es 'creado', 'actualizado' o 'eliminado' (nombre y demás valen None al eliminar).
+"""
+_suscriptores = {}  # evento -> [(orden, función)]
+
+
+def suscribir(evento: str, funcion, orden: int = 0):
+    """
+    orden: los menores se ejecutan primero. Los datos en memoria (ranking, stock)
+    usan 0 y los caches que se calculan a partir de ellos (gráficos) usan 1.
+    """
+    suscriptores = _suscriptores.setdefault(evento, [])
+    suscriptores.append((orden, funcion))
+    suscriptores.sort(key=lambda s: s[0])
+
+
+def publicar(evento: str, **datos):
+    for _, funcion in list(_suscriptores.get(evento, [])):
+        try:
+            funcion(**datos)
+        except Exception as e:
+            print(f"Error en suscriptor de '{evento}' ({getattr(funcion, '__name__', funcion)}): {e}")  # Depuración
+
+
+def cambio_pedido(pedido_id: int, fecha, menu_cantidades: dict = None, signo: int = 1, nuevo: bool = False):
+    """
+    Líneas de un pedido que se suman (signo=1) o se retiran (signo=-1); signo=0 es una
+    edición sin cambio de menús. nuevo=True solo para el alta del pedido.
+    """
+    return {"pedido_id": pedido_id, "fecha": fecha, "menu_cantidades": menu_cantidades or {}, "signo": signo, "nuevo": nuevo}
@@ -0,0 +1,211 @@
+"""
+Exportación de pedidos y su detalle para contabilidad y herramientas de BI.
+Una fila por línea de pedido (Pedido + menu_pedido + Menu), leída por lotes con
+un cursor en streaming: la memoria depende del tamaño del lote, no del historial.
+Formatos: csv, y parquet / arrow si está instalado pyarrow.
+Uso:
+    python exportar.py pedidos.csv                    exporta todo el historial
+    python exportar.py pedidos.parquet --desde-id 500 solo pedidos con id > 500
+    python exportar.py carpeta/ --incremental         solo lo nuevo desde la última exportación
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import Pedido, Menu, menu_pedido
+
+TAMANO_LOTE = 10000
+FORMATOS = ("csv", "parquet", "arrow")
+ARCHIVO_ESTADO = "estado_exportacion.json"
+
+COLUMNAS = [
+    "pedido_id", "fecha", "cliente_id", "descripcion", "total",
+    "menu_id", "menu_nombre", "cantidad", "precio_unitario", "subtotal"
+]
+
+
+def consulta_lineas(desde_id: int = 0):
+    """SELECT de las líneas de pedido con id > desde_id, ordenadas por pedido."""
+    return (
+        select(
+            Pedido.id.label("pedido_id"), Pedido.fecha, Pedido.cliente_id, Pedido.descripcion, Pedido.total,
+            menu_pedido.c.menu_id, Menu.nombre.label("menu_nombre"), menu_pedido.c.cantidad,
+            Menu.precio.label("precio_unitario")
+        )
+        .select_from(Pedido)
+        .outerjoin(menu_pedido, menu_pedido.c.pedido_id == Pedido.id)
+        .outerjoin(Menu, Menu.id == menu_pedido.c.menu_id)
+        .where(Pedido.id > desde_id)
+        .order_by(Pedido.id, menu_pedido.c.menu_id)
+    )
+
+
+def iterar_lotes(db: Session, desde_id: int = 0, tamano_lote: int = TAMANO_LOTE):
+    """
+    Genera listas de hasta tamano_lote diccionarios con las COLUMNAS.
+    yield_per activa stream_results: las filas se van leyendo del cursor, nunca con .all().
+    """
+    resultado = db.execute(consulta_lineas(desde_id).execution_options(yield_per=tamano_lote))
+    for particion in resultado.mappings().partitions():
+        lote = []
+        for fila in particion:
+            linea = dict(fila)
+            if linea["cantidad"] is not None and linea["precio_unitario"] is not None:
+                linea["subtotal"] = linea["cantidad"] * linea["precio_unitario"]
+            else:
+                linea["subtotal"] = None
+            lote.append(linea)
+        yield lote
+
+
+def formato_desde_ruta(ruta: str):
+    extension = os.path.splitext(ruta)[1].lstrip(".").lower()
+    if extension == "feather":
+        extension = "arrow"
+    if extension not in FORMATOS:
+        raise ValueError(f"No se reconoce el formato de '{ruta}' (use {', '.join(FORMATOS)})")
+    return extension
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Para exportar a Parquet o Arrow instale pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+class _EscritorCSV:
+    def __init__(self, ruta):
+        self.archivo = open(ruta, "w", newline="", encoding="utf-8")
+        self.escritor = csv.DictWriter(self.archivo, fieldnames=COLUMNAS)
+        self.escritor.writeheader()
+
+    def escribir(self, lote):
+        for linea in lote:
+            if linea["fecha"] is not None:
+                linea["fecha"] = linea["fecha"].isoformat(sep=" ")
+        self.escritor.writerows(lote)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class _EscritorArrow:
+    """Escribe cada lote como un row group (Parquet) o un record batch (Arrow IPC)."""
+
+    def __init__(self, ruta, formato):
+        pa = _pyarrow()
+        self.pa = pa
+        self.esquema = pa.schema([
+            ("pedido_id", pa.int64()), ("fecha", pa.timestamp("us")), ("cliente_id", pa.int64()),
+            ("descripcion", pa.string()), ("total", pa.float64()), ("menu_id", pa.int64()),
+            ("menu_nombre", pa.string()), ("cantidad", pa.int64()), ("precio_unitario", pa.float64()),
+            ("subtotal", pa.float64())
+        ])
+        if formato == "parquet":
+            self.escritor = pa.parquet.ParquetWriter(ruta, self.esquema)
+        else:
+            self.escritor = pa.ipc.new_file(ruta, self.esquema)
+
+    def escribir(self, lote):
+        columnas = {nombre: [linea[nombre] for linea in lote] for nombre in COLUMNAS}
+        self.escritor.write_table(self.pa.table(columnas, schema=self.esquema))
+
+    def cerrar(self):
+        self.escritor.close()
+
+
+def exportar_pedidos(db: Session, ruta: str, formato: str = None, desde_id: int = 0, tamano_lote: int = TAMANO_LOTE):
+    """
+    Exporta las líneas de los pedidos con id > desde_id a un archivo.
+    Retorna dict con filas, pedidos, ultimo_id (el mayor id exportado) y segundos.
+    """
+    formato = formato or formato_desde_ruta(ruta)
+    inicio = time.perf_counter()
+    # Se escribe a un temporal y se renombra al final: nunca queda un archivo a medias
+    temporal = ruta + ".tmp"
+    escritor = _EscritorCSV(temporal) if formato == "csv" else _EscritorArrow(temporal, formato)
+    filas = 0
+    pedidos = 0
+    ultimo_id = desde_id
+    try:
+        for lote in iterar_lotes(db, desde_id, tamano_lote):
+            for linea in lote:
+                if linea["pedido_id"] != ultimo_id:
+                    pedidos += 1
+                    ultimo_id = linea["pedido_id"]
+            escritor.escribir(lote)
+            filas += len(lote)
+    except Exception:
+        escritor.cerrar()
+        os.remove(temporal)
+        raise
+    escritor.cerrar()
+    os.replace(temporal, ruta)
+    return {"ruta": ruta, "filas": filas, "pedidos": pedidos, "ultimo_id": ultimo_id, "segundos": time.perf_counter() - inicio}
+
+
+def leer_estado(carpeta: str):
+    ruta = os.path.join(carpeta, ARCHIVO_ESTADO)
+    if not os.path.exists(ruta):
+        return {"ultimo_id": 0}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def exportar_incremental(db: Session, carpeta: str, formato: str = "csv", tamano_lote: int = TAMANO_LOTE):
+    """
+    Exporta solo los pedidos con id mayor al último exportado en carpeta, a un archivo
+    nuevo pedidos_<desde>_<hasta>.<formato>. El estado se guarda en estado_exportacion.json
+    después de escribir el archivo. Retorna el resumen de exportar_pedidos, o None si no hay
+    pedidos nuevos.
+    Nota: los pedidos ya exportados que se modifiquen después no se vuelven a exportar.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    desde_id = leer_estado(carpeta)["ultimo_id"]
+    hasta_id = db.execute(select(Pedido.id).order_by(Pedido.id.desc()).limit(1)).scalar()
+    if hasta_id is None or hasta_id <= desde_id:
+        return None
+
+    ruta = os.path.join(carpeta, f"pedidos_{desde_id + 1:08d}_{hasta_id:08d}.{formato}")
+    resumen = exportar_pedidos(db, ruta, formato, desde_id, tamano_lote)
+    if resumen["ultimo_id"] != hasta_id:
+        # Llegaron pedidos durante la exportación: el nombre debe reflejar lo escrito
+        nueva_ruta = os.path.join(carpeta, f"pedidos_{desde_id + 1:08d}_{resumen['ultimo_id']:08d}.{formato}")
+        os.replace(ruta, nueva_ruta)
+        resumen["ruta"] = nueva_ruta
+
+    temporal = os.path.join(carpeta, ARCHIVO_ESTADO + ".tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"ultimo_id": resumen["ultimo_id"], "archivo": os.path.basename(resumen["ruta"])}, f)
+    os.replace(temporal, os.path.join(carpeta, ARCHIVO_ESTADO))
+    return resumen
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Exporta pedidos y su detalle a CSV, Parquet o Arrow")
+    parser.add_argument("salida", help="Archivo de salida, o carpeta con --incremental")
+    parser.add_argument("--formato", choices=FORMATOS, default=None, help="Por defecto se deduce de la extensión")
+    parser.add_argument("--desde-id", type=int, default=0, help="Exportar solo pedidos con id mayor a este")
+    parser.add_argument("--incremental", action="store_true", help="Continuar desde la última exportación en la carpeta")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por lote")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.incremental:
+            resumen = exportar_incremental(db, args.salida, args.formato or "csv", args.lote)
+        else:
+            resumen = exportar_pedidos(db, args.salida, args.formato, args.desde_id, args.lote)
+    if resumen is None:
+        print("No hay pedidos nuevos para exportar.")
+    else:
+        print(f"{resumen['pedidos']} pedidos ({resumen['filas']} líneas) en {resumen['ruta']} "
+              f"en {resumen['segundos']:.2f} s. Último id: {resumen['ultimo_id']}")
@@ -1,75 +1,165 @@
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from matplotlib.figure import Figure
+from matplotlib.ticker import AutoLocator
 from models import Pedido, Menu, Ingrediente, ingrediente_menu, menu_pedido
-import matplotlib.pyplot as plt
-
-def grafico_ventas_por_fecha(db: Session, fecha_inicio=None, fecha_fin=None):
-    fig, ax = plt.subplots(figsize=(8, 5))
-    query = db.query(func.date(Pedido.fecha).label("fecha"), func.sum(Pedido.total).label("total"))
-    if fecha_inicio and fecha_fin:
-        query = query.filter(Pedido.fecha.between(fecha_inicio, fecha_fin))
-    query = query.group_by(func.date(Pedido.fecha)).order_by(func.date(Pedido.fecha))
-    resultados = query.all()
+from crud.venta_diaria_crud import listar_ventas_diarias
+from mas_vendidos import ranking_menus
+
+# Apariencia de cada gráfico: color, título, eje x, eje y y mensaje sin datos
+ESTILOS = {
+    "ventas": ("skyblue", "Ventas por Fecha", "Fecha", "Total ($)", "No hay datos para el rango seleccionado"),
+    "menus": ("lightgreen", "Menús Más Vendidos", "Menú", "Cantidad Vendida", "No hay datos de menús vendidos"),
+    "ingredientes": ("salmon", "Ingredientes Más Utilizados", "Ingrediente", "Cantidad Utilizada", "No hay datos de ingredientes utilizados"),
+}
+
+def crear_figura():
+    # Figura sin pyplot: se puede armar fuera del hilo de Tk
+    return Figure(figsize=(8, 5), tight_layout=True)
+
+# --- Consultas: retornan (etiquetas, valores) sin dibujar nada ---
+
+def datos_ventas_por_fecha(db: Session, fecha_inicio=None, fecha_fin=None):
+    # Se lee el resumen diario: el costo depende de los días mostrados, no de los pedidos
+    resultados = listar_ventas_diarias(
+        db,
+        fecha_inicio.date() if fecha_inicio else None,
+        fecha_fin.date() if fecha_fin else None
+    )
+    return [r.fecha.strftime("%Y-%m-%d") for r in resultados], [r.total for r in resultados]
 
-    if not resultados:
-        ax.text(0.5, 0.5, "No hay datos para el rango seleccionado", ha="center", va="center")
-        return fig
-
-    fechas = [r.fecha for r in resultados]
-    totales = [r.total for r in resultados]
-    ax.bar(fechas, totales, color="skyblue")
-    ax.set_title("Ventas por Fecha")
-    ax.set_xlabel("Fecha")
-    ax.set_ylabel("Total ($)")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    return fig
-
-def grafico_menus_mas_vendidos(db: Session):
-    fig, ax = plt.subplots(figsize=(8, 5))
-    resultados = (
-        db.query(Menu.nombre, func.sum(menu_pedido.c.cantidad).label("total_vendido"))
+def _filtrar_fechas(query, fecha_inicio=None, fecha_fin=None):
+    # Rango sobre Pedido.fecha (usa ix_pedidos_fecha); fecha_fin incluye el día completo
+    if fecha_inicio:
+        query = query.filter(Pedido.fecha >= datetime.combine(fecha_inicio.date(), datetime.min.time()))
+    if fecha_fin:
+        query = query.filter(Pedido.fecha < datetime.combine(fecha_fin.date() + timedelta(days=1), datetime.min.time()))
+    return query
+
+def datos_menus_mas_vendidos(db: Session, top_n: int = None, dias: int = None, fecha_inicio=None, fecha_fin=None):
+    """
+    top_n: cantidad de menús a mostrar (None = todos).
+    dias: solo los últimos 7 o 30 días, contando hoy (None = histórico).
+    fecha_inicio / fecha_fin: rango arbitrario; siempre se consulta la base.
+    Si el ranking en memoria está cargado se usa; si no, se consulta la base.
+    """
+    con_rango = fecha_inicio is not None or fecha_fin is not None
+    if not con_rango:
+        ranking_menus.sincronizar(db)  # Suma los pedidos de otras cajas
+    if not con_rango and ranking_menus.disponible(dias):
+        top = ranking_menus.top(top_n, dias)
+        nombres = dict(db.query(Menu.id, Menu.nombre).filter(Menu.id.in_([menu_id for menu_id, _ in top])).all())
+        top = [(menu_id, cantidad) for menu_id, cantidad in top if menu_id in nombres]
+        return [nombres[menu_id] for menu_id, _ in top], [cantidad for _, cantidad in top]
+
+    total_vendido = func.sum(menu_pedido.c.cantidad)
+    query = (
+        db.query(Menu.nombre, total_vendido.label("total_vendido"))
         .join(menu_pedido, Menu.id == menu_pedido.c.menu_id)
-        .group_by(Menu.nombre)
-        .order_by(func.sum(menu_pedido.c.cantidad).desc())
-        .all()
     )
+    if dias and not con_rango:
+        fecha_inicio = datetime.now() - timedelta(days=dias - 1)
+    if fecha_inicio or fecha_fin:
+        query = query.join(Pedido, Pedido.id == menu_pedido.c.pedido_id)
+        query = _filtrar_fechas(query, fecha_inicio, fecha_fin)
+    query = query.group_by(Menu.id, Menu.nombre).order_by(total_vendido.desc(), Menu.id)
+    if top_n:
+        query = query.limit(top_n)
+    resultados = query.all()
+    return [r.nombre for r in resultados], [r.total_vendido for r in resultados]
 
-    if not resultados:
-        ax.text(0.5, 0.5, "No hay datos de menús vendidos", ha="center", va="center")
-        return fig
-
-    menus = [r.nombre for r in resultados]
-    cantidades = [r.total_vendido for r in resultados]
-    ax.bar(menus, cantidades, color="lightgreen")
-    ax.set_title("Menús Más Vendidos")
-    ax.set_xlabel("Menú")
-    ax.set_ylabel("Cantidad Vendida")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    return fig
-
-def grafico_ingredientes_mas_utilizados(db: Session):
-    fig, ax = plt.subplots(figsize=(8, 5))
-    resultados = (
-        db.query(Ingrediente.nombre, func.sum(ingrediente_menu.c.cantidad * menu_pedido.c.cantidad).label("total_usado"))
+def datos_ingredientes_mas_utilizados(db: Session, fecha_inicio=None, fecha_fin=None):
+    total_usado = func.sum(ingrediente_menu.c.cantidad * menu_pedido.c.cantidad)
+    query = (
+        db.query(Ingrediente.nombre, total_usado.label("total_usado"))
         .join(ingrediente_menu, Ingrediente.id == ingrediente_menu.c.ingrediente_id)
         .join(menu_pedido, ingrediente_menu.c.menu_id == menu_pedido.c.menu_id)
-        .group_by(Ingrediente.nombre)
-        .order_by(func.sum(ingrediente_menu.c.cantidad * menu_pedido.c.cantidad).desc())
-        .all()
     )
+    if fecha_inicio or fecha_fin:
+        query = query.join(Pedido, Pedido.id == menu_pedido.c.pedido_id)
+        query = _filtrar_fechas(query, fecha_inicio, fecha_fin)
+    resultados = query.group_by(Ingrediente.nombre).order_by(total_usado.desc()).all()
+    return [r.nombre for r in resultados], [r.total_usado for r in resultados]
+
+# --- Dibujo: actualiza los artistas de un Axes existente ---
+
+def dibujar_barras(ax, estilo: str, etiquetas, valores):
+    """
+    Dibuja o actualiza el gráfico de barras en ax. Si la cantidad de barras no
+    cambia solo se ajustan alturas y textos; no se crea una figura nueva.
+    """
+    color, titulo, xlabel, ylabel, mensaje_vacio = ESTILOS[estilo]
+    for texto in list(ax.texts):
+        texto.remove()
+
+    barras = ax.containers[0] if ax.containers else None
+    if barras is not None and len(barras) != len(valores):
+        barras.remove()
+        barras = None
+
+    if not valores:
+        ax.set_title("")
+        ax.set_xlabel("")
+        ax.set_ylabel("")
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.text(0.5, 0.5, mensaje_vacio, ha="center", va="center")
+        return
+
+    if barras is None:
+        # Posiciones numéricas: el eje categórico acumularía etiquetas entre gráficos
+        ax.bar(range(len(valores)), valores, color=color)
+    else:
+        for barra, valor in zip(barras, valores):
+            barra.set_height(valor)
+            barra.set_facecolor(color)
+
+    ax.set_title(titulo)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_xticks(range(len(etiquetas)))
+    ax.set_xticklabels(etiquetas, rotation=45)
+    ax.set_xlim(-0.5, len(valores) - 0.5)
+    ax.set_ylim(0, max(max(valores), 0) * 1.05 or 1)
+    ax.yaxis.set_major_locator(AutoLocator())
+
+DIAS_SEMANA = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+
+def dibujar_mapa_calor(ax, mapa, titulo: str = "Pedidos por Día y Hora"):
+    """mapa: matriz 7 x 24 (lunes a domingo x hora), ver analitica.mapa_calor_horas."""
+    ax.clear()
+    imagen = ax.imshow(mapa, aspect="auto", cmap="YlOrRd")
+    ax.set_title(titulo)
+    ax.set_xlabel("Hora")
+    ax.set_ylabel("Día")
+    ax.set_xticks(range(0, 24, 2))
+    ax.set_yticks(range(7))
+    ax.set_yticklabels(DIAS_SEMANA)
+    ax.figure.colorbar(imagen, ax=ax)
+
+def _ejes(ax):
+    if ax is None:
+        # pyplot solo se importa aquí: el resto del módulo funciona sin interfaz gráfica
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=(8, 5), tight_layout=True)
+    return ax
+
+# Funciones originales: sin ax crean una figura de pyplot; con ax la actualizan en su lugar
+
+def grafico_ventas_por_fecha(db: Session, fecha_inicio=None, fecha_fin=None, ax=None):
+    ax = _ejes(ax)
+    dibujar_barras(ax, "ventas", *datos_ventas_por_fecha(db, fecha_inicio, fecha_fin))
+    return ax.figure
+
+def grafico_menus_mas_vendidos(db: Session, top_n: int = None, dias: int = None, ax=None):
+    ax = _ejes(ax)
+    dibujar_barras(ax, "menus", *datos_menus_mas_vendidos(db, top_n, dias))
+    return ax.figure
 
-    if not resultados:
-        ax.text(0.5, 0.5, "No hay datos de ingredientes utilizados", ha="center", va="center")
-        return fig
-
-    ingredientes = [r.nombre for r in resultados]
-    cantidades = [r.total_usado for r in resultados]
-    ax.bar(ingredientes, cantidades, color="salmon")
-    ax.set_title("Ingredientes Más Utilizados")
-    ax.set_xlabel("Ingrediente")
-    ax.set_ylabel("Cantidad Utilizada")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    return fig
\ No newline at end of file
+def grafico_ingredientes_mas_utilizados(db: Session, ax=None):
+    ax = _ejes(ax)
+    dibujar_barras(ax, "ingredientes", *datos_ingredientes_mas_utilizados(db))
+    return ax.figure
@@ -0,0 +1,207 @@
+import threading
+import time
+import numpy as np
+from sqlalchemy.orm import Session
+from models import Ingrediente, Menu, ingrediente_menu
+from eventos import suscribir
+
+
+class MatrizRecetas:
+    """
+    Cache de la matriz menú x ingrediente (cantidad requerida por unidad de menú),
+    del vector de stock y de las porciones vendibles de cada menú. Se carga con tres
+    consultas y se invalida cuando cambian las recetas; los pedidos y la reposición
+    de stock solo recalculan los menús afectados.
+    _cargado_en marca cuándo terminó la última lectura de stock: un pedido confirmado
+    después de esa marca se descuenta, uno anterior ya estaba incluido en la lectura.
+    La carga se hace fuera del lock; cada cambio sube `version` y una carga que empezó
+    con una versión anterior no se guarda (como en CacheVersionado).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = None
+        self._cargado_en = 0.0
+        self.version = 0
+
+    def invalidar(self):
+        with self._lock:
+            self._descartar()
+
+    def _descartar(self):
+        # Llamar con el lock tomado
+        self.version += 1
+        self._datos = None
+
+    def _cargar(self, db: Session):
+        menu_ids = [m.id for m in db.query(Menu.id).order_by(Menu.id).all()]
+        ingredientes = db.query(Ingrediente.id, Ingrediente.nombre, Ingrediente.cantidad).order_by(Ingrediente.id).all()
+        fila = {menu_id: i for i, menu_id in enumerate(menu_ids)}
+        columna = {ing.id: j for j, ing in enumerate(ingredientes)}
+
+        matriz = np.zeros((len(menu_ids), len(ingredientes)))
+        faltantes = {}  # menu_id -> ingrediente_id referenciado que ya no existe
+        for r in db.query(ingrediente_menu).all():
+            if r.menu_id not in fila:
+                continue
+            if r.ingrediente_id not in columna:
+                faltantes.setdefault(r.menu_id, r.ingrediente_id)
+                continue
+            matriz[fila[r.menu_id], columna[r.ingrediente_id]] = r.cantidad
+
+        stock = np.array([ing.cantidad for ing in ingredientes], dtype=float)
+        nombres = [ing.nombre for ing in ingredientes]
+        return {
+            "fila": fila,
+            "columna": columna,
+            "matriz": matriz,
+            "stock": stock,
+            "nombres": nombres,
+            "faltantes": faltantes,
+            "porciones": _porciones(matriz, stock)
+        }
+
+    def datos(self, db: Session):
+        datos = self._datos
+        if datos is not None:
+            return datos
+        with self._lock:
+            version = self.version
+        datos = self._cargar(db)
+        with self._lock:
+            if version == self.version:
+                self._datos = datos
+                self._cargado_en = time.perf_counter()
+        # Si cambió algo durante la carga se responde con lo leído, sin guardarlo
+        return datos
+
+    def refrescar_stock(self, db: Session):
+        """
+        Relee solo el stock (una consulta) para ver lo que vendieron o repusieron otras
+        cajas. Si cambió el conjunto de ingredientes se descarta y se recarga todo.
+        """
+        with self._lock:
+            datos = self._datos
+            if datos is None:
+                return
+            filas = db.query(Ingrediente.id, Ingrediente.cantidad).order_by(Ingrediente.id).all()
+            if [f.id for f in filas] != list(datos["columna"]):
+                self._descartar()
+                return
+            datos["stock"][:] = [f.cantidad for f in filas]
+            datos["porciones"][:] = _porciones(datos["matriz"], datos["stock"])
+            self._cargado_en = time.perf_counter()
+
+    def _recalcular(self, datos, columnas: list):
+        # Solo los menús que usan alguno de los ingredientes modificados
+        filas = np.flatnonzero((datos["matriz"][:, columnas] > 0).any(axis=1))
+        if filas.size:
+            datos["porciones"][filas] = _porciones(datos["matriz"][filas], datos["stock"])
+
+    def descontar(self, requeridos: dict, antes_del_commit: float = None):
+        """
+        Aplica al cache el consumo de un pedido confirmado (ingrediente_id -> cantidad).
+        antes_del_commit: time.perf_counter() tomado justo antes del commit. Si el stock
+        se leyó después, puede que ya incluya el pedido: se recarga en vez de descontar.
+        """
+        if not requeridos:
+            return
+        with self._lock:
+            datos = self._datos
+            if datos is None:
+                self.version += 1  # Una carga en curso pudo leer el stock anterior
+                return
+            if antes_del_commit is not None and self._cargado_en >= antes_del_commit:
+                self._descartar()
+                return
+            if any(ingrediente_id not in datos["columna"] for ingrediente_id in requeridos):
+                self._descartar()
+                return
+            columnas = [datos["columna"][ingrediente_id] for ingrediente_id in requeridos]
+            datos["stock"][columnas] -= np.array([float(v) for v in requeridos.values()])
+            self._recalcular(datos, columnas)
+
+    def actualizar_ingrediente(self, ingrediente_id: int, nombre: str, cantidad: float):
+        """Reposición o edición de un ingrediente ya existente."""
+        with self._lock:
+            datos = self._datos
+            if datos is None:
+                self.version += 1
+                return
+            if ingrediente_id not in datos["columna"]:
+                self._descartar()
+                return
+            j = datos["columna"][ingrediente_id]
+            datos["nombres"][j] = nombre
+            datos["stock"][j] = cantidad
+            self._recalcular(datos, [j])
+
+    def porciones_disponibles(self, db: Session):
+        """
+        Retorna dict menu_id -> porciones que permite el stock actual.
+        None indica un menú sin receta (sin límite de stock).
+        """
+        datos = self.datos(db)
+        return {
+            menu_id: (None if np.isinf(datos["porciones"][i]) else int(datos["porciones"][i]))
+            for menu_id, i in datos["fila"].items()
+        }
+
+    def vector_carrito(self, datos, carrito: dict):
+        """carrito: dict menu_id -> cantidad"""
+        vector = np.zeros(len(datos["fila"]))
+        for menu_id, cantidad in carrito.items():
+            if menu_id in datos["fila"]:
+                vector[datos["fila"][menu_id]] += cantidad
+        return vector
+
+    def verificar_agregado(self, db: Session, carrito: dict, menu_id: int):
+        """
+        Verifica si el carrito admite una unidad más de menu_id.
+        Retorna None si hay stock, o un dict con 'nombre', 'disponible' y 'requerido'
+        del primer ingrediente insuficiente. Lanza ValueError si la receta
+        referencia un ingrediente inexistente.
+        """
+        datos = self.datos(db)
+        if menu_id in datos["faltantes"]:
+            raise ValueError(f"Ingrediente ID {datos['faltantes'][menu_id]} no encontrado")
+        carrito = dict(carrito)
+        carrito[menu_id] = carrito.get(menu_id, 0) + 1
+        requerido = self.vector_carrito(datos, carrito) @ datos["matriz"]
+        insuficientes = np.flatnonzero(requerido > datos["stock"])
+        if insuficientes.size == 0:
+            return None
+        j = insuficientes[0]
+        return {
+            "nombre": datos["nombres"][j],
+            "disponible": float(datos["stock"][j]),
+            "requerido": float(requerido[j])
+        }
+
+
+def _porciones(matriz, stock):
+    # Mínimo, sobre los ingredientes de cada receta, de floor(stock / requerido)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cociente = np.where(matriz > 0, np.floor(np.maximum(stock, 0) / matriz), np.inf)
+    if cociente.shape[1] == 0:
+        return np.full(cociente.shape[0], np.inf)
+    return cociente.min(axis=1)
+
+
+matriz_recetas = MatrizRecetas()
+suscribir("pedidos", lambda requeridos, antes_del_commit=None, **_: matriz_recetas.descontar(requeridos, antes_del_commit))
+suscribir("menus", lambda **_: matriz_recetas.invalidar())  # Cambió una receta o la lista de menús
+
+
+def _al_cambiar_ingrediente(ingrediente_id, nombre, cantidad, accion, **_):
+    if accion == "actualizado":
+        matriz_recetas.actualizar_ingrediente(ingrediente_id, nombre, cantidad)
+    else:
+        matriz_recetas.invalidar()
+
+
+suscribir("ingredientes", _al_cambiar_ingrediente)
+
+
+def invalidar_cache():
+    matriz_recetas.invalidar()
@@ -1,7 +1,6 @@
-from database import Base, engine
-import models
+from migraciones import migrar
 
-# Crea todas las tablas en la base de datos
-print("Creando tablas...")
-Base.metadata.create_all(bind=engine)
-print("¡Listo! Tablas creadas.")
+# Crea las tablas que falten y aplica las migraciones pendientes (índices, columnas, backfills)
+print("Aplicando migraciones...")
+aplicadas = migrar()
+print("¡Listo! Esquema al día." if not aplicadas else f"¡Listo! Migraciones aplicadas: {aplicadas}")
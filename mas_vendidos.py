@@ -0,0 +1,243 @@
+"""
+Ranking en memoria de los menús más vendidos: histórico y ventanas móviles
+(últimos 7 y 30 días). Los contadores se actualizan al confirmar, editar o
+eliminar pedidos, y el top-K se responde sin consultar la base. Los pedidos
+creados por otras cajas se suman con sincronizar().
+"""
+import heapq
+import threading
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import abrir_transaccion
+from models import Pedido, menu_pedido
+from eventos import suscribir
+
+VENTANAS = (7, 30)  # días, contando hoy
+TAMANO_BLOQUE = 20000  # pedidos por consulta al reconstruir el histórico
+
+
+class ContadorTopK:
+    """
+    Contadores por clave con un heap de máximos perezoso: cada cambio agrega una
+    entrada nueva y las viejas se descartan al aparecer en la cima. top(k) saca k
+    entradas vigentes y las devuelve al heap, O(k log n) amortizado.
+    """
+
+    def __init__(self):
+        self.valores = {}
+        self._heap = []
+
+    def sumar(self, clave, delta):
+        valor = self.valores.get(clave, 0) + delta
+        if valor <= 0:
+            self.valores.pop(clave, None)
+        else:
+            self.valores[clave] = valor
+            heapq.heappush(self._heap, (-valor, clave))
+        if len(self._heap) > 2 * len(self.valores) + 64:
+            self._compactar()
+
+    def descartar(self, clave):
+        self.valores.pop(clave, None)
+
+    def _compactar(self):
+        self._heap = [(-valor, clave) for clave, valor in self.valores.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, k: int):
+        """Lista de (clave, valor) de mayor a menor; empates por clave ascendente."""
+        resultado = []
+        vistos = set()
+        while self._heap and len(resultado) < k:
+            negativo, clave = heapq.heappop(self._heap)
+            if clave in vistos or self.valores.get(clave) != -negativo:
+                continue  # Entrada vieja o repetida
+            vistos.add(clave)
+            resultado.append((clave, -negativo))
+        for clave, valor in resultado:
+            heapq.heappush(self._heap, (-valor, clave))
+        return resultado
+
+    def __len__(self):
+        return len(self.valores)
+
+
+class RankingMenus:
+    """
+    Unidades vendidas por menú. Estados: 'vacio' (sin cargar), 'parcial' (ventanas
+    listas, histórico a medio reconstruir) y 'completo'.
+    El histórico se reconstruye por bloques de IDs de pedido hasta _hasta_id; mientras
+    tanto, los cambios de pedidos en bloques todavía no leídos se ignoran porque la
+    lectura del bloque ya los verá.
+    _visto_hasta es el mayor ID cuyo alta ya está sumada (leída de la base); las altas
+    posteriores avisadas por esta caja quedan en _avisados hasta que sincronizar() pase
+    por ellas. En SQLite los IDs se asignan en el orden de los commits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.invalidar()
+
+    def invalidar(self):
+        self.estado = "vacio"
+        self.total = ContadorTopK()
+        self.ventanas = {dias: ContadorTopK() for dias in VENTANAS}
+        self._por_dia = {}  # date -> {menu_id: cantidad}, solo los días de la ventana más larga
+        self._hoy = None
+        self._hasta_id = 0
+        self._leido_hasta = 0
+        self._visto_hasta = 0
+        self._avisados = set()
+
+    def _avanzar(self, hoy: date):
+        """Saca de cada ventana los días que quedaron fuera desde la última vez."""
+        if self._hoy is None or hoy <= self._hoy:
+            self._hoy = self._hoy or hoy
+            return
+        for dias, contador in self.ventanas.items():
+            for dia, cantidades in self._por_dia.items():
+                if self._hoy - timedelta(days=dias) < dia <= hoy - timedelta(days=dias):
+                    for menu_id, cantidad in cantidades.items():
+                        contador.sumar(menu_id, -cantidad)
+        limite = hoy - timedelta(days=max(VENTANAS))
+        self._por_dia = {dia: c for dia, c in self._por_dia.items() if dia > limite}
+        self._hoy = hoy
+
+    def _sumar_dia(self, dia: date, menu_id: int, cantidad):
+        if not (self._hoy - timedelta(days=max(VENTANAS)) < dia <= self._hoy):
+            return
+        cantidades = self._por_dia.setdefault(dia, {})
+        cantidades[menu_id] = cantidades.get(menu_id, 0) + cantidad
+        for dias, contador in self.ventanas.items():
+            if dia > self._hoy - timedelta(days=dias):
+                contador.sumar(menu_id, cantidad)
+
+    def registrar(self, pedido_id: int, fecha: datetime, menu_cantidades: dict, signo: int = 1, nuevo: bool = False):
+        """
+        Aplica las unidades de un pedido confirmado (signo=1) o retirado (signo=-1).
+        nuevo: alta del pedido; se ignora si la carga desde la base ya lo incluyó.
+        """
+        with self._lock:
+            if self.estado == "vacio":
+                return  # La reconstrucción leerá el pedido desde la base
+            if pedido_id is not None and pedido_id > self._visto_hasta:
+                if nuevo:
+                    self._avisados.add(pedido_id)
+                elif pedido_id not in self._avisados:
+                    return  # Pedido de otra caja todavía no leído: sincronizar verá su estado actual
+            elif nuevo:
+                return  # Ya sumado por la carga de las ventanas o por sincronizar
+            self._avanzar(date.today())
+            en_historico = pedido_id is None or pedido_id <= self._leido_hasta or pedido_id > self._hasta_id
+            for menu_id, cantidad in menu_cantidades.items():
+                if en_historico:
+                    self.total.sumar(menu_id, signo * cantidad)
+                self._sumar_dia(fecha.date(), menu_id, signo * cantidad)
+
+    def descartar_menu(self, menu_id: int):
+        with self._lock:
+            self.total.descartar(menu_id)
+            for contador in self.ventanas.values():
+                contador.descartar(menu_id)
+            for cantidades in self._por_dia.values():
+                cantidades.pop(menu_id, None)
+
+    def reconstruir(self, db: Session, presupuesto_s: float = 1.0, tamano_bloque: int = TAMANO_BLOQUE):
+        """
+        Carga las ventanas (una consulta por índice de fecha) y avanza el histórico
+        por bloques de pedidos hasta agotar presupuesto_s. Se puede volver a llamar
+        para continuar donde quedó. Retorna True cuando el histórico está completo.
+        """
+        inicio = time.perf_counter()
+        with self._lock:
+            if self.estado == "vacio":
+                hoy = date.today()
+                self._hoy = hoy
+                # El máximo ID y las ventanas se leen en la misma instantánea de la base
+                abrir_transaccion(db)
+                self._hasta_id = self._visto_hasta = db.query(func.max(Pedido.id)).scalar() or 0
+                desde = datetime.combine(hoy - timedelta(days=max(VENTANAS) - 1), datetime.min.time())
+                dia = func.date(Pedido.fecha)
+                filas = (
+                    db.query(dia.label("dia"), menu_pedido.c.menu_id, func.sum(menu_pedido.c.cantidad).label("cantidad"))
+                    .join(menu_pedido, menu_pedido.c.pedido_id == Pedido.id)
+                    .filter(Pedido.fecha >= desde, Pedido.id <= self._hasta_id)
+                    .group_by(dia, menu_pedido.c.menu_id)
+                    .all()
+                )
+                db.commit()  # Los bloques del histórico leen el estado actual, no esta instantánea
+                for f in filas:
+                    self._sumar_dia(date.fromisoformat(f.dia), f.menu_id, f.cantidad)
+                self._avisados = {i for i in self._avisados if i > self._visto_hasta}
+                self.estado = "parcial"
+
+        while self.estado == "parcial":
+            with self._lock:
+                hasta = min(self._leido_hasta + tamano_bloque, self._hasta_id)
+                filas = (
+                    db.query(menu_pedido.c.menu_id, func.sum(menu_pedido.c.cantidad).label("cantidad"))
+                    .filter(menu_pedido.c.pedido_id > self._leido_hasta, menu_pedido.c.pedido_id <= hasta)
+                    .group_by(menu_pedido.c.menu_id)
+                    .all()
+                )
+                for f in filas:
+                    self.total.sumar(f.menu_id, f.cantidad)
+                self._leido_hasta = hasta
+                if hasta >= self._hasta_id:
+                    self.estado = "completo"
+            if time.perf_counter() - inicio >= presupuesto_s:
+                break
+        return self.estado == "completo"
+
+    def sincronizar(self, db: Session):
+        """
+        Suma las altas de pedidos con ID mayor a _visto_hasta que esta caja no avisó
+        (las de otras cajas). Sin pedidos nuevos es una consulta sobre la clave primaria.
+        """
+        with self._lock:
+            if self.estado == "vacio":
+                return
+            hasta = db.query(func.max(Pedido.id)).scalar() or 0
+            if hasta <= self._visto_hasta:
+                return
+            filas = (
+                db.query(Pedido.id, Pedido.fecha, menu_pedido.c.menu_id, menu_pedido.c.cantidad)
+                .join(menu_pedido, menu_pedido.c.pedido_id == Pedido.id)
+                .filter(Pedido.id > self._visto_hasta, Pedido.id <= hasta)
+                .all()
+            )
+            self._avanzar(date.today())
+            for f in filas:
+                if f.id in self._avisados:
+                    continue
+                self.total.sumar(f.menu_id, f.cantidad)  # IDs > _hasta_id: fuera de los bloques
+                self._sumar_dia(f.fecha.date(), f.menu_id, f.cantidad)
+            self._visto_hasta = hasta
+            self._avisados = {i for i in self._avisados if i > hasta}
+
+    def disponible(self, dias: int = None):
+        """True si top() puede responder para esa ventana (None = histórico)."""
+        if dias is None:
+            return self.estado == "completo"
+        return dias in self.ventanas and self.estado != "vacio"
+
+    def top(self, k: int = None, dias: int = None):
+        """Lista de (menu_id, unidades) de los k menús más vendidos (todos si k es None)."""
+        with self._lock:
+            self._avanzar(date.today())
+            contador = self.total if dias is None else self.ventanas[dias]
+            return contador.top(len(contador) if k is None else k)
+
+
+ranking_menus = RankingMenus()
+
+
+def _al_cambiar_pedidos(cambios, **_):
+    for c in cambios:
+        ranking_menus.registrar(c["pedido_id"], c["fecha"], c["menu_cantidades"], c["signo"], c["nuevo"])
+
+
+suscribir("pedidos", _al_cambiar_pedidos)
+suscribir("menus", lambda menu_id, accion, **_: accion == "eliminado" and ranking_menus.descartar_menu(menu_id))
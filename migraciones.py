@@ -0,0 +1,122 @@
+"""
+Migraciones del esquema de restaurante.db.
+Cada migración tiene un número de versión; las aplicadas quedan registradas en la
+tabla version_esquema, así que se pueden correr sobre una base existente sin
+perder datos. Uso:
+    python migraciones.py            aplica las migraciones pendientes
+    python migraciones.py --planes   muestra EXPLAIN QUERY PLAN de las consultas frecuentes
+"""
+import sys
+from datetime import datetime
+from sqlalchemy import text
+from database import Base, abrir_transaccion, engine as engine_por_defecto
+import models  # Registra los modelos en Base.metadata
+
+
+def agregar_columna(conn, tabla: str, columna: str, definicion: str):
+    """ALTER TABLE ... ADD COLUMN solo si la columna no existe todavía."""
+    existentes = {fila[1] for fila in conn.execute(text(f"PRAGMA table_info({tabla})"))}
+    if columna not in existentes:
+        conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}"))
+
+
+def _esquema_base(conn):
+    # Solo crea las tablas que falten; no toca las existentes
+    Base.metadata.create_all(bind=conn)
+
+
+# (versión, descripción, lista de sentencias SQL o función que recibe la conexión)
+MIGRACIONES = [
+    (1, "Esquema base", _esquema_base),
+    (2, "Índices para pedidos, detalle de pedido y recetas", [
+        "CREATE INDEX IF NOT EXISTS ix_pedidos_fecha ON pedidos (fecha)",
+        "CREATE INDEX IF NOT EXISTS ix_pedidos_cliente_id ON pedidos (cliente_id)",
+        "CREATE INDEX IF NOT EXISTS ix_menu_pedido_pedido_id ON menu_pedido (pedido_id)",
+        "CREATE INDEX IF NOT EXISTS ix_ingrediente_menu_menu_id ON ingrediente_menu (menu_id)",
+    ]),
+    (3, "Resumen de ventas diarias para pedidos anteriores", [
+        "INSERT INTO ventas_diarias (fecha, total, pedidos) "
+        "SELECT date(fecha), COALESCE(SUM(total), 0), COUNT(id) FROM pedidos "
+        "WHERE fecha IS NOT NULL AND NOT EXISTS (SELECT 1 FROM ventas_diarias) "
+        "GROUP BY date(fecha)",
+    ]),
+    (4, "Índice de pedidos por cliente y fecha para la paginación", [
+        "CREATE INDEX IF NOT EXISTS ix_pedidos_cliente_id_fecha ON pedidos (cliente_id, fecha)",
+    ]),
+    (5, "Quita el índice de pedidos por cliente, ya cubierto por el de cliente y fecha", [
+        "DROP INDEX IF EXISTS ix_pedidos_cliente_id",
+    ]),
+]
+
+# Consultas frecuentes de la aplicación, para revisar que usen índices
+CONSULTAS_FRECUENTES = {
+    "Pedidos de un cliente": "SELECT * FROM pedidos WHERE cliente_id = 1",
+    "Pedidos en un rango de fechas": "SELECT * FROM pedidos WHERE fecha >= '2025-01-01' AND fecha < '2025-02-01'",
+    "Detalle de un pedido": "SELECT cantidad, menu_id FROM menu_pedido WHERE pedido_id = 1",
+    "Receta de un menú": "SELECT ingrediente_id, cantidad FROM ingrediente_menu WHERE menu_id = 1",
+    "Página de pedidos": "SELECT id, fecha FROM pedidos WHERE fecha <= '2025-06-01' AND (fecha < '2025-06-01' OR id < 10) "
+                         "ORDER BY fecha DESC, id DESC LIMIT 100",
+    "Página de pedidos de un cliente": "SELECT id, fecha FROM pedidos WHERE cliente_id = 1 AND fecha <= '2025-06-01' "
+                                       "AND (fecha < '2025-06-01' OR id < 10) ORDER BY fecha DESC, id DESC LIMIT 100",
+}
+
+
+def version_actual(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS version_esquema ("
+        "version INTEGER PRIMARY KEY, descripcion VARCHAR NOT NULL, aplicada_en DATETIME NOT NULL)"
+    ))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM version_esquema")).scalar()
+
+
+def migrar(engine=None):
+    """
+    Aplica en orden las migraciones pendientes, cada una en su propia transacción.
+    Cada migración toma el bloqueo de escritura y vuelve a leer la versión: si dos
+    cajas arrancan a la vez, la segunda espera y se salta lo que la primera aplicó.
+    """
+    engine = engine or engine_por_defecto
+    with engine.begin() as conn:
+        version = version_actual(conn)
+    aplicadas = []
+    for numero, descripcion, pasos in MIGRACIONES:
+        if numero <= version:
+            continue
+        with engine.begin() as conn:
+            abrir_transaccion(conn, escritura=True)
+            version = version_actual(conn)
+            if numero <= version:
+                continue  # La aplicó otra caja mientras se esperaba el bloqueo
+            if callable(pasos):
+                pasos(conn)
+            else:
+                for sql in pasos:
+                    conn.execute(text(sql))
+            conn.execute(
+                text("INSERT INTO version_esquema (version, descripcion, aplicada_en) VALUES (:v, :d, :f)"),
+                {"v": numero, "d": descripcion, "f": datetime.now()}
+            )
+        print(f"Migración {numero} aplicada: {descripcion}")
+        aplicadas.append(numero)
+    return aplicadas
+
+
+def planes_de_consulta(engine=None):
+    """Retorna dict consulta -> líneas de EXPLAIN QUERY PLAN."""
+    engine = engine or engine_por_defecto
+    planes = {}
+    with engine.connect() as conn:
+        for nombre, sql in CONSULTAS_FRECUENTES.items():
+            planes[nombre] = [fila[-1] for fila in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return planes
+
+
+if __name__ == "__main__":
+    if "--planes" in sys.argv:
+        for nombre, plan in planes_de_consulta().items():
+            print(f"{nombre}:")
+            for linea in plan:
+                print(f"    {linea}")
+    else:
+        aplicadas = migrar()
+        print("Esquema al día." if not aplicadas else f"Versión actual: {aplicadas[-1]}")
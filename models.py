@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Table, PrimaryKeyConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, Table, PrimaryKeyConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -10,7 +10,8 @@ menu_pedido = Table(
     Column("menu_id", Integer, ForeignKey("menus.id")),
     Column("pedido_id", Integer, ForeignKey("pedidos.id")),
     Column("cantidad", Integer, nullable=False, default=1),
-    PrimaryKeyConstraint("menu_id", "pedido_id")
+    PrimaryKeyConstraint("menu_id", "pedido_id"),
+    Index("ix_menu_pedido_pedido_id", "pedido_id")
 )
 
 # Tabla intermedia para Ingredientes y Menús
@@ -20,7 +21,8 @@ ingrediente_menu = Table(
     Column("ingrediente_id", Integer, ForeignKey("ingredientes.id")),
     Column("menu_id", Integer, ForeignKey("menus.id")),
     Column("cantidad", Float, nullable=False),
-    PrimaryKeyConstraint("ingrediente_id", "menu_id")
+    PrimaryKeyConstraint("ingrediente_id", "menu_id"),
+    Index("ix_ingrediente_menu_menu_id", "menu_id")
 )
 
 class Cliente(Base):
@@ -57,13 +59,23 @@ class Menu(Base):
 
 class Pedido(Base):
     __tablename__ = "pedidos"
+    # Pedidos de un cliente por fecha (filtro de la pestaña Pedidos)
+    __table_args__ = (Index("ix_pedidos_cliente_id_fecha", "cliente_id", "fecha"),)
 
     id = Column(Integer, primary_key=True)
     descripcion = Column(String)
     total = Column(Float)
-    fecha = Column(DateTime, default=datetime.utcnow)
+    fecha = Column(DateTime, default=datetime.utcnow, index=True)
 
-    cliente_id = Column(Integer, ForeignKey("clientes.id"))
+    cliente_id = Column(Integer, ForeignKey("clientes.id"))  # Lo cubre ix_pedidos_cliente_id_fecha
     cliente = relationship("Cliente", back_populates="pedidos")
     
-    menus = relationship("Menu", secondary=menu_pedido, back_populates="pedidos")
\ No newline at end of file
+    menus = relationship("Menu", secondary=menu_pedido, back_populates="pedidos")
+
+# Resumen de ventas por día, mantenido junto con los pedidos (ver crud/venta_diaria_crud.py)
+class VentaDiaria(Base):
+    __tablename__ = "ventas_diarias"
+
+    fecha = Column(Date, primary_key=True)
+    total = Column(Float, nullable=False, default=0)
+    pedidos = Column(Integer, nullable=False, default=0)
\ No newline at end of file
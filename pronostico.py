@@ -0,0 +1,133 @@
+"""
+Pronóstico de consumo de ingredientes y puntos de reorden.
+Una consulta arma la serie diaria de consumo de todos los ingredientes
+(ingrediente_menu x menu_pedido); los promedios y el suavizado se calculan con
+NumPy sobre la matriz ingrediente x día completa, sin recorrer ingrediente por ingrediente.
+Uso: python pronostico.py [dias_historia] [plazo_entrega]
+"""
+import sys
+from datetime import date, datetime, time, timedelta
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Ingrediente, Pedido, ingrediente_menu, menu_pedido
+
+DIAS_HISTORIA = 28
+VENTANA_MEDIA = 7
+ALFA = 0.3
+PLAZO_ENTREGA = 2  # días entre el pedido al proveedor y la llegada
+COBERTURA = 7  # días de consumo que debe cubrir una reposición
+Z_SERVICIO = 1.65  # ~95% de los días sin quiebre de stock
+
+
+def serie_consumo(db: Session, dias: int = DIAS_HISTORIA, hasta: date = None):
+    """
+    Consumo diario de cada ingrediente en los `dias` días que terminan en `hasta`
+    (por defecto ayer, el último día completo). Retorna (ingredientes, fechas, matriz)
+    con matriz[i, d] = cantidad usada del ingrediente i el día fechas[d].
+    """
+    hasta = hasta or date.today() - timedelta(days=1)
+    inicio = hasta - timedelta(days=dias - 1)
+    ingredientes = (
+        db.query(Ingrediente.id, Ingrediente.nombre, Ingrediente.cantidad, Ingrediente.unidad)
+        .order_by(Ingrediente.id)
+        .all()
+    )
+    fila = {ing.id: i for i, ing in enumerate(ingredientes)}
+    matriz = np.zeros((len(ingredientes), dias))
+
+    dia = func.date(Pedido.fecha)
+    consumos = (
+        db.query(ingrediente_menu.c.ingrediente_id, dia.label("dia"),
+                 func.sum(ingrediente_menu.c.cantidad * menu_pedido.c.cantidad).label("usado"))
+        .select_from(Pedido)
+        .join(menu_pedido, menu_pedido.c.pedido_id == Pedido.id)
+        .join(ingrediente_menu, ingrediente_menu.c.menu_id == menu_pedido.c.menu_id)
+        # Rango sobre la columna (no sobre date(fecha)) para que use ix_pedidos_fecha
+        .filter(Pedido.fecha >= datetime.combine(inicio, time.min))
+        .filter(Pedido.fecha < datetime.combine(hasta + timedelta(days=1), time.min))
+        .group_by(ingrediente_menu.c.ingrediente_id, dia)
+        .all()
+    )
+    for c in consumos:
+        if c.ingrediente_id in fila:
+            matriz[fila[c.ingrediente_id], (date.fromisoformat(c.dia) - inicio).days] = c.usado
+    fechas = [inicio + timedelta(days=d) for d in range(dias)]
+    return ingredientes, fechas, matriz
+
+
+def media_movil(matriz, ventana: int = VENTANA_MEDIA):
+    """Media de los últimos `ventana` días para cada fila."""
+    ventana = min(ventana, matriz.shape[1])
+    if ventana == 0:
+        return np.zeros(matriz.shape[0])
+    return matriz[:, -ventana:].mean(axis=1)
+
+
+def suavizado_exponencial(matriz, alfa: float = ALFA):
+    """
+    Nivel final del suavizado exponencial simple de cada fila. La recurrencia
+    s_t = alfa * x_t + (1 - alfa) * s_(t-1), con s_0 = x_0, equivale a un producto
+    con un vector de pesos, así que se resuelve para todas las filas a la vez.
+    """
+    n = matriz.shape[1]
+    if n == 0:
+        return np.zeros(matriz.shape[0])
+    pesos = alfa * (1 - alfa) ** np.arange(n - 1, -1, -1)
+    pesos[0] = (1 - alfa) ** (n - 1)
+    return matriz @ pesos
+
+
+def pronosticar_reposicion(db: Session, dias: int = DIAS_HISTORIA, plazo_entrega: int = PLAZO_ENTREGA,
+                           cobertura: int = COBERTURA, alfa: float = ALFA, ventana: int = VENTANA_MEDIA,
+                           z: float = Z_SERVICIO, hasta: date = None):
+    """
+    Retorna una lista de dicts por ingrediente, ordenada por días hasta agotarse:
+    consumo_diario (pronóstico por suavizado exponencial), media_movil,
+    dias_para_agotar (None si no se consume), punto_reorden, cantidad_sugerida y reponer.
+    """
+    ingredientes, _, matriz = serie_consumo(db, dias, hasta)
+    if not ingredientes:
+        return []
+    stock = np.array([ing.cantidad for ing in ingredientes], dtype=float)
+    pronostico = suavizado_exponencial(matriz, alfa)
+    media = media_movil(matriz, ventana)
+    desviacion = matriz.std(axis=1)
+
+    seguridad = z * desviacion * np.sqrt(plazo_entrega)
+    punto_reorden = pronostico * plazo_entrega + seguridad
+    sugerida = np.maximum(pronostico * (plazo_entrega + cobertura) + seguridad - stock, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dias_para_agotar = np.where(pronostico > 0, np.maximum(stock, 0) / pronostico, np.inf)
+
+    resultado = []
+    for i in np.argsort(dias_para_agotar, kind="stable"):
+        ing = ingredientes[i]
+        resultado.append({
+            "ingrediente_id": ing.id,
+            "nombre": ing.nombre,
+            "unidad": ing.unidad,
+            "stock": float(stock[i]),
+            "consumo_diario": float(pronostico[i]),
+            "media_movil": float(media[i]),
+            "dias_para_agotar": None if np.isinf(dias_para_agotar[i]) else float(dias_para_agotar[i]),
+            "punto_reorden": float(punto_reorden[i]),
+            "cantidad_sugerida": float(sugerida[i]),
+            "reponer": bool(stock[i] <= punto_reorden[i] and pronostico[i] > 0)
+        })
+    return resultado
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    dias = int(sys.argv[1]) if len(sys.argv) > 1 else DIAS_HISTORIA
+    plazo = int(sys.argv[2]) if len(sys.argv) > 2 else PLAZO_ENTREGA
+    with SessionLocal() as db:
+        filas = pronosticar_reposicion(db, dias=dias, plazo_entrega=plazo)
+    print(f"{'Ingrediente':<25} {'Stock':>10} {'Consumo/día':>12} {'Días':>7} {'Reorden':>10} {'Sugerido':>10}")
+    for f in filas:
+        agotar = "-" if f["dias_para_agotar"] is None else f"{f['dias_para_agotar']:.1f}"
+        marca = " *" if f["reponer"] else ""
+        print(f"{f['nombre'][:25]:<25} {f['stock']:>10.1f} {f['consumo_diario']:>12.2f} {agotar:>7} "
+              f"{f['punto_reorden']:>10.1f} {f['cantidad_sugerida']:>10.1f} {f['unidad']}{marca}")
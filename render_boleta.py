@@ -0,0 +1,266 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from fpdf import FPDF
+from tareas import mapear_en_procesos
+
+CARPETA_BOLETAS = "boletas"
+
+
+def items_desde_pedido(pedido_items: dict):
+    """
+    Convierte el carrito del Panel de Compra ({nombre: {"menu", "cantidad"}}) en una
+    lista de tuplas (nombre, cantidad, precio_unitario) que se puede enviar a otro proceso.
+    """
+    return [(item["menu"].nombre, item["cantidad"], item["menu"].precio) for item in pedido_items.values()]
+
+
+# Fuentes registradas en el mismo orden en todas las boletas, para que los
+# fragmentos de la plantilla apunten a los mismos recursos (/F1, /F2, ...)
+FUENTES = [("Arial", "B", 16), ("Arial", "", 12), ("Arial", "B", 12), ("Arial", "", 11), ("Arial", "I", 10)]
+
+
+def _nuevo_pdf():
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_margins(left=15, top=15, right=15)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    for fuente in FUENTES:
+        pdf.set_font(*fuente)
+    return pdf
+
+
+def _dibujar_encabezado(pdf):
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Restaurante Sabor", ln=True, align="C")
+    pdf.set_font("Arial", size=12)
+    pdf.cell(0, 8, "RUT: 12.345.678-9", ln=True, align="C")
+    pdf.cell(0, 8, "Dirección: Calle Falsa 123, Santiago, Chile", ln=True, align="C")
+    pdf.cell(0, 8, "Teléfono: +56 9 1234 5678", ln=True, align="C")
+    pdf.ln(10)
+
+
+def _dibujar_cabecera_tabla(pdf):
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(80, 10, "Nombre", border=1, align="C")
+    pdf.cell(30, 10, "Cantidad", border=1, align="C")
+    pdf.cell(40, 10, "Precio Unit.", border=1, align="C")
+    pdf.cell(40, 10, "Subtotal", border=1, align="C")
+    pdf.ln()
+
+
+def _dibujar_pie(pdf):
+    pdf.ln(10)
+    pdf.set_font("Arial", "I", 10)
+    pdf.cell(0, 8, "Gracias por su compra. Para consultas, contáctenos al +56 9 1234 5678.", ln=True, align="C")
+    pdf.cell(0, 8, "Los productos adquiridos no tienen garantía.", ln=True, align="C")
+
+
+class PlantillaBoleta:
+    """
+    Partes fijas de la boleta (encabezado, cabecera de la tabla y pie) dibujadas una
+    sola vez. Se guarda el contenido PDF que generan y se estampa en cada boleta,
+    trasladado a la posición vertical que corresponda.
+    Si la versión de fpdf no expone el contenido de la página como texto, la
+    plantilla queda desactivada y se dibuja todo de forma normal.
+    """
+
+    def __init__(self):
+        pdf = _nuevo_pdf()
+        self.soportada = isinstance(pdf.pages.get(pdf.page), str)
+        if not self.soportada:
+            return
+        self.encabezado = self._grabar(pdf, _dibujar_encabezado)
+        self.cabecera_tabla = self._grabar(pdf, _dibujar_cabecera_tabla)
+        self.pie = self._grabar(pdf, _dibujar_pie)
+
+    @staticmethod
+    def _grabar(pdf, dibujar):
+        # Forzar que set_font escriba la fuente dentro del fragmento
+        pdf.font_family = ""
+        inicio = len(pdf.pages[pdf.page])
+        y_origen = pdf.y
+        dibujar(pdf)
+        return pdf.pages[pdf.page][inicio:].strip("\n"), y_origen, pdf.y - y_origen
+
+    @staticmethod
+    def _estampar(pdf, parte, dibujar):
+        fragmento, y_origen, alto = parte
+        if pdf.y + alto > pdf.page_break_trigger:
+            # Habría salto de página: se dibuja normalmente
+            dibujar(pdf)
+            return
+        desplazamiento = (y_origen - pdf.y) * pdf.k
+        pdf._out(f"q 1 0 0 1 0 {desplazamiento:.2f} cm")
+        pdf._out(fragmento)
+        pdf._out("Q")
+        pdf.x = pdf.l_margin
+        pdf.y += alto
+        pdf.font_family = ""
+
+    def estampar_encabezado(self, pdf):
+        self._estampar(pdf, self.encabezado, _dibujar_encabezado)
+
+    def estampar_cabecera_tabla(self, pdf):
+        self._estampar(pdf, self.cabecera_tabla, _dibujar_cabecera_tabla)
+
+    def estampar_pie(self, pdf):
+        self._estampar(pdf, self.pie, _dibujar_pie)
+
+
+_plantilla = None
+
+
+def obtener_plantilla():
+    global _plantilla
+    if _plantilla is None:
+        _plantilla = PlantillaBoleta()
+    return _plantilla
+
+
+def construir_boleta(pedido_id, cliente_nombre, fecha_pedido, items, usar_plantilla=True):
+    """
+    Arma el documento FPDF de una boleta sin guardarlo.
+    items: lista de tuplas (nombre, cantidad, precio_unitario).
+    """
+    if not items:
+        raise ValueError("No hay ítems en el pedido para generar la boleta.")
+
+    plantilla = obtener_plantilla() if usar_plantilla else None
+    if plantilla is not None and not plantilla.soportada:
+        plantilla = None
+
+    pdf = _nuevo_pdf()
+
+    # Encabezado
+    if plantilla:
+        plantilla.estampar_encabezado(pdf)
+    else:
+        _dibujar_encabezado(pdf)
+
+    # Información del pedido
+    pdf.set_font("Arial", size=12)
+    pdf.cell(0, 8, f"Boleta N°: {pedido_id}", ln=True, align="L")
+    pdf.cell(0, 8, f"Cliente: {cliente_nombre}", ln=True, align="L")
+    pdf.cell(0, 8, f"Fecha: {fecha_pedido.strftime('%d/%m/%Y %H:%M:%S')}", ln=True, align="L")
+    pdf.ln(10)
+
+    # Tabla de ítems
+    if plantilla:
+        plantilla.estampar_cabecera_tabla(pdf)
+    else:
+        _dibujar_cabecera_tabla(pdf)
+
+    pdf.set_font("Arial", size=11)
+    subtotal = 0
+    for nombre, cantidad, precio_unitario in items:
+        sub = cantidad * precio_unitario
+        subtotal += sub
+        pdf.cell(80, 10, nombre, border=1)
+        pdf.cell(30, 10, str(cantidad), border=1, align="C")
+        pdf.cell(40, 10, f"${precio_unitario:.2f}", border=1, align="C")
+        pdf.cell(40, 10, f"${sub:.2f}", border=1, align="C")
+        pdf.ln()
+
+    # Totales
+    pdf.ln(5)
+    pdf.set_font("Arial", "B", 12)
+    iva = subtotal * 0.19
+    total = subtotal + iva
+    pdf.cell(0, 8, f"Subtotal: ${subtotal:.2f}", ln=True, align="R")
+    pdf.cell(0, 8, f"IVA (19%): ${iva:.2f}", ln=True, align="R")
+    pdf.cell(0, 8, f"Total: ${total:.2f}", ln=True, align="R")
+
+    # Pie de página
+    if plantilla:
+        plantilla.estampar_pie(pdf)
+    else:
+        _dibujar_pie(pdf)
+    return pdf
+
+
+def renderizar_boleta(pedido_id, cliente_nombre, fecha_pedido, items, carpeta=CARPETA_BOLETAS, usar_plantilla=True):
+    """
+    Genera el PDF de una boleta sin depender de Tk.
+    items: lista de tuplas (nombre, cantidad, precio_unitario).
+    Retorna la ruta del archivo generado; los errores se propagan al llamador.
+    """
+    pdf = construir_boleta(pedido_id, cliente_nombre, fecha_pedido, items, usar_plantilla)
+
+    # Guardar el PDF
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"boleta_{pedido_id}.pdf")
+    pdf.output(ruta, "F")
+    return ruta
+
+
+def renderizar_boletas_lote(boletas: list, procesos: int = None, carpeta=CARPETA_BOLETAS):
+    """
+    boletas: lista de tuplas (pedido_id, cliente_nombre, fecha_pedido, items).
+    Reparte el trabajo en un pool de procesos y retorna un dict con 'rutas', 'errores',
+    'segundos' y 'boletas_por_segundo'.
+    """
+    inicio = time.perf_counter()
+    tareas = [(pedido_id, cliente, fecha, items, carpeta) for pedido_id, cliente, fecha, items in boletas]
+    rutas = []
+    errores = []
+    if tareas:
+        procesos = procesos or os.cpu_count() or 1
+        chunksize = max(1, len(tareas) // (procesos * 4))
+        for ruta, error in mapear_en_procesos(renderizar_boleta, tareas, "Boleta", procesos, chunksize):
+            if error:
+                errores.append(error)
+            else:
+                rutas.append(ruta)
+    segundos = time.perf_counter() - inicio
+    return {
+        "rutas": rutas,
+        "errores": errores,
+        "segundos": segundos,
+        "boletas_por_segundo": len(rutas) / segundos if segundos > 0 else 0.0
+    }
+
+
+def boletas_por_fecha(db, fecha: datetime):
+    """
+    Datos de todas las boletas de un día, en una sola consulta, listos para
+    renderizar_boletas_lote.
+    """
+    # Import local: los procesos del pool solo importan el renderizado, no la base de datos
+    from models import Pedido, Cliente, Menu, menu_pedido
+
+    inicio = datetime(fecha.year, fecha.month, fecha.day)
+    fin = inicio + timedelta(days=1)
+    filas = (
+        db.query(Pedido.id, Pedido.fecha, Cliente.nombre.label("cliente"), Menu.nombre, menu_pedido.c.cantidad, Menu.precio)
+        .join(Cliente, Pedido.cliente_id == Cliente.id)
+        .join(menu_pedido, menu_pedido.c.pedido_id == Pedido.id)
+        .join(Menu, Menu.id == menu_pedido.c.menu_id)
+        .filter(Pedido.fecha >= inicio, Pedido.fecha < fin)
+        .order_by(Pedido.id)
+        .all()
+    )
+    boletas = {}
+    for f in filas:
+        if f.id not in boletas:
+            boletas[f.id] = (f.id, f.cliente, f.fecha, [])
+        boletas[f.id][3].append((f.nombre, f.cantidad, f.precio))
+    return list(boletas.values())
+
+
+if __name__ == "__main__":
+    # Reimpresión de las boletas de un día: python render_boleta.py 2025-06-24 [procesos]
+    if len(sys.argv) < 2:
+        print("Uso: python render_boleta.py YYYY-MM-DD [procesos]")
+        sys.exit(1)
+    from database import SessionLocal
+
+    fecha = datetime.strptime(sys.argv[1], "%Y-%m-%d")
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    with SessionLocal() as db:
+        boletas = boletas_por_fecha(db, fecha)
+    resultado = renderizar_boletas_lote(boletas, procesos=procesos)
+    print(f"{len(resultado['rutas'])} boletas en {resultado['segundos']:.2f} s ({resultado['boletas_por_segundo']:.1f} boletas/s)")
+    for error in resultado["errores"]:
+        print(f"Error: {error}")
@@ -0,0 +1,124 @@
+"""
+Reporte de gráficos por lotes, sin Tk ni pantalla (backend Agg).
+Cada gráfico se consulta y se dibuja en su propio proceso, en PNG y/o PDF.
+Uso:
+    python reporte.py --mes 2025-06
+    python reporte.py --desde 2025-06-01 --hasta 2025-06-15 --formatos png pdf --procesos 4
+"""
+import matplotlib
+matplotlib.use("Agg")  # Antes de cualquier import de pyplot: nunca abrir ventanas
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from sqlalchemy.orm import Session
+from graficos import (
+    crear_figura, dibujar_barras, dibujar_mapa_calor,
+    datos_ventas_por_fecha, datos_menus_mas_vendidos, datos_ingredientes_mas_utilizados
+)
+from tareas import mapear_en_procesos
+
+CARPETA_REPORTES = "reportes"
+FORMATOS = ("png", "pdf")
+TOP_MENUS = 15
+
+
+def _ventas_por_fecha(db, ax, fecha_inicio, fecha_fin):
+    dibujar_barras(ax, "ventas", *datos_ventas_por_fecha(db, fecha_inicio, fecha_fin))
+
+
+def _menus_mas_vendidos(db, ax, fecha_inicio, fecha_fin):
+    dibujar_barras(ax, "menus", *datos_menus_mas_vendidos(db, TOP_MENUS, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin))
+
+
+def _ingredientes_mas_utilizados(db, ax, fecha_inicio, fecha_fin):
+    dibujar_barras(ax, "ingredientes", *datos_ingredientes_mas_utilizados(db, fecha_inicio, fecha_fin))
+
+
+def _pedidos_por_hora(db, ax, fecha_inicio, fecha_fin):
+    from analitica import mapa_calor_horas
+    dibujar_mapa_calor(ax, mapa_calor_horas(db, fecha_inicio.date(), fecha_fin.date()))
+
+
+# nombre de archivo -> función (db, ax, fecha_inicio, fecha_fin) que dibuja en ax
+GRAFICOS = {
+    "ventas_por_fecha": _ventas_por_fecha,
+    "menus_mas_vendidos": _menus_mas_vendidos,
+    "ingredientes_mas_utilizados": _ingredientes_mas_utilizados,
+    "pedidos_por_hora": _pedidos_por_hora,
+}
+
+_engines = {}  # Un engine por proceso y URL, reutilizado entre gráficos
+
+
+def renderizar_grafico(nombre: str, url: str, fecha_inicio: datetime, fecha_fin: datetime, carpeta: str, formatos=("png",)):
+    """Consulta y dibuja un gráfico en una figura nueva (sin pyplot). Retorna las rutas escritas."""
+    from database import crear_engine
+    if url not in _engines:
+        _engines[url] = crear_engine(url)
+    fig = crear_figura()
+    ax = fig.add_subplot()
+    with Session(bind=_engines[url]) as db:
+        GRAFICOS[nombre](db, ax, fecha_inicio, fecha_fin)
+    lienzo = FigureCanvasAgg(fig)
+    rutas = []
+    for formato in formatos:
+        ruta = os.path.join(carpeta, f"{nombre}.{formato}")
+        lienzo.print_figure(ruta, format=formato, dpi=120)
+        rutas.append(ruta)
+    return rutas
+
+
+def generar_reporte(fecha_inicio: datetime, fecha_fin: datetime, carpeta: str = None, formatos=("png",),
+                    graficos: list = None, procesos: int = None, url: str = None):
+    """
+    Renderiza los gráficos pedidos (por defecto todos) para [fecha_inicio, fecha_fin],
+    ambos días incluidos. Con procesos=1 se trabaja en el proceso actual.
+    Retorna un dict con 'carpeta', 'rutas', 'errores' y 'segundos'.
+    """
+    from database import SQLALCHEMY_DATABASE_URL
+    inicio = time.perf_counter()
+    url = url or SQLALCHEMY_DATABASE_URL
+    carpeta = carpeta or os.path.join(CARPETA_REPORTES, f"{fecha_inicio:%Y-%m-%d}_{fecha_fin:%Y-%m-%d}")
+    os.makedirs(carpeta, exist_ok=True)
+    tareas = [(nombre, url, fecha_inicio, fecha_fin, carpeta, tuple(formatos)) for nombre in (graficos or GRAFICOS)]
+
+    resultados = mapear_en_procesos(renderizar_grafico, tareas, "Gráfico", procesos)
+
+    rutas = [ruta for rutas_grafico, _ in resultados for ruta in rutas_grafico or []]
+    errores = [error for _, error in resultados if error]
+    return {"carpeta": carpeta, "rutas": rutas, "errores": errores, "segundos": time.perf_counter() - inicio}
+
+
+def _rango_del_mes(mes: str):
+    inicio = datetime.strptime(mes, "%Y-%m")
+    siguiente = (inicio + timedelta(days=32)).replace(day=1)
+    return inicio, siguiente - timedelta(days=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera los gráficos del restaurante sin interfaz gráfica")
+    parser.add_argument("--mes", help="Mes completo, YYYY-MM")
+    parser.add_argument("--desde", help="Fecha inicial, YYYY-MM-DD")
+    parser.add_argument("--hasta", help="Fecha final (incluida), YYYY-MM-DD")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=["png"])
+    parser.add_argument("--graficos", nargs="+", choices=list(GRAFICOS), default=None, help="Por defecto, todos")
+    parser.add_argument("--salida", default=None, help="Carpeta de salida (por defecto reportes/<desde>_<hasta>)")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--db", default=None, help="URL de la base (por defecto RESTAURANTE_DB_URL o restaurante.db)")
+    args = parser.parse_args()
+
+    if args.mes:
+        fecha_inicio, fecha_fin = _rango_del_mes(args.mes)
+    elif args.desde and args.hasta:
+        fecha_inicio = datetime.strptime(args.desde, "%Y-%m-%d")
+        fecha_fin = datetime.strptime(args.hasta, "%Y-%m-%d")
+    else:
+        parser.error("Indique --mes o bien --desde y --hasta")
+
+    resultado = generar_reporte(fecha_inicio, fecha_fin, args.salida, args.formatos, args.graficos, args.procesos, args.db)
+    print(f"{len(resultado['rutas'])} archivos en {resultado['carpeta']} en {resultado['segundos']:.2f} s")
+    for error in resultado["errores"]:
+        print(f"Error: {error}")
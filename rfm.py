@@ -0,0 +1,130 @@
+"""
+Segmentación RFM de clientes (recencia, frecuencia, monto).
+Los pedidos se leen en una sola consulta (cliente_id, fecha, total) y los puntajes
+de todos los clientes se calculan con NumPy, sin recorrer cliente por cliente.
+Uso: python rfm.py clientes_rfm.csv
+"""
+import csv
+import sys
+from datetime import datetime
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Cliente, Pedido
+
+SIN_PEDIDOS = "Sin pedidos"
+
+# (nombre, condición sobre los puntajes r y f de 1 a 5); gana la primera que se cumple
+REGLAS_SEGMENTOS = [
+    ("Campeones", lambda r, f: (r >= 4) & (f >= 4)),
+    ("Leales", lambda r, f: (r >= 3) & (f >= 3)),
+    ("Nuevos", lambda r, f: (r >= 4) & (f <= 2)),
+    ("En riesgo", lambda r, f: (r <= 2) & (f >= 3)),
+    ("Perdidos", lambda r, f: (r <= 2) & (f <= 2)),
+]
+SEGMENTO_POR_DEFECTO = "Ocasionales"
+
+COLUMNAS_CSV = ["cliente_id", "nombre", "correo", "segmento", "recencia_dias", "frecuencia", "monto", "r", "f", "m"]
+
+
+def datos_pedidos(db: Session):
+    """
+    (cliente_ids, fechas en días julianos, totales) de todos los pedidos con cliente.
+    julianday() en SQLite evita convertir cada fecha a datetime en Python.
+    """
+    filas = (
+        db.query(Pedido.cliente_id, func.julianday(Pedido.fecha), Pedido.total)
+        .filter(Pedido.cliente_id.isnot(None), Pedido.fecha.isnot(None))
+        .all()
+    )
+    if not filas:
+        return np.array([], dtype=np.int64), np.array([]), np.array([])
+    cliente_ids, dias, totales = zip(*filas)
+    totales = np.array(totales, dtype=float)
+    return np.array(cliente_ids, dtype=np.int64), np.array(dias, dtype=float), np.nan_to_num(totales)
+
+
+def _dia_juliano(fecha: datetime):
+    # Mismo criterio que julianday(): la fecha sin zona horaria se toma tal cual
+    return (fecha - datetime(1970, 1, 1)).total_seconds() / 86400 + 2440587.5
+
+
+def _puntaje(valores):
+    """Quintil de 1 a 5 por rango percentil (mayor valor, mayor puntaje); los empates comparten puntaje."""
+    n = valores.size
+    if n == 0:
+        return np.array([], dtype=np.int64)
+    rangos = np.searchsorted(np.sort(valores), valores, side="left")
+    return 1 + rangos * 5 // n
+
+
+def calcular_rfm(cliente_ids, dias, totales, ahora: datetime = None):
+    """
+    Retorna dict de arrays alineados por cliente (solo clientes con pedidos):
+    cliente_id, recencia_dias, frecuencia, monto, r, f, m y segmento.
+    """
+    ahora = ahora or datetime.now()
+    ids, indice = np.unique(cliente_ids, return_inverse=True)
+    frecuencia = np.bincount(indice, minlength=ids.size)
+    monto = np.bincount(indice, weights=totales, minlength=ids.size)
+    ultima = np.full(ids.size, -np.inf)
+    np.maximum.at(ultima, indice, dias)
+    recencia = np.maximum(_dia_juliano(ahora) - ultima, 0)
+
+    r = _puntaje(-recencia)  # Más reciente, mejor puntaje
+    f = _puntaje(frecuencia.astype(float))
+    m = _puntaje(monto)
+    segmento = np.select(
+        [condicion(r, f) for _, condicion in REGLAS_SEGMENTOS],
+        [nombre for nombre, _ in REGLAS_SEGMENTOS],
+        default=SEGMENTO_POR_DEFECTO
+    )
+    return {
+        "cliente_id": ids,
+        "recencia_dias": recencia,
+        "frecuencia": frecuencia,
+        "monto": monto,
+        "r": r,
+        "f": f,
+        "m": m,
+        "segmento": segmento
+    }
+
+
+def segmentar_clientes(db: Session, ahora: datetime = None):
+    """Retorna dict cliente_id -> dict con segmento, recencia_dias, frecuencia, monto, r, f y m."""
+    tabla = calcular_rfm(*datos_pedidos(db), ahora=ahora)
+    columnas = {nombre: valores.tolist() for nombre, valores in tabla.items()}
+    return {
+        cliente_id: {nombre: columnas[nombre][i] for nombre in COLUMNAS_CSV[3:]}
+        for i, cliente_id in enumerate(columnas["cliente_id"])
+    }
+
+
+def exportar_rfm_csv(db: Session, ruta: str, ahora: datetime = None):
+    """Escribe un CSV con todos los clientes (también los que no tienen pedidos). Retorna las filas escritas."""
+    segmentos = segmentar_clientes(db, ahora)
+    filas = 0
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUMNAS_CSV)
+        for cliente in db.query(Cliente.id, Cliente.nombre, Cliente.correo).order_by(Cliente.id):
+            s = segmentos.get(cliente.id)
+            if s is None:
+                escritor.writerow([cliente.id, cliente.nombre, cliente.correo, SIN_PEDIDOS, "", 0, 0, "", "", ""])
+            else:
+                escritor.writerow([
+                    cliente.id, cliente.nombre, cliente.correo, s["segmento"], round(s["recencia_dias"], 1),
+                    s["frecuencia"], round(s["monto"], 2), s["r"], s["f"], s["m"]
+                ])
+            filas += 1
+    return filas
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    ruta = sys.argv[1] if len(sys.argv) > 1 else "clientes_rfm.csv"
+    with SessionLocal() as db:
+        filas = exportar_rfm_csv(db, ruta)
+    print(f"{filas} clientes exportados a {ruta}")
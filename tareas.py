@@ -0,0 +1,77 @@
+import os
+import queue
+import threading
+
+
+class TrabajadorFondo:
+    """
+    Ejecuta trabajos en un hilo aparte, en orden de llegada, y entrega los resultados
+    al hilo de Tk. El hilo de trabajo nunca toca widgets: deja el resultado en una cola
+    que el hilo de Tk revisa con after().
+    """
+
+    def __init__(self, widget, intervalo_ms: int = 50, nombre: str = "trabajador"):
+        self._widget = widget
+        self._intervalo_ms = intervalo_ms
+        self._trabajos = queue.Queue()
+        self._resultados = queue.Queue()
+        self._hilo = threading.Thread(target=self._procesar, name=nombre, daemon=True)
+        self._hilo.start()
+        self._widget.after(self._intervalo_ms, self._entregar)
+
+    def enviar(self, trabajo, al_terminar, al_fallar):
+        """
+        trabajo: función sin argumentos que se ejecuta en el hilo de fondo.
+        al_terminar(resultado) y al_fallar(error) se ejecutan en el hilo de Tk.
+        """
+        self._trabajos.put((trabajo, al_terminar, al_fallar))
+
+    def pendientes(self):
+        return self._trabajos.qsize()
+
+    def _procesar(self):
+        while True:
+            trabajo, al_terminar, al_fallar = self._trabajos.get()
+            try:
+                resultado = trabajo()
+            except Exception as e:
+                self._resultados.put((al_fallar, e))
+            else:
+                self._resultados.put((al_terminar, resultado))
+
+    def _entregar(self):
+        try:
+            while True:
+                callback, valor = self._resultados.get_nowait()
+                try:
+                    callback(valor)
+                except Exception as e:
+                    print(f"Error en callback de trabajo en segundo plano: {e}")  # Depuración
+        except queue.Empty:
+            pass
+        self._widget.after(self._intervalo_ms, self._entregar)
+
+
+def _ejecutar(trabajo):
+    # Punto de entrada para los procesos del pool (debe ser una función de módulo)
+    funcion, descripcion, argumentos = trabajo
+    try:
+        return funcion(*argumentos), None
+    except Exception as e:
+        return None, f"{descripcion} {argumentos[0]}: {e}"
+
+
+def mapear_en_procesos(funcion, tareas: list, descripcion: str, procesos: int = None, chunksize: int = 1):
+    """
+    Ejecuta funcion(*tarea) para cada tarea en un pool de procesos (en el proceso actual
+    si procesos es 1). funcion debe ser de módulo para poder enviarla a otro proceso.
+    Retorna una lista de (resultado, error) en el orden de tareas; una tarea que falla
+    deja resultado None y un mensaje "<descripcion> <primer argumento>: <error>".
+    """
+    trabajos = [(funcion, descripcion, tarea) for tarea in tareas]
+    procesos = min(procesos or os.cpu_count() or 1, len(trabajos))
+    if procesos <= 1:
+        return [_ejecutar(t) for t in trabajos]
+    from concurrent.futures import ProcessPoolExecutor  # Solo los reportes lo usan; la app no lo importa al arrancar
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_ejecutar, trabajos, chunksize=chunksize))
@@ -0,0 +1,16 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from database import Base, crear_engine
+
+
+@pytest.fixture
+def engine():
+    nuevo_engine = crear_engine("sqlite://")
+    Base.metadata.create_all(bind=nuevo_engine)
+    yield nuevo_engine
+    nuevo_engine.dispose()
+
+
+@pytest.fixture
+def Session(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,23 @@
+"""Datos mínimos compartidos por las pruebas."""
+from models import Cliente, Ingrediente, Menu, ingrediente_menu
+
+
+def cargar_menus(db, cantidad_menus: int, stock: float = 1000.0):
+    """
+    Crea un cliente y cantidad_menus menús; el menú i usa los ingredientes i e i+1
+    (1 unidad de cada uno). Retorna (cliente_id, [menu_ids], [ingrediente_ids]).
+    """
+    cliente = Cliente(nombre="Cliente Prueba", correo="cliente@prueba.cl")
+    ingredientes = [
+        Ingrediente(nombre=f"Ingrediente {i}", tipo="prueba", cantidad=stock, unidad="u")
+        for i in range(cantidad_menus + 1)
+    ]
+    menus = [Menu(nombre=f"Menú {i}", descripcion="prueba", precio=1000.0) for i in range(cantidad_menus)]
+    db.add_all([cliente, *ingredientes, *menus])
+    db.flush()
+    db.execute(ingrediente_menu.insert(), [
+        {"menu_id": menu.id, "ingrediente_id": ingredientes[i + j].id, "cantidad": 1.0}
+        for i, menu in enumerate(menus) for j in (0, 1)
+    ])
+    db.commit()
+    return cliente.id, [m.id for m in menus], [i.id for i in ingredientes]
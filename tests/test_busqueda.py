@@ -0,0 +1,110 @@
+import busqueda
+from busqueda import IndicePrefijos, normalizar
+from crud.cliente_crud import crear_cliente, actualizar_cliente, eliminar_cliente
+from models import Cliente
+
+
+def _clientes(db, *datos):
+    ids = []
+    for nombre, correo in datos:
+        cliente = Cliente(nombre=nombre, correo=correo)
+        db.add(cliente)
+        db.flush()
+        ids.append(cliente.id)
+    db.commit()
+    return ids
+
+
+def test_normalizar_quita_tildes_y_mayusculas():
+    assert normalizar("  José ÑÚÑEZ ") == normalizar("jose nunez") == "jose nunez"
+
+
+def test_buscar_por_prefijo_tildes_y_segunda_palabra(Session):
+    indice = IndicePrefijos(Cliente, ("nombre", "correo"))
+    with Session() as db:
+        juan, jose, ana = _clientes(db, ("Juan Pérez", "jp@x.cl"), ("José Núñez", "jn@x.cl"), ("Ana", "ana@x.cl"))
+        assert indice.buscar(db, "ju") == [juan]
+        assert indice.buscar(db, "JOSÉ") == indice.buscar(db, "jose") == [jose]
+        assert indice.buscar(db, "per") == [juan]  # Segunda palabra del nombre
+        assert indice.buscar(db, "nun") == [jose]
+        assert indice.buscar(db, "ana@") == [ana]  # Otro campo indexado
+        assert indice.buscar(db, "j", limite=1) == [jose]  # Orden de clave: 'jn@x.cl' < 'jose nunez'
+        assert indice.buscar(db, "zz") == []
+
+
+def test_agregar_renombrar_y_quitar(Session):
+    indice = IndicePrefijos(Cliente, ("nombre", "correo"))
+    with Session() as db:
+        (juan,) = _clientes(db, ("Juan Pérez", "jp@x.cl"))
+        indice.cargar(db)
+        indice.agregar(99, "Beatriz Soto", "bs@x.cl")
+        assert indice.buscar(db, "sot") == [99]
+        indice.agregar(juan, "Juan Rojas", "jp@x.cl")  # Renombre
+        assert indice.buscar(db, "per") == []
+        assert indice.buscar(db, "roj") == [juan]
+        indice.quitar(99)
+        assert indice.buscar(db, "bea") == [] and 99 not in indice.registros
+        assert len(indice) == 1
+
+
+def test_crud_de_clientes_mantiene_el_indice(Session, monkeypatch):
+    indice = IndicePrefijos(Cliente, ("nombre", "correo"))
+    monkeypatch.setattr(busqueda, "indice_clientes", indice)  # El suscriptor de 'clientes' lo toma de aquí
+    with Session() as db:
+        indice.cargar(db)
+        cliente = crear_cliente(db, "Marta Díaz", "md@x.cl")
+        assert indice.buscar(db, "diaz") == [cliente.id]
+        actualizar_cliente(db, cliente.id, "Marta Vera", "md@x.cl")
+        assert indice.buscar(db, "dia") == [] and indice.buscar(db, "ver") == [cliente.id]
+        eliminar_cliente(db, cliente.id)
+        assert indice.buscar(db, "mar") == []
+
+
+def test_error_del_indice_no_hace_fallar_el_alta(Session, monkeypatch):
+    indice = IndicePrefijos(Cliente, ("nombre", "correo"))
+
+    def fallar(*args):
+        raise RuntimeError("índice roto")
+
+    monkeypatch.setattr(indice, "agregar", fallar)
+    monkeypatch.setattr(busqueda, "indice_clientes", indice)
+    with Session() as db:
+        indice.cargar(db)
+        cliente = crear_cliente(db, "Marta Díaz", "md@x.cl")
+        assert cliente is not None
+        assert db.query(Cliente).count() == 1
+    assert indice._claves is None  # Quedó para recargar desde la base
+
+
+def test_sincronizar_ve_cambios_de_otra_caja(Session):
+    indice = IndicePrefijos(Cliente, ("nombre", "correo"))
+    with Session() as db:
+        juan, ana = _clientes(db, ("Juan Pérez", "jp@x.cl"), ("Ana", "ana@x.cl"))
+        indice.cargar(db)
+    # Otra caja agrega, renombra y elimina sin pasar por este índice
+    with Session() as otra:
+        (luis,) = _clientes(otra, ("Luis Mora", "lm@x.cl"))
+        otra.get(Cliente, juan).nombre = "Juan Peralta"
+        otra.delete(otra.get(Cliente, ana))
+        otra.commit()
+    with Session() as db:
+        assert indice.buscar(db, "luis") == []
+        indice.sincronizar(db)
+        assert indice.buscar(db, "luis") == [luis]
+        assert indice.registros[juan][0] == "Juan Peralta"
+        assert ana not in indice.registros
+
+
+def test_crud_de_menus_mantiene_el_indice(Session, monkeypatch):
+    from crud.menu_crud import crear_menu, actualizar_menu, eliminar_menu
+    from models import Menu
+    indice = IndicePrefijos(Menu, ("nombre",))
+    monkeypatch.setattr(busqueda, "indice_menus", indice)
+    with Session() as db:
+        indice.cargar(db)
+        menu = crear_menu(db, "Pastel de Choclo", "", [], 5000.0)
+        assert indice.buscar(db, "cho") == [menu.id]
+        actualizar_menu(db, menu.id, nombre="Cazuela")
+        assert indice.buscar(db, "pas") == [] and indice.buscar(db, "caz") == [menu.id]
+        eliminar_menu(db, menu.id)
+        assert indice.buscar(db, "caz") == []
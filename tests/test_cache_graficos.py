@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+from cache_graficos import CacheGraficos
+from crud.pedido_crud import crear_pedido
+from tests.datos import cargar_menus
+
+
+def test_sincronizar_ve_pedidos_de_otra_caja(Session):
+    cache = CacheGraficos()
+    hoy = date.today()
+    ayer = hoy - timedelta(days=1)
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 1)
+        cache.sincronizar(db)
+        con_hoy = cache.clave("ventas", ayer, hoy)
+        solo_ayer = cache.clave("ventas", ayer, ayer)
+        cache.guardar(con_hoy, "antes")
+        cache.guardar(solo_ayer, "ayer")
+
+    # Otra caja guarda un pedido: esta instancia no recibe el aviso
+    with Session() as otra:
+        crear_pedido(otra, "otra caja", 1000.0, cliente_id, {menu_ids[0]: 1})
+
+    with Session() as db:
+        cache.sincronizar(db)
+    assert cache.obtener(cache.clave("ventas", ayer, hoy)) is None
+    assert cache.obtener(cache.clave("ventas", ayer, ayer)) == "ayer"
+
+
+def test_sincronizar_sin_cambios_conserva_entradas(Session):
+    cache = CacheGraficos()
+    with Session() as db:
+        cache.sincronizar(db)
+        clave = cache.clave("ingredientes")
+        cache.guardar(clave, "datos")
+        cache.sincronizar(db)
+    assert cache.obtener(cache.clave("ingredientes")) == "datos"
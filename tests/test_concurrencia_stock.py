@@ -0,0 +1,107 @@
+import threading
+from sqlalchemy.orm import sessionmaker
+from crud.pedido_crud import crear_pedido, crear_pedidos_bulk
+from database import Base, crear_engine
+from models import Ingrediente, Pedido
+from tests.datos import cargar_menus
+
+HILOS = 8
+PEDIDOS_POR_HILO = 10
+STOCK = 25  # Menos que HILOS * PEDIDOS_POR_HILO: varias cajas compiten por las últimas unidades
+
+
+def _sesiones(tmp_path):
+    # Base en archivo (WAL, busy_timeout) para que cada hilo tenga su propia conexión
+    engine = crear_engine(f"sqlite:///{tmp_path / 'stock.db'}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_reserva_concurrente_no_sobrevende(tmp_path):
+    engine, Session = _sesiones(tmp_path)
+    with Session() as db:
+        cliente_id, menu_ids, ingrediente_ids = cargar_menus(db, 1, stock=STOCK)
+
+    exitos = []
+    rechazos = []
+    otros_errores = []
+    barrera = threading.Barrier(HILOS)
+
+    def caja():
+        barrera.wait()
+        with Session() as db:
+            for _ in range(PEDIDOS_POR_HILO):
+                try:
+                    pedido = crear_pedido(db, "concurrente", 1000.0, cliente_id, {menu_ids[0]: 1}, reservar=True)
+                    exitos.append(pedido.id)
+                except ValueError:
+                    rechazos.append(1)
+                except Exception as e:
+                    otros_errores.append(e)
+
+    hilos = [threading.Thread(target=caja) for _ in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    with Session() as db:
+        stock = [cantidad for (cantidad,) in db.query(Ingrediente.cantidad).order_by(Ingrediente.id)]
+        pedidos = db.query(Pedido).count()
+    engine.dispose()
+
+    assert otros_errores == []
+    assert len(exitos) == STOCK
+    assert len(rechazos) == HILOS * PEDIDOS_POR_HILO - STOCK
+    assert pedidos == STOCK
+    assert stock == [0, 0]
+
+
+def test_lote_concurrente_rechaza_por_pedido(tmp_path):
+    # Un lote compite con cajas que reservan una unidad a la vez: el lote nunca
+    # falla completo, solo rechaza los pedidos para los que ya no hay stock
+    engine, Session = _sesiones(tmp_path)
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 1, stock=STOCK)
+
+    exitos = []
+    resultados_lote = []
+    errores = []
+    barrera = threading.Barrier(HILOS)
+
+    def caja():
+        barrera.wait()
+        with Session() as db:
+            for _ in range(PEDIDOS_POR_HILO):
+                try:
+                    exitos.append(crear_pedido(db, "caja", 1.0, cliente_id, {menu_ids[0]: 1}, reservar=True).id)
+                except ValueError:
+                    pass
+                except Exception as e:
+                    errores.append(e)
+
+    def lote():
+        barrera.wait()
+        pedidos = [{"descripcion": "lote", "total": 1.0, "cliente_id": cliente_id, "menu_cantidades": {menu_ids[0]: 1}}] * 20
+        with Session() as db:
+            try:
+                resultados_lote.extend(crear_pedidos_bulk(db, pedidos))
+            except Exception as e:
+                errores.append(e)
+
+    hilos = [threading.Thread(target=caja) for _ in range(HILOS - 1)] + [threading.Thread(target=lote)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    with Session() as db:
+        stock = [cantidad for (cantidad,) in db.query(Ingrediente.cantidad).order_by(Ingrediente.id)]
+        pedidos = db.query(Pedido).count()
+    engine.dispose()
+
+    aceptados_lote = [r for r in resultados_lote if r["ok"]]
+    assert errores == []
+    assert len(resultados_lote) == 20
+    assert len(exitos) + len(aceptados_lote) == STOCK == pedidos
+    assert stock == [0, 0]
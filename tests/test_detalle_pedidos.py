@@ -0,0 +1,51 @@
+import time
+import detalle_pedidos
+from crud.pedido_crud import actualizar_pedido, crear_pedido, eliminar_pedido
+from detalle_pedidos import CacheDetallesPedidos
+from tests.datos import cargar_menus
+
+
+def _pedidos(Session, cantidad):
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 1)
+        return [crear_pedido(db, "prueba", 1000.0, cliente_id, {menu_ids[0]: 1}).id for _ in range(cantidad)]
+
+
+def test_precarga_leida_antes_de_un_cambio_no_se_guarda(Session, monkeypatch):
+    cache = CacheDetallesPedidos()
+    pedido_ids = _pedidos(Session, 3)
+    leer = detalle_pedidos.leer_detalles
+
+    def leer_y_cambiar(db, ids):
+        detalles = leer(db, ids)
+        cache.registrar_pedidos([pedido_ids[0]])  # Se editó un pedido mientras se leía
+        return detalles
+
+    monkeypatch.setattr(detalle_pedidos, "leer_detalles", leer_y_cambiar)
+    with Session() as db:
+        assert cache.precargar(db, pedido_ids) == 3
+    assert len(cache) == 0
+    monkeypatch.setattr(detalle_pedidos, "leer_detalles", leer)
+    with Session() as db:
+        assert cache.precargar(db, pedido_ids) == 3
+        assert cache.precargar(db, pedido_ids) == 0
+    assert len(cache) == 3
+
+
+def test_cambios_de_otra_caja_se_ven_al_vencer_la_entrada(Session, monkeypatch):
+    cache = CacheDetallesPedidos(edad_maxima=30.0)
+    editado, eliminado = _pedidos(Session, 2)
+    with Session() as db:
+        cache.precargar(db, [editado, eliminado])
+    # Otra caja edita y elimina: sus avisos no llegan a este cache
+    with Session() as db:
+        actualizar_pedido(db, editado, total=2500.0)
+        eliminar_pedido(db, eliminado)
+    with Session() as db:
+        assert cache.obtener(db, editado)["total"] == 1000.0
+    ahora = time.monotonic()
+    monkeypatch.setattr(detalle_pedidos.time, "monotonic", lambda: ahora + 31.0)
+    with Session() as db:
+        assert cache.obtener(db, editado)["total"] == 2500.0
+        assert cache.obtener(db, eliminado) is None
+        assert cache.precargar(db, [editado]) == 0
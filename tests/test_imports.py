@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_la_capa_crud_no_importa_los_caches_ni_numpy():
+    # Los caches se suscriben a los eventos al importarse; los crud no deben arrastrarlos
+    codigo = (
+        "import sys\n"
+        "import crud.cliente_crud, crud.ingrediente_crud, crud.menu_crud, crud.pedido_crud\n"
+        "print(sorted(m for m in ('numpy', 'inventario', 'analitica', 'cache_graficos', 'mas_vendidos', 'rfm') if m in sys.modules))\n"
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == "[]"
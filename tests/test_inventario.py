@@ -0,0 +1,49 @@
+import time
+from crud.pedido_crud import crear_pedido
+from inventario import MatrizRecetas
+from tests.datos import cargar_menus
+
+
+def test_descontar_no_repite_un_pedido_ya_leido(Session):
+    matriz = MatrizRecetas()
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 1, stock=10)
+        antes_del_commit = time.perf_counter()
+        crear_pedido(db, "prueba", 1000.0, cliente_id, {menu_ids[0]: 3})
+        # La matriz se carga entre el commit y el aviso: ya ve el stock descontado
+        assert matriz.porciones_disponibles(db) == {menu_ids[0]: 7}
+        matriz.descontar({i: 3.0 for i in matriz.datos(db)["columna"]}, antes_del_commit)
+        assert matriz.porciones_disponibles(db) == {menu_ids[0]: 7}
+
+
+def test_refrescar_stock_ve_otras_cajas(Session):
+    matriz = MatrizRecetas()
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 1, stock=10)
+        assert matriz.porciones_disponibles(db) == {menu_ids[0]: 10}
+    # Otra caja vende sin que esta matriz reciba el aviso
+    with Session() as otra:
+        crear_pedido(otra, "otra caja", 1000.0, cliente_id, {menu_ids[0]: 4})
+    with Session() as db:
+        assert matriz.porciones_disponibles(db) == {menu_ids[0]: 10}
+        matriz.refrescar_stock(db)
+        assert matriz.porciones_disponibles(db) == {menu_ids[0]: 6}
+
+
+def test_carga_invalidada_a_medias_no_se_guarda(Session, monkeypatch):
+    matriz = MatrizRecetas()
+    cargar = matriz._cargar
+
+    def cargar_y_editar_receta(db):
+        datos = cargar(db)
+        matriz.invalidar()  # Otra caja o hilo edita un menú mientras se leía
+        return datos
+
+    with Session() as db:
+        cargar_menus(db, 1, stock=10)
+        monkeypatch.setattr(matriz, "_cargar", cargar_y_editar_receta)
+        matriz.datos(db)
+        assert matriz._datos is None
+        monkeypatch.setattr(matriz, "_cargar", cargar)
+        matriz.datos(db)
+        assert matriz._datos is not None
@@ -0,0 +1,42 @@
+from datetime import datetime
+from crud.pedido_crud import crear_pedido
+from mas_vendidos import RankingMenus
+from tests.datos import cargar_menus
+
+
+def _pedir(Session, cliente_id, menu_cantidades):
+    with Session() as db:
+        pedido = crear_pedido(db, "prueba", 1000.0, cliente_id, menu_cantidades)
+        return pedido.id
+
+
+def test_alta_ya_leida_por_la_reconstruccion_no_se_repite(Session):
+    ranking = RankingMenus()
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 1)
+    pedido_id = _pedir(Session, cliente_id, {menu_ids[0]: 2})
+    # El aviso del commit llega después de que la reconstrucción leyó el pedido
+    with Session() as db:
+        assert ranking.reconstruir(db)
+    ranking.registrar(pedido_id, datetime.now(), {menu_ids[0]: 2}, nuevo=True)
+    assert ranking.top(dias=7) == ranking.top() == [(menu_ids[0], 2)]
+
+
+def test_sincronizar_suma_pedidos_de_otras_cajas_una_vez(Session):
+    ranking = RankingMenus()
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 2)
+        ranking.reconstruir(db)
+    # Pedido de esta caja, avisado antes de sincronizar
+    local = _pedir(Session, cliente_id, {menu_ids[0]: 1})
+    ranking.registrar(local, datetime.now(), {menu_ids[0]: 1}, nuevo=True)
+    # Pedido de otra caja: nadie lo avisa
+    _pedir(Session, cliente_id, {menu_ids[1]: 3})
+    # Pedido de esta caja cuyo aviso llega después de sincronizar
+    tardio = _pedir(Session, cliente_id, {menu_ids[0]: 2})
+    with Session() as db:
+        ranking.sincronizar(db)
+    ranking.registrar(tardio, datetime.now(), {menu_ids[0]: 2}, nuevo=True)
+
+    esperado = [(menu_ids[0], 3), (menu_ids[1], 3)]
+    assert ranking.top() == ranking.top(dias=7) == ranking.top(dias=30) == esperado
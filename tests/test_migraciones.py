@@ -0,0 +1,49 @@
+import threading
+from sqlalchemy import text
+from database import crear_engine
+from migraciones import MIGRACIONES, migrar
+
+
+def _versiones(engine):
+    with engine.connect() as conn:
+        return [fila[0] for fila in conn.execute(text("SELECT version FROM version_esquema ORDER BY version"))]
+
+
+def test_migrar_dos_veces_no_repite(tmp_path):
+    engine = crear_engine(f"sqlite:///{tmp_path / 'migrar.db'}")
+    try:
+        todas = [numero for numero, _, _ in MIGRACIONES]
+        assert migrar(engine) == todas
+        assert migrar(engine) == []
+        assert _versiones(engine) == todas
+    finally:
+        engine.dispose()
+
+
+def test_migrar_desde_dos_cajas_a_la_vez(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrar.db'}"
+    engines = [crear_engine(url) for _ in range(2)]
+    barrera = threading.Barrier(len(engines))
+    aplicadas = []
+    errores = []
+
+    def caja(engine):
+        barrera.wait()
+        try:
+            aplicadas.extend(migrar(engine))
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=caja, args=(engine,)) for engine in engines]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    try:
+        todas = [numero for numero, _, _ in MIGRACIONES]
+        assert errores == []
+        assert sorted(aplicadas) == todas  # Cada migración la aplicó una sola caja
+        assert _versiones(engines[0]) == todas
+    finally:
+        for engine in engines:
+            engine.dispose()
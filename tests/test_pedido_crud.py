@@ -0,0 +1,80 @@
+import eventos
+from sqlalchemy import event
+from crud.pedido_crud import crear_pedido, crear_pedidos_bulk
+from models import Ingrediente, Pedido
+from tests.datos import cargar_menus
+
+
+def _contar_sentencias(engine, funcion):
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return len(sentencias)
+
+
+def test_crear_pedido_cantidad_de_consultas_constante(engine, Session):
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 8)
+        conteos = {}
+        for lineas in (1, 3, 8):
+            menu_cantidades = {menu_id: 2 for menu_id in menu_ids[:lineas]}
+            conteos[lineas] = _contar_sentencias(
+                engine, lambda: crear_pedido(db, "prueba", 1000.0 * lineas, cliente_id, menu_cantidades)
+            )
+    assert conteos[1] == conteos[3] == conteos[8], conteos
+
+
+def test_crear_pedido_descuenta_stock(Session):
+    with Session() as db:
+        cliente_id, menu_ids, ingrediente_ids = cargar_menus(db, 3, stock=10)
+        crear_pedido(db, "prueba", 3000.0, cliente_id, {menu_ids[0]: 2, menu_ids[1]: 1})
+        stock = dict(db.query(Ingrediente.id, Ingrediente.cantidad).all())
+    # Menú 0 usa ingredientes 0 y 1; menú 1 usa 1 y 2
+    assert [stock[i] for i in ingrediente_ids] == [8, 7, 9, 10]
+
+
+def test_crear_pedidos_bulk_resultado_por_pedido(Session):
+    with Session() as db:
+        cliente_id, menu_ids, ingrediente_ids = cargar_menus(db, 2, stock=5)
+        lote = [
+            {"descripcion": "a", "total": 1.0, "cliente_id": cliente_id, "menu_cantidades": {menu_ids[0]: 3}},
+            {"descripcion": "b", "total": 1.0, "cliente_id": cliente_id, "menu_cantidades": {menu_ids[0]: 3}},
+            {"descripcion": "c", "total": 1.0, "cliente_id": cliente_id, "menu_cantidades": {9999: 1}},
+            {"descripcion": "d", "total": 1.0, "cliente_id": cliente_id, "menu_cantidades": {menu_ids[1]: 2}},
+            {"descripcion": "e", "total": 1.0, "cliente_id": cliente_id, "menu_cantidades": {}},
+        ]
+        resultados = crear_pedidos_bulk(db, lote)
+        stock = dict(db.query(Ingrediente.id, Ingrediente.cantidad).all())
+        pedido_ids = {p.id for p in db.query(Pedido.id)}
+
+    assert [r["ok"] for r in resultados] == [True, False, False, True, True]
+    assert "stock" in resultados[1]["error"] and "9999" in resultados[2]["error"]
+    assert {r["pedido_id"] for r in resultados if r["ok"]} == pedido_ids
+    # Menú 0 usa ingredientes 0 y 1; menú 1 usa 1 y 2
+    assert [stock[i] for i in ingrediente_ids] == [2, 0, 3]
+
+
+def test_suscriptor_con_error_no_deshace_el_pedido(Session, monkeypatch):
+    recibidos = []
+
+    def fallar(**_):
+        raise RuntimeError("cache roto")
+
+    monkeypatch.setitem(eventos._suscriptores, "pedidos", [])
+    eventos.suscribir("pedidos", fallar)
+    eventos.suscribir("pedidos", lambda cambios, **_: recibidos.extend(cambios), orden=1)
+    with Session() as db:
+        cliente_id, menu_ids, _ = cargar_menus(db, 1, stock=10)
+        pedido = crear_pedido(db, "prueba", 1000.0, cliente_id, {menu_ids[0]: 2})
+        guardados = [p.id for p in db.query(Pedido.id)]
+
+    assert guardados == [pedido.id]
+    # El suscriptor siguiente igual recibe el aviso
+    assert [(c["pedido_id"], c["menu_cantidades"], c["signo"]) for c in recibidos] == [(pedido.id, {menu_ids[0]: 2}, 1)]
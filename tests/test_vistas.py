@@ -0,0 +1,134 @@
+from vistas import EnlaceTreeview, PaginadorTreeview
+
+
+class TreeFalso:
+    """Lo que EnlaceTreeview y PaginadorTreeview usan de un ttk.Treeview, sin pantalla."""
+
+    def __init__(self):
+        self.hijos = []
+        self.items = {}
+        self.inserciones = 0
+        self.vista = (0.0, 1.0)
+
+    def insert(self, padre, indice, iid, values):
+        assert iid not in self.items
+        self.hijos.insert(len(self.hijos) if indice == "end" else indice, iid)
+        self.items[iid] = tuple(values)
+        self.inserciones += 1
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.hijos.remove(iid)
+            del self.items[iid]
+
+    def item(self, iid, values):
+        self.items[iid] = tuple(values)
+
+    def move(self, iid, padre, indice):
+        self.hijos.remove(iid)
+        self.hijos.insert(indice, iid)
+
+    def get_children(self):
+        return tuple(self.hijos)
+
+    def configure(self, **opciones):
+        pass
+
+    def yview(self, *args):
+        return self.vista
+
+    def yview_moveto(self, fraccion):
+        alto = self.vista[1] - self.vista[0]
+        self.vista = (fraccion, fraccion + alto)
+
+    def after_idle(self, funcion):
+        funcion()
+
+
+class ScrollbarFalsa:
+    def configure(self, **opciones):
+        pass
+
+    def set(self, primero, ultimo):
+        pass
+
+
+def test_sincronizar_aplica_solo_las_diferencias():
+    tree = TreeFalso()
+    enlace = EnlaceTreeview(tree)
+    assert enlace.sincronizar([(1, ("a",)), (2, ("b",)), (3, ("c",))]) == (3, 0, 0)
+    assert enlace.sincronizar([(1, ("a",)), (2, ("b",)), (3, ("c",))]) == (0, 0, 0)
+    assert tree.inserciones == 3
+
+    # Se edita 2, se elimina 3, se agrega 4 al principio y 1 pasa al final
+    assert enlace.sincronizar([(4, ("d",)), (2, ("B",)), (1, ("a",))]) == (1, 1, 1)
+    assert tree.get_children() == ("4", "2", "1")
+    assert tree.items == {"4": ("d",), "2": ("B",), "1": ("a",)}
+    assert tree.inserciones == 4  # Las filas existentes no se vuelven a insertar
+    assert 3 not in enlace and 2 in enlace and len(enlace) == 3
+
+
+def _paginador(total=1000, tamano_pagina=100):
+    filas = list(range(total, 0, -1))  # Ids de pedidos, del más nuevo al más antiguo
+    cargas = []
+
+    def cargar_pagina(limite, despues=None, antes=None):
+        cargas.append((limite, despues, antes))
+        if antes is not None:
+            anteriores = [f for f in filas if f > antes]
+            return anteriores[-limite:]
+        return [f for f in filas if despues is None or f < despues][:limite]
+
+    tree = TreeFalso()
+    paginador = PaginadorTreeview(
+        tree, ScrollbarFalsa(), cargar_pagina,
+        clave=lambda fila: fila, iid=lambda fila: fila, valores=lambda fila: (fila, f"Pedido {fila}"),
+        tamano_pagina=tamano_pagina
+    )
+    return paginador, tree, cargas
+
+
+def _desplazar(paginador, tree, vista):
+    tree.vista = vista
+    paginador._al_desplazar(*vista)
+
+
+def _ids(tree):
+    return [int(iid) for iid in tree.get_children()]
+
+
+def test_ventana_acotada_al_bajar_y_subir():
+    paginador, tree, cargas = _paginador()
+    paginador.reiniciar()
+    assert _ids(tree) == list(range(1000, 900, -1))
+
+    # Bajar hasta el final: nunca hay más de cinco páginas cargadas
+    for _ in range(20):
+        _desplazar(paginador, tree, (0.85, 0.95))
+        assert len(tree.get_children()) <= 500
+    assert _ids(tree) == list(range(500, 0, -1))
+    assert not paginador._hay_mas_abajo and paginador._hay_mas_arriba
+    # Una consulta por página más la que confirma que la última página llena era la final
+    assert len(cargas) == 11 and cargas[-1] == (100, 1, None)
+
+    # Subir hasta el principio: la ventana vuelve a ser contigua desde el primer pedido
+    for _ in range(20):
+        _desplazar(paginador, tree, (0.05, 0.15))
+        assert len(tree.get_children()) <= 500
+        ids = _ids(tree)
+        assert ids == list(range(ids[0], ids[0] - len(ids), -1))
+    assert _ids(tree) == list(range(1000, 500, -1))
+    assert not paginador._hay_mas_arriba and paginador._hay_mas_abajo
+
+
+def test_refrescar_conserva_la_ventana_y_solo_aplica_cambios():
+    paginador, tree, cargas = _paginador()
+    paginador.reiniciar()
+    for _ in range(6):
+        _desplazar(paginador, tree, (0.85, 0.95))
+    antes = _ids(tree)
+    inserciones = tree.inserciones
+    paginador.refrescar()
+    assert _ids(tree) == antes
+    assert tree.inserciones == inserciones
+    assert cargas[-1] == (500, paginador._clave_previa, None)
@@ -0,0 +1,202 @@
+class EnlaceTreeview:
+    """
+    Mantiene un Treeview igual a una lista de filas aplicando solo las diferencias.
+    Guarda iid -> valores mostrados; los ítems que no cambiaron no se tocan, así que
+    la selección y el desplazamiento se conservan.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.valores = {}
+
+    def __contains__(self, clave):
+        return str(clave) in self.valores
+
+    def __len__(self):
+        return len(self.valores)
+
+    def insertar(self, clave, valores, indice="end"):
+        iid = str(clave)
+        valores = tuple(valores)
+        self.tree.insert("", indice, iid=iid, values=valores)
+        self.valores[iid] = valores
+        return iid
+
+    def quitar(self, claves):
+        iids = [str(clave) for clave in claves if str(clave) in self.valores]
+        if iids:
+            self.tree.delete(*iids)
+            for iid in iids:
+                del self.valores[iid]
+
+    def sincronizar(self, filas):
+        """
+        filas: iterable de (clave, valores) en el orden deseado.
+        Retorna (insertados, actualizados, eliminados).
+        """
+        nuevas = {}
+        orden = []
+        for clave, valores in filas:
+            iid = str(clave)
+            nuevas[iid] = tuple(valores)
+            orden.append(iid)
+
+        sobrantes = [iid for iid in self.valores if iid not in nuevas]
+        if sobrantes:
+            self.tree.delete(*sobrantes)
+
+        insertados = 0
+        actualizados = 0
+        for indice, iid in enumerate(orden):
+            anterior = self.valores.get(iid)
+            if anterior is None:
+                self.tree.insert("", indice, iid=iid, values=nuevas[iid])
+                insertados += 1
+            elif anterior != nuevas[iid]:
+                self.tree.item(iid, values=nuevas[iid])
+                actualizados += 1
+        self.valores = nuevas
+
+        # Solo si cambió el orden de filas ya existentes
+        if list(self.tree.get_children()) != orden:
+            for indice, iid in enumerate(orden):
+                self.tree.move(iid, "", indice)
+        return insertados, actualizados, len(sobrantes)
+
+
+class PaginadorTreeview:
+    """
+    Treeview virtualizado: muestra una ventana de a lo sumo max_paginas páginas y
+    pide la siguiente (o la anterior) cuando el desplazamiento se acerca a un borde.
+    Abrir la vista y la memoria usada no dependen del largo del historial.
+
+    cargar_pagina(limite, despues=None, antes=None) retorna filas en orden de pantalla;
+    clave(fila) da la clave de paginación, iid(fila) el id del ítem y valores(fila)
+    las columnas a mostrar.
+    """
+
+    def __init__(self, tree, scrollbar, cargar_pagina, clave, iid, valores, tamano_pagina: int = 100, max_paginas: int = 5):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.enlace = EnlaceTreeview(tree)
+        self.cargar_pagina = cargar_pagina
+        self.clave = clave
+        self.iid = iid
+        self.valores = valores
+        self.tamano_pagina = tamano_pagina
+        self.max_paginas = max_paginas
+        self._paginas = []  # [(clave primera fila, clave última fila, [iids])] en orden de pantalla
+        self._clave_previa = None  # Clave de la fila justo arriba de la ventana (None si está al principio)
+        self._hay_mas_abajo = False
+        self._cargando = False
+        self._revision_pendiente = False
+        self.tree.configure(yscrollcommand=self._al_desplazar)
+        self.scrollbar.configure(command=self.tree.yview)
+
+    @property
+    def _hay_mas_arriba(self):
+        return self._clave_previa is not None
+
+    def reiniciar(self):
+        """Vuelve a la primera página (por ejemplo, al cambiar el filtro)."""
+        self.enlace.quitar(list(self.enlace.valores))
+        self._paginas = []
+        self._clave_previa = None
+        self._hay_mas_abajo = True
+        self._cargar_abajo()
+
+    def refrescar(self):
+        """
+        Vuelve a leer las filas de la ventana actual y aplica solo las diferencias:
+        la selección y la posición del desplazamiento se mantienen.
+        """
+        if not self._paginas:
+            self.reiniciar()
+            return
+        cantidad = max(sum(len(iids) for _, _, iids in self._paginas), self.tamano_pagina)
+        filas = self.cargar_pagina(cantidad, despues=self._clave_previa)
+        self._hay_mas_abajo = len(filas) == cantidad
+        self.enlace.sincronizar((self.iid(fila), self.valores(fila)) for fila in filas)
+        self._paginas = [
+            (self.clave(pagina[0]), self.clave(pagina[-1]), [str(self.iid(fila)) for fila in pagina])
+            for pagina in (filas[i:i + self.tamano_pagina] for i in range(0, len(filas), self.tamano_pagina))
+        ]
+
+    def _insertar_pagina(self, filas, al_final: bool):
+        iids = []
+        for fila in filas:
+            if self.iid(fila) in self.enlace:
+                continue  # Un pedido nuevo pudo desplazar la paginación
+            iids.append(self.enlace.insertar(self.iid(fila), self.valores(fila), "end" if al_final else len(iids)))
+        pagina = (self.clave(filas[0]), self.clave(filas[-1]), iids)
+        if al_final:
+            self._paginas.append(pagina)
+        else:
+            self._paginas.insert(0, pagina)
+
+    def _quitar_pagina(self, del_inicio: bool):
+        # Se conserva la fila visible arriba para que la vista no salte
+        total = len(self.enlace)
+        primera = round(self.tree.yview()[0] * total)
+        _, ultima_clave, iids = self._paginas.pop(0 if del_inicio else -1)
+        self.enlace.quitar(iids)
+        if del_inicio:
+            self._clave_previa = ultima_clave
+            restante = max(total - len(iids), 1)
+            self.tree.yview_moveto(max(primera - len(iids), 0) / restante)
+
+    def _cargar_abajo(self):
+        if self._cargando or not self._hay_mas_abajo:
+            return
+        self._cargando = True
+        try:
+            despues = self._paginas[-1][1] if self._paginas else None
+            filas = self.cargar_pagina(self.tamano_pagina, despues=despues)
+            self._hay_mas_abajo = len(filas) == self.tamano_pagina
+            if not filas:
+                return
+            self._insertar_pagina(filas, al_final=True)
+            if len(self._paginas) > self.max_paginas:
+                self._quitar_pagina(del_inicio=True)
+        finally:
+            self._cargando = False
+
+    def _cargar_arriba(self):
+        if self._cargando or not self._hay_mas_arriba:
+            return
+        self._cargando = True
+        try:
+            total = len(self.enlace)
+            primera = round(self.tree.yview()[0] * total)
+            # Una fila de más: su clave pasa a ser la de la fila previa a la ventana
+            filas = self.cargar_pagina(self.tamano_pagina + 1, antes=self._paginas[0][0])
+            if len(filas) > self.tamano_pagina:
+                self._clave_previa = self.clave(filas[0])
+                filas = filas[1:]
+            else:
+                self._clave_previa = None
+            if not filas:
+                return
+            self._insertar_pagina(filas, al_final=False)
+            # Las filas nuevas quedan arriba de la vista actual
+            self.tree.yview_moveto((primera + len(filas)) / (total + len(filas)))
+            if len(self._paginas) > self.max_paginas:
+                self._quitar_pagina(del_inicio=False)
+                self._hay_mas_abajo = True
+        finally:
+            self._cargando = False
+
+    def _al_desplazar(self, primero, ultimo):
+        self.scrollbar.set(primero, ultimo)
+        if not self._revision_pendiente:
+            self._revision_pendiente = True
+            self.tree.after_idle(self._revisar)
+
+    def _revisar(self):
+        # Una sola revisión por ciclo de eventos, con la posición ya actualizada
+        self._revision_pendiente = False
+        primero, ultimo = self.tree.yview()
+        if ultimo >= 0.9 and self._hay_mas_abajo:
+            self._cargar_abajo()
+        elif primero <= 0.1 and self._hay_mas_arriba:
+            self._cargar_arriba()